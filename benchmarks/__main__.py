@@ -0,0 +1,78 @@
+"""Run the client benchmarks against a local mock of the Deeploy API
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --quick --only predict,logs --compare results.json
+"""
+from typing import List, Tuple
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+from benchmarks.suite import BENCHMARKS, run_benchmarks
+from deeploy import __version__
+
+
+def get_key(result: dict) -> str:
+    return '%s %s' % (result['name'], json.dumps(result['params'], sort_keys=True))
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[Tuple[str, str, float]]:
+    """Return the metrics that got worse than the baseline by more than the threshold, as
+    (benchmark, metric, relative change) tuples. Metrics in milliseconds are better when
+    lower, metrics per second are better when higher, other metrics are not compared
+    """
+    baseline = {get_key(result): result['metrics'] for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline.get(get_key(result))
+        if previous is None:
+            continue
+        for metric, value in result['metrics'].items():
+            if not previous.get(metric):
+                continue
+            change = value / previous[metric] - 1
+            if (metric.endswith('_ms') and change > threshold) or \
+                    (metric.endswith('_per_s') and change < -threshold):
+                regressions.append((get_key(result), metric, change))
+    return regressions
+
+
+def main(args: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.splitlines()[0])
+    parser.add_argument('--only', help='comma separated benchmarks to run, of %s' % ', '.join(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true', help='run fewer iterations with smaller payloads')
+    parser.add_argument('--output', help='file to write the results to as JSON')
+    parser.add_argument('--compare', help='results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative change of a metric that counts as a regression. Defaults to 0.2')
+    arguments = parser.parse_args(args)
+
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'createdAt': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'quick': arguments.quick,
+        'results': run_benchmarks(arguments.only.split(',') if arguments.only else None, arguments.quick),
+    }
+    for result in report['results']:
+        metrics = ', '.join('%s=%.2f' % item for item in result['metrics'].items())
+        print('%s: %s' % (get_key(result), metrics))
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if not arguments.compare:
+        return 0
+    with open(arguments.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline['results'], arguments.threshold)
+    for key, metric, change in regressions:
+        print('Regression against %s: %s %s %+.1f%%' % (baseline['version'], key, metric, change * 100))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
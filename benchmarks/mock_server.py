@@ -0,0 +1,139 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+import contextlib
+import json
+import multiprocessing
+
+WORKSPACE_ID = 'benchmark-workspace'
+REPOSITORY_ID = 'benchmark-repository'
+DEPLOYMENT_ID = 'benchmark-deployment'
+
+DEPLOYMENT = {'id': DEPLOYMENT_ID, 'name': 'benchmark', 'workspaceId': WORKSPACE_ID, 'status': 1,
+              'ownerId': 'benchmark', 'createdAt': '', 'updatedAt': '',
+              'activeVersion': {'commit': '0000000', 'repositoryId': REPOSITORY_ID}}
+
+
+def get_prediction_log(index: int) -> Dict[str, Any]:
+    return {
+        'id': 'prediction-%s' % index,
+        'requestBody': {'instances': [[index, 0.5, 1.5, 2.5]]},
+        'requestBodyBlobLink': None,
+        'responseBody': {'predictions': [index % 2]},
+        'requestLog': {'id': 'request-%s' % index, 'deploymentId': DEPLOYMENT_ID, 'commit': '0000000',
+                       'requestContentType': 'application/json', 'responseTimeMS': 12,
+                       'statusCode': 200, 'personalKeysId': None, 'tokenId': None,
+                       'createdAt': '2022-01-01T00:00:00.000Z'},
+        'evaluation': None,
+        'actual': None,
+        'createdAt': '2022-01-01T00:00:00.000Z',
+        'tags': {'primary': 'benchmark', 'secondary': ['a', 'b']},
+    }
+
+
+class MockDeeployHandler(BaseHTTPRequestHandler):
+    """
+    Answers the Deeploy API calls the benchmarks make
+    """
+    protocol_version = 'HTTP/1.1'
+    # responses are written as separate header and body writes, which would otherwise wait
+    # for the delayed acknowledgement of the client
+    disable_nagle_algorithm = True
+    server: 'MockDeeployServer'
+
+    def do_GET(self) -> None:
+        path, query = self.__read_request()
+        if path == '/workspaces':
+            self.__send_json([])
+        elif path == '/workspaces/%s/repositories' % WORKSPACE_ID:
+            self.__send_json([{'id': REPOSITORY_ID, 'name': 'benchmark', 'status': 1, 'isArchived': False,
+                               'workspaceId': WORKSPACE_ID, 'isPublic': False,
+                               'remotePath': self.server.remote_path, 'createdAt': '', 'updatedAt': ''}])
+        elif path.endswith('/predictionLogs'):
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', [str(self.server.log_count)])[0])
+            logs = self.server.prediction_logs[offset:offset + limit]
+            self.__send_json({'data': logs, 'count': self.server.log_count})
+        elif path == '/workspaces/%s/deployments/%s' % (WORKSPACE_ID, DEPLOYMENT_ID):
+            self.__send_json(DEPLOYMENT)
+        else:
+            self.__send_json({'error': 'Not found'}, 404)
+
+    def do_POST(self) -> None:
+        path, query = self.__read_request()
+        if path.endswith('/predict'):
+            instances = json.loads(self.body)['instances']
+            self.__send_json({'predictions': [0.5] * len(instances), 'requestLogId': 'request',
+                              'predictionLogIds': ['prediction-%s' % i for i in range(len(instances))]})
+        elif path.endswith('/upload'):
+            self.__send_json({'data': {'referencePath': 's3://benchmark/%s/%s/file' % (
+                query.get('commitSha', [''])[0], query.get('folderPath', [''])[0])}})
+        elif path == '/workspaces/%s/deployments' % WORKSPACE_ID:
+            self.__send_json(DEPLOYMENT, 201)
+        else:
+            self.__send_json({'error': 'Not found'}, 404)
+
+    def do_PATCH(self) -> None:
+        self.__read_request()
+        self.__send_json(DEPLOYMENT)
+
+    def log_message(self, *args) -> None:
+        return
+
+    def __read_request(self) -> Tuple[str, Dict[str, list]]:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if size == 0:
+                    break
+            self.body = b''.join(chunks)
+        else:
+            self.body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        url = urlsplit(self.path)
+        return url.path, parse_qs(url.query)
+
+    def __send_json(self, body: Any, status: int = 200) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        return
+
+
+class MockDeeployServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, remote_path: str = '', log_count: int = 0) -> None:
+        super().__init__(('127.0.0.1', 0), MockDeeployHandler)
+        self.remote_path = remote_path
+        self.log_count = log_count
+        self.prediction_logs = [get_prediction_log(i) for i in range(log_count)]
+        return
+
+
+def serve(connection: Any, remote_path: str, log_count: int) -> None:
+    server = MockDeeployServer(remote_path, log_count)
+    connection.send(server.server_address[1])
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def mock_deeploy_api(remote_path: str = '', log_count: int = 0):
+    """Run the mock API in a separate process, so that it does not compete with the client
+    for the GIL. Yields the URL of the API
+    """
+    context = multiprocessing.get_context('spawn')
+    parent_connection, child_connection = context.Pipe()
+    process = context.Process(target=serve, args=(child_connection, remote_path, log_count), daemon=True)
+    process.start()
+    port = parent_connection.recv()
+    try:
+        yield 'http://127.0.0.1:%s' % port
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+from unittest import mock
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import git
+from pydantic import parse_obj_as
+
+from benchmarks.mock_server import DEPLOYMENT_ID, REPOSITORY_ID, WORKSPACE_ID, get_prediction_log, \
+    mock_deeploy_api
+from deeploy import Client, ConnectionOptions, DeployOptions, UploadOptions
+from deeploy.enums import ModelType
+from deeploy.models import PredictionLogs
+
+BENCHMARKS = ['predict', 'logs', 'upload', 'deploy']
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Return the latency statistics of a list of durations in seconds, in milliseconds
+    """
+    durations = sorted(durations)
+
+    def percentile(fraction: float) -> float:
+        return durations[min(int(fraction * len(durations)), len(durations) - 1)] * 1000
+
+    return {
+        'mean_ms': statistics.mean(durations) * 1000,
+        'min_ms': durations[0] * 1000,
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def measure(function: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        function()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def create_client(api_url: str, **kwargs) -> Client:
+    client = Client(host='deeploy.benchmark', workspace_id=WORKSPACE_ID, access_key='benchmark',
+                    secret_key='benchmark', lazy_validation=True, **kwargs)
+    # the client always calls https://api.<host>, so its service is pointed at the mock API
+    client._Client__deeploy_service._DeeployService__host = api_url
+    return client
+
+
+def benchmark_predict(quick: bool) -> List[dict]:
+    """Latency and throughput of Client.predict for several payload sizes and numbers of
+    concurrent callers
+    """
+    results = []
+    requests_per_case = 50 if quick else 500
+    with mock_deeploy_api() as api_url:
+        client = create_client(api_url, connection_options=ConnectionOptions(pool_maxsize=16))
+        for rows in ([1, 100] if quick else [1, 100, 1000]):
+            request_body = {'instances': [[float(i)] * 16 for i in range(rows)]}
+            for concurrency in ([1, 8] if quick else [1, 4, 16]):
+                client.predict(DEPLOYMENT_ID, request_body)
+
+                def timed_predict(_: int) -> float:
+                    start = time.perf_counter()
+                    client.predict(DEPLOYMENT_ID, request_body)
+                    return time.perf_counter() - start
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    durations = list(executor.map(timed_predict, range(requests_per_case)))
+                duration = time.perf_counter() - start
+                results.append({
+                    'name': 'predict',
+                    'params': {'rows': rows, 'concurrency': concurrency},
+                    'metrics': {**summarize(durations), 'requests_per_s': requests_per_case / duration,
+                                'payload_bytes': len(json.dumps(request_body))},
+                })
+        client.close()
+    return results
+
+
+def benchmark_logs(quick: bool) -> List[dict]:
+    """Time to parse a large PredictionLogs response, offline and through the API
+    """
+    results = []
+    log_count = 1000 if quick else 10000
+    iterations = 3 if quick else 10
+    body = {'data': [get_prediction_log(i) for i in range(log_count)], 'count': log_count}
+    durations = measure(lambda: parse_obj_as(PredictionLogs, body), iterations)
+    results.append({'name': 'parse_prediction_logs', 'params': {'logs': log_count},
+                    'metrics': {**summarize(durations),
+                                'logs_per_s': log_count / statistics.mean(durations)}})
+
+    with mock_deeploy_api(log_count=log_count) as api_url:
+        client = create_client(api_url)
+        durations = measure(lambda: client.getPredictionLogs(DEPLOYMENT_ID), iterations)
+        results.append({'name': 'get_prediction_logs', 'params': {'logs': log_count},
+                        'metrics': {**summarize(durations),
+                                    'logs_per_s': log_count / statistics.mean(durations)}})
+
+        def iterate() -> None:
+            for _ in client.iter_prediction_logs(DEPLOYMENT_ID, page_size=1000):
+                pass
+
+        durations = measure(iterate, iterations)
+        results.append({'name': 'iter_prediction_logs', 'params': {'logs': log_count, 'page_size': 1000},
+                        'metrics': {**summarize(durations),
+                                    'logs_per_s': log_count / statistics.mean(durations)}})
+        client.close()
+    return results
+
+
+def benchmark_upload(quick: bool) -> List[dict]:
+    """Throughput of uploading a model folder to blob storage, for many small files and for a
+    few large files
+    """
+    results = []
+    layouts = [(50, 64 * 1024), (2, 4 * 1024 * 1024)] if quick else [(500, 64 * 1024), (4, 64 * 1024 * 1024)]
+    iterations = 2 if quick else 5
+    with mock_deeploy_api() as api_url, tempfile.TemporaryDirectory() as temporary_folder:
+        # without an artifact cache every iteration uploads the whole folder
+        client = create_client(api_url)
+        client._Client__config.repository_id = REPOSITORY_ID
+        for file_count, file_size in layouts:
+            folder = os.path.join(temporary_folder, '%s-%s' % (file_count, file_size), 'model')
+            os.makedirs(folder)
+            for i in range(file_count):
+                with open(os.path.join(folder, 'file-%s.bin' % i), 'wb') as f:
+                    f.write(os.urandom(file_size))
+
+            durations = measure(
+                lambda: client._Client__upload_folder_to_blob(os.path.dirname(folder), folder), iterations)
+            megabytes = file_count * file_size / 1e6
+            results.append({'name': 'upload_folder_to_blob',
+                            'params': {'files': file_count, 'file_bytes': file_size},
+                            'metrics': {**summarize(durations),
+                                        'mb_per_s': megabytes / statistics.mean(durations)}})
+        client.close()
+    return results
+
+
+class BenchmarkModelWrapper(object):
+    """
+    Stands in for the model wrapper, so that deploys are measured without the serialization
+    of an ML framework. The model is the content of its only file
+    """
+
+    def __init__(self, model_object: bytes, **kwargs) -> None:
+        self.model_object = model_object
+
+    def save(self, local_folder_path: str) -> None:
+        with open(os.path.join(local_folder_path, 'model.joblib'), 'wb') as f:
+            f.write(self.model_object)
+
+    def get_model_type(self) -> ModelType:
+        return ModelType.SKLEARN
+
+
+def create_repository(folder: str) -> str:
+    remote_path = os.path.join(folder, 'remote.git')
+    git.Repo.init(remote_path, bare=True)
+    repository = git.Repo.clone_from(remote_path, os.path.join(folder, 'repository'))
+    with repository.config_writer() as config:
+        config.set_value('user', 'name', 'benchmark')
+        config.set_value('user', 'email', 'benchmark@example.com')
+    with open(os.path.join(repository.working_dir, 'metadata.json'), 'w') as f:
+        f.write('{}')
+    repository.index.add(['metadata.json'])
+    repository.index.commit('Initial commit')
+    repository.remote('origin').push('HEAD:refs/heads/%s' % repository.active_branch.name)
+    repository.active_branch.set_tracking_branch(repository.remote('origin').refs[0])
+    return remote_path
+
+
+def benchmark_deploy(quick: bool) -> List[dict]:
+    """Duration of Client.deploy with a changed model, from saving the model to pushing the
+    contract to a local bare remote and creating the deployment
+    """
+    model_size = 1024 * 1024 if quick else 32 * 1024 * 1024
+    iterations = 3 if quick else 10
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        remote_path = create_repository(temporary_folder)
+        repository_path = os.path.join(temporary_folder, 'repository')
+        with mock_deeploy_api(remote_path=remote_path) as api_url, \
+                mock.patch('deeploy.services.model_wrapper.ModelWrapper', BenchmarkModelWrapper):
+            client = create_client(api_url, upload_options=UploadOptions(
+                artifact_cache_dir=os.path.join(temporary_folder, 'cache')))
+            durations = measure(
+                lambda: client.deploy(DeployOptions(name='benchmark'), repository_path,
+                                      model=os.urandom(model_size), overwrite_contract=True,
+                                      overwrite_metadata=True), iterations)
+            client.close()
+    return [{'name': 'deploy', 'params': {'model_bytes': model_size},
+             'metrics': summarize(durations)}]
+
+
+def run_benchmarks(names: List[str] = None, quick: bool = False) -> List[dict]:
+    """Run benchmarks by name, all by default, and return their results
+    """
+    functions = {
+        'predict': benchmark_predict,
+        'logs': benchmark_logs,
+        'upload': benchmark_upload,
+        'deploy': benchmark_deploy,
+    }
+    results = []
+    for name in names if names else BENCHMARKS:
+        if name not in functions:
+            raise Exception('Unknown benchmark %s. Use one of %s.' % (name, BENCHMARKS))
+        results.extend(functions[name](quick))
+    return results
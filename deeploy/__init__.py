@@ -1,3 +1,28 @@
 from ._version import __version__ # noqa
-from .deeploy import Client # noqa
-from .models import CreateDeployment, UpdateDeployment, DeployOptions, UpdateOptions, BlobReference, DockerReference # noqa
+from .common.functions import lazy_imports
+
+# the clients and models are imported on first use, so that `import deeploy` stays fast
+_LAZY_ATTRIBUTES = {
+    'Client': '.deeploy',
+    'AsyncClient': '.async_deeploy',
+    'PredictionClient': '.prediction_client',
+    'CreateDeployment': '.models',
+    'UpdateDeployment': '.models',
+    'DeployOptions': '.models',
+    'UpdateOptions': '.models',
+    'BlobReference': '.models',
+    'DockerReference': '.models',
+    'ConnectionOptions': '.models',
+    'UploadOptions': '.models',
+    'LogFilters': '.models',
+    'BulkReport': '.models',
+    'RetryOptions': '.models',
+    'CacheOptions': '.models',
+    'EncodingOptions': '.models',
+    'InstrumentationOptions': '.models',
+    'MetricsCollector': '.services.instrumentation',
+    'DeploymentReport': '.models',
+}
+
+__all__ = ['__version__'] + list(_LAZY_ATTRIBUTES)
+__getattr__, __dir__ = lazy_imports(__name__, _LAZY_ATTRIBUTES)
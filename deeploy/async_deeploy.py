@@ -0,0 +1,149 @@
+from deeploy.services.async_deeploy_service import AsyncDeeployService
+from deeploy.models import ClientConfig, V1Prediction, V2Prediction, PredictionLog, RequestLogs, \
+    PredictionLogs, ConnectionOptions, RetryOptions, EncodingOptions
+
+
+class AsyncClient(object):
+    """
+    A class for interacting with Deeploy from asyncio code
+    """
+
+    __config: ClientConfig
+
+    def __init__(
+            self, host: str, workspace_id: str, access_key: str = None, secret_key: str = None,
+            deployment_token: str = None, connection_options: ConnectionOptions = None,
+            max_concurrency: int = None, retry_options: RetryOptions = None,
+            encoding_options: EncodingOptions = None) -> None:
+        """Initialise the asynchronous Deeploy client
+        Parameters:
+            host (str): The host at which Deeploy is located, i.e. deeploy.example.com
+            workspace_id (str): The ID of the workspace in which your deployments
+                are located
+            access_key (str): Personal Access Key generated from the Deeploy UI
+            secret_key (str): Secret Access Key generated from the Deeploy UI
+            deployment_token (str): Deployment token generated from the Deeploy UI
+            connection_options (ConnectionOptions, optional): An instance of the connection
+                options class to configure the pooled HTTP connections
+            max_concurrency (int, optional): Maximum number of requests that are in flight
+                at the same time. Defaults to no limit
+            retry_options (RetryOptions, optional): An instance of the retry options class to
+                configure timeouts per endpoint, retries with backoff and the circuit breaker
+            encoding_options (EncodingOptions, optional): An instance of the encoding options
+                class to send predict and explain requests as compressed JSON, msgpack or
+                KServe binary tensors. Defaults to JSON
+        """
+
+        self.__config = ClientConfig(**{
+            'access_key': access_key,
+            'secret_key': secret_key,
+            'token': deployment_token,
+            'host': host,
+            'workspace_id': workspace_id,
+            'repository_id': '',
+        })
+
+        self.__deeploy_service = AsyncDeeployService(
+            host,
+            workspace_id,
+            access_key,
+            secret_key,
+            deployment_token,
+            connection_options=connection_options,
+            max_concurrency=max_concurrency,
+            retry_options=retry_options,
+            encoding_options=encoding_options,
+        )
+
+        return
+
+    async def close(self) -> None:
+        """Close the HTTP connections of the client
+        """
+        await self.__deeploy_service.close()
+        return
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+        return
+
+    async def predict(self, deployment_id: str, request_body: dict) -> V1Prediction or V2Prediction:
+        """Make a predict call
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_body (dict): Request body with input data for the model
+        """
+        workspace_id = self.__config.workspace_id
+        prediction = await self.__deeploy_service.predict(workspace_id, deployment_id, request_body)
+        return prediction
+
+    async def explain(self, deployment_id: str, request_body: dict, image: bool = False) -> object:
+        """Make an explain call
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_body (dict): Request body with input data for the model
+            image (bool): Return image or not
+        """
+        workspace_id = self.__config.workspace_id
+        explanation = await self.__deeploy_service.explain(
+            workspace_id, deployment_id, request_body, image)
+        return explanation
+
+    async def getRequestLogs(self, deployment_id: str) -> RequestLogs:
+        """Retrieve request logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+        """
+        workspace_id = self.__config.workspace_id
+        requestLogs = await self.__deeploy_service.getRequestLogs(workspace_id, deployment_id)
+        return requestLogs
+
+    async def getPredictionLogs(self, deployment_id: str) -> PredictionLogs:
+        """Retrieve prediction logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+        """
+        workspace_id = self.__config.workspace_id
+        predictionLogs = await self.__deeploy_service.getPredictionLogs(workspace_id, deployment_id)
+        return predictionLogs
+
+    async def getOnePredictionLog(self, deployment_id: str, request_log_id: str,
+                                  prediction_log_id: str) -> PredictionLog:
+        """Retrieve one log
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_log_id (str): ID of the request_log containing the prediction
+            prediction_log_id (str): ID of the prediction_log to be retrieved
+        """
+        workspace_id = self.__config.workspace_id
+        predictionLog = await self.__deeploy_service.getOnePredictionLog(
+            workspace_id, deployment_id, request_log_id, prediction_log_id)
+        return predictionLog
+
+    async def evaluate(self, deployment_id: str, request_log_id: str, prediction_log_id: str,
+                       evaluation_input: dict) -> None:
+        """Evaluate a prediction log
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_log_id (str): ID of the request_log containing the prediction
+            prediction_log_id (str): ID of the prediction_log to be evaluated
+            evaluation_input: Dict with result, value, and explanation
+        """
+        workspace_id = self.__config.workspace_id
+        await self.__deeploy_service.evaluate(workspace_id, deployment_id,
+                                              request_log_id, prediction_log_id,
+                                              evaluation_input)
+
+    async def actuals(self, deployment_id: str, actuals_input: dict) -> None:
+        """Submit actuals for prediction logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            actuals_input (dict): Object with predictionIds and actualsValues
+                                 where the order of the values will match
+                                 predictions with the actuals
+        """
+        workspace_id = self.__config.workspace_id
+        await self.__deeploy_service.actuals(workspace_id, deployment_id, actuals_input)
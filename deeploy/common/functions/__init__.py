@@ -1,2 +1,2 @@
 from .functions import to_lower_camel, delete_all_contents_in_directory, \
-    directory_empty, directory_exists, file_exists # noqa
\ No newline at end of file
+    directory_empty, directory_exists, file_exists, retry_call, lazy_imports # noqa
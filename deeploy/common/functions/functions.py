@@ -1,6 +1,10 @@
+from typing import Any, Callable, Dict, List, Tuple
+import importlib
 import os
 import shutil
 import logging
+import sys
+import time
 
 
 def to_lower_camel(string: str) -> str:
@@ -35,3 +39,44 @@ def directory_empty(folder_path: str) -> bool:
 
 def file_exists(file_path: str) -> bool:
     return os.path.isfile(file_path)
+
+
+def retry_call(function: Callable[[], Any], max_retries: int, backoff: float,
+               description: str = 'Call', should_retry: Callable[[Exception], bool] = None) -> Any:
+    attempt = 0
+    while True:
+        try:
+            return function()
+        except Exception as e:
+            if attempt >= max_retries or (should_retry and not should_retry(e)):
+                raise e
+            delay = backoff * 2 ** attempt
+            logging.warning('%s failed, retrying in %s seconds. Reason: %s' % (description, delay, e))
+            time.sleep(delay)
+            attempt += 1
+
+
+def lazy_imports(package_name: str, lazy_attributes: Dict[str, str]) -> \
+        Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Create the module level __getattr__ and __dir__ functions of a package, that import
+    each attribute from its module on first access
+
+    Parameters
+    ----------
+      package_name: str
+        name of the package, i.e. __name__
+      lazy_attributes: Dict[str, str]
+        module that defines each attribute, relative to the package
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in lazy_attributes:
+            raise AttributeError('module %r has no attribute %r' % (package_name, name))
+        value = getattr(importlib.import_module(lazy_attributes[name], package_name), name)
+        # later lookups find the attribute without calling __getattr__ again
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package_name])) | set(lazy_attributes))
+
+    return __getattr__, __dir__
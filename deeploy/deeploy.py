@@ -1,25 +1,45 @@
+import hashlib
 import logging
-from typing import Any, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import os
+import posixpath
 import shutil
+import tempfile
 import uuid
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 
 from pydantic import parse_obj_as
-from git import Repo
 from deeploy.models.model_reference_json import BlobReference, DockerReference
 
-from deeploy.services import DeeployService, GitService, ModelWrapper, ExplainerWrapper
+from deeploy.services import DeeployService, PredictionBatcher, PredictionCache
+from deeploy.services.prediction_batcher import predict_in_batches
+from deeploy.services.batch_scorer import score_in_chunks
+from deeploy.services.blob_upload import UploadProgress
+from deeploy.services.artifact_cache import ArtifactCache, hash_folder
+from deeploy.services.repository_index import RepositoryIndex, normalize_remote_url
+from deeploy.services.log_exporter import ExportCursor, export_prediction_log_pages
+from deeploy.services.bulk_submitter import chunked, iter_pairs, submit_in_chunks
+from deeploy.services.request_helpers import is_transient_error
+from deeploy.services.contract_fingerprint import FINGERPRINT_FILE, get_fingerprint, \
+    read_committed_fingerprints, read_fingerprints, write_fingerprints
 from deeploy.models import ClientConfig, Deployment, CreateDeployment, UpdateDeployment, \
     DeployOptions, UpdateOptions, V1Prediction, V2Prediction, ModelReferenceJson, \
-    PredictionLog, RequestLogs, PredictionLogs, UpdateDeploymentMetadata
+    PredictionLog, RequestLog, UpdateDeploymentMetadata, \
+    ConnectionOptions, UploadOptions, LogFilters, BulkReport, RetryOptions, CacheOptions, \
+    DeploymentResult, DeploymentReport, EncodingOptions, InstrumentationOptions
 from deeploy.enums import ExplainerType, ModelType
+from deeploy.prediction_methods import PredictionMethods
 from deeploy.common.functions import delete_all_contents_in_directory, directory_exists, \
-    directory_empty, file_exists
+    directory_empty, file_exists, retry_call
 
+if TYPE_CHECKING:
+    from deeploy.services.git_service import GitService
 
-class Client(object):
+
+class Client(PredictionMethods):
     """
     A class for interacting with Deeploy
     """
@@ -28,7 +48,11 @@ class Client(object):
 
     def __init__(
             self, host: str, workspace_id: str, access_key: str = None, secret_key: str = None,
-            deployment_token: str = None, branch_name: str = None) -> None:
+            deployment_token: str = None, branch_name: str = None,
+            connection_options: ConnectionOptions = None, upload_options: UploadOptions = None,
+            retry_options: RetryOptions = None, cache_options: CacheOptions = None,
+            lazy_validation: bool = False, encoding_options: EncodingOptions = None,
+            instrumentation_options: InstrumentationOptions = None) -> None:
         """Initialise the Deeploy client
         Parameters:
             host (str): The host at which Deeploy is located, i.e. deeploy.example.com
@@ -39,6 +63,22 @@ class Client(object):
             token (str): Deployment token generated from the Deeploy UI
             branch_name (str, optional): The banchname on which to commit new models.
                 Defaults to the current branchname.
+            connection_options (ConnectionOptions, optional): An instance of the connection
+                options class to configure the pooled HTTP session that is shared by all calls
+            upload_options (UploadOptions, optional): An instance of the upload options class
+                to configure the parallel upload of model and explainer files
+            retry_options (RetryOptions, optional): An instance of the retry options class to
+                configure timeouts per endpoint, retries with backoff and the circuit breaker
+            cache_options (CacheOptions, optional): An instance of the cache options class to
+                cache prediction responses of identical request bodies. Defaults to no caching
+            lazy_validation (bool, optional): Whether to validate the credentials on the first
+                call instead of when the client is created. Defaults to False
+            encoding_options (EncodingOptions, optional): An instance of the encoding options
+                class to send predict and explain requests as compressed JSON, msgpack or
+                KServe binary tensors. Defaults to JSON
+            instrumentation_options (InstrumentationOptions, optional): An instance of the
+                instrumentation options class with hooks, such as a MetricsCollector, and a
+                tracer that measure every API call. Defaults to no instrumentation
         """
 
         self.__config = ClientConfig(**{
@@ -50,6 +90,16 @@ class Client(object):
             'branch_name': branch_name,
             'repository_id': '',
         })
+        self.__upload_options = upload_options if upload_options else UploadOptions()
+        self.__artifact_cache = ArtifactCache(self.__upload_options.artifact_cache_dir) \
+            if self.__upload_options.artifact_cache_dir else None
+        self.__repository_index = RepositoryIndex(
+            self.__upload_options.artifact_cache_dir, self.__upload_options.repository_cache_ttl) \
+            if self.__upload_options.artifact_cache_dir and self.__upload_options.repository_cache_ttl \
+            else None
+        self.__prediction_cache = PredictionCache(cache_options.max_size, cache_options.ttl) \
+            if cache_options else None
+        self.__deployment_commits = {}
 
         self.__deeploy_service = DeeployService(
             host,
@@ -57,15 +107,34 @@ class Client(object):
             access_key,
             secret_key,
             deployment_token,
+            connection_options=connection_options,
+            retry_options=retry_options,
+            lazy_validation=lazy_validation,
+            encoding_options=encoding_options,
+            instrumentation_options=instrumentation_options,
         )
+        super().__init__(self.__deeploy_service, workspace_id, self.__prediction_cache)
+
+        return
 
+    def close(self) -> None:
+        """Close the HTTP session and release all pooled connections
+        """
+        self.__deeploy_service.close()
+        return
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
         return
 
     def deploy(self, options: DeployOptions, local_repository_path: str,
                model: Any = None, explainer: Any = None, model_type: int = None,
                explainer_type: int = None, overwrite_contract: bool = False,
                overwrite_metadata: bool = False, commit_message: str = None,
-               contract_path: str = "") -> Deployment:
+               contract_path: str = "", target_branch: str = None) -> Deployment:
         """Deploy a model on Deeploy
         Parameters:
             model (Any): The class instance of an ML model
@@ -83,26 +152,467 @@ class Client(object):
             commit_message (str, optional): Commit message to use
             contract_path (str, optional): Relative repository subpath that contains the
                 Deeploy contract to deploy from
+            target_branch (str, optional): Branch on the remote to commit the contract to.
+                The commit is built in the object database of the local repository and only
+                that branch is pushed, so the working tree, the staging area and the checked
+                out branch are left untouched. Defaults to committing on the current branch
         """
-        commit = False
+        if not (self.__config.access_key and self.__config.secret_key):
+            raise Exception('Missing access credentials to create deployment.')
+
+        # only import GitPython when a local repository is used
+        from deeploy.services.git_service import GitService
+        git_service = GitService(local_repository_path)
+
+        if target_branch:
+            self.__config.repository_id = self.__prepare_repository(git_service, pull=False)
+            model_type, explainer_type, commit_sha = self.__commit_contract_to_branch(
+                git_service, target_branch, options, local_repository_path, model, explainer,
+                model_type, explainer_type, overwrite_contract, overwrite_metadata, commit_message,
+                contract_path, require_model_reference=True)
+            return self.__deeploy_service.create_deployment(
+                self.__config.workspace_id, self.__get_create_deployment(
+                    options, model_type, explainer_type, target_branch, commit_sha, contract_path))
+
+        self.__config.repository_id = self.__prepare_repository(git_service)
 
+        model_type, explainer_type, commit, commit_message = self.__prepare_deploy_contract(
+            git_service, options, local_repository_path, model, explainer, model_type,
+            explainer_type, overwrite_contract, overwrite_metadata, commit_message, contract_path)
+
+        commit_sha = self.__commit_and_push(git_service, commit, commit_message, [contract_path])
+        commit_sha = commit_sha if commit_sha else git_service.get_head_commit_sha()
+
+        deployment = self.__deeploy_service.create_deployment(
+            self.__config.workspace_id, self.__get_create_deployment(
+                options, model_type, explainer_type, git_service.get_current_branch_name(),
+                commit_sha, contract_path))
+
+        return deployment
+
+    def deploy_many(self, entries: List[Tuple[Any, DeployOptions, str]], local_repository_path: str,
+                    overwrite_contract: bool = False, overwrite_metadata: bool = False,
+                    commit_message: str = None, max_workers: int = 4) -> DeploymentReport:
+        """Deploy many models from one repository with a single commit and push
+        Parameters:
+            entries (List[Tuple[Any, DeployOptions, str]]): (model, options, contract_path)
+                tuples. The model can be None to deploy from the options or an existing
+                reference.json, and every entry needs its own contract path
+            local_repository_path (str): Absolute path to the local git repository
+                which is connected to Deeploy
+            overwrite_contract (bool, optional): Whether or not to overwrite files that are in the
+                'model' and 'explainer' folders of the contracts. Defaults to False
+            overwrite_metadata (bool, optional): Whether or not to overwrite the metadata.json
+                files. Defaults to False.
+            commit_message (str, optional): Commit message to use
+            max_workers (int, optional): Number of contracts that are prepared, and deployments
+                that are created, at the same time. Defaults to 4
+        Returns:
+            A report with the created deployment or the error per contract path
+        """
         if not (self.__config.access_key and self.__config.secret_key):
             raise Exception('Missing access credentials to create deployment.')
+        self.__check_contract_paths([contract_path for _, _, contract_path in entries])
+
+        # only import GitPython when a local repository is used
+        from deeploy.services.git_service import GitService
+        git_service = GitService(local_repository_path)
+        self.__config.repository_id = self.__prepare_repository(git_service)
+
+        def prepare(entry: Tuple[Any, DeployOptions, str]) -> Tuple[int, int, bool]:
+            model, options, contract_path = entry
+            model_type, explainer_type, commit, _ = self.__prepare_deploy_contract(
+                git_service, options, local_repository_path, model, None, None, None,
+                overwrite_contract, overwrite_metadata, None, contract_path)
+            return model_type, explainer_type, commit
+
+        branch_name = git_service.get_current_branch_name()
+
+        def create(entry: Tuple[Any, DeployOptions, str], prepared: Tuple[int, int, bool],
+                   commit_sha: str) -> Deployment:
+            _, options, contract_path = entry
+            model_type, explainer_type, _ = prepared
+            return self.__deeploy_service.create_deployment(
+                self.__config.workspace_id, self.__get_create_deployment(
+                    options, model_type, explainer_type, branch_name, commit_sha, contract_path))
+
+        commit_message = commit_message if commit_message else \
+            '[Deeploy Client] Add %d new models' % len(entries)
+        return self.__deploy_entries(git_service, entries, prepare, create, commit_message, max_workers)
+
+    def update(self, options: UpdateOptions, local_repository_path: str = None,
+               model: Any = None, explainer: Any = None, model_type: int = None,
+               explainer_type: int = None, overwrite_contract: bool = False,
+               overwrite_metadata: bool = False, commit_sha: str = None, commit_message: str = None,
+               contract_path: str = "", target_branch: str = None) -> Deployment:
+        """Update a model on Deeploy
+        Parameters:
+            model (Any): The class instance of an ML model
+            options (UpdateOptions): An instance of the update options class
+                containing the update options
+            local_repository_path (str): Absolute path to the local git repository
+                which is connected to Deeploy
+            explainer (Any, optional): The class instance of an optional model explainer
+            model_type (int, optional): model type enum from ModelType class
+            explainer_type (int, optional): mopel type enum from ExplainerType class
+            overwrite_contract (bool, optional): Whether or not to overwrite files that are in the
+                'model' and 'explainer' folders in the git folder. Defaults to False
+            overwrite_metadata (bool, optional): Whether or not to overwrite the metadata.json
+                file. Defaults to False.
+            commit_sha (str, optional): Commit SHA to update to
+            commit_message (str, optional): Commit message to use
+            contract_path (str, optional): Relative repository subpath that contains the
+                Deeploy contract to deploy from
+            target_branch (str, optional): Branch on the remote to commit the contract to.
+                The commit is built in the object database of the local repository and only
+                that branch is pushed, so the working tree, the staging area and the checked
+                out branch are left untouched. Defaults to committing on the current branch
+        """
+        if not (self.__config.access_key and self.__config.secret_key):
+            raise Exception('Missing access credentials to update deployment.')
+
+        if not (self.__deeploy_service.get_deployment(self.__config.workspace_id,
+                                                      options.deployment_id)):
+            raise Exception(
+                'Deployment was not found in the Deeploy workspace. \
+                 Make sure the Deployment Id is correct.')
 
+        # only import GitPython when a local repository is used
+        from deeploy.services.git_service import GitService
         git_service = GitService(local_repository_path)
 
+        current_deployment = self.__deeploy_service.get_deployment(
+            self.__config.workspace_id, options.deployment_id)
+
+        if target_branch:
+            if (model or explainer):
+                self.__config.repository_id = self.__prepare_repository(git_service, pull=False)
+            model_type, explainer_type, commit_sha = self.__commit_contract_to_branch(
+                git_service, target_branch, options, local_repository_path, model, explainer,
+                model_type, explainer_type, overwrite_contract, overwrite_metadata, commit_message,
+                contract_path, require_model_reference=False)
+            self.__config.repository_id = current_deployment.active_version['repositoryId']
+            return self.__update_deployment(options, current_deployment, model_type, explainer_type,
+                                            commit_sha, commit_message, contract_path, target_branch)
+
+        if (model or explainer):
+            if (local_repository_path is None):
+                raise Exception(
+                    'Local repository path is required to update \
+                     the model or explainer.')
+            self.__config.repository_id = self.__prepare_repository(git_service)
+
+        model_type, explainer_type, commit, commit_message = self.__prepare_update_contract(
+            git_service, options, local_repository_path, model, explainer, model_type,
+            explainer_type, overwrite_contract, overwrite_metadata, commit_message, contract_path)
+
+        new_commit_sha = self.__commit_and_push(git_service, commit, commit_message, [contract_path])
+        if new_commit_sha:
+            commit_sha = new_commit_sha
+        elif commit_sha is None:
+            commit_sha = git_service.get_head_commit_sha()
+
+        self.__config.repository_id = current_deployment.active_version['repositoryId']
+
+        return self.__update_deployment(options, current_deployment, model_type, explainer_type,
+                                        commit_sha, commit_message, contract_path)
+
+    def update_many(self, entries: List[Tuple[Any, UpdateOptions, str]], local_repository_path: str,
+                    overwrite_contract: bool = False, overwrite_metadata: bool = False,
+                    commit_message: str = None, max_workers: int = 4) -> DeploymentReport:
+        """Update many deployments from one repository with a single commit and push
+        Parameters:
+            entries (List[Tuple[Any, UpdateOptions, str]]): (model, options, contract_path)
+                tuples. The model can be None to update from the options, and every entry
+                needs its own contract path
+            local_repository_path (str): Absolute path to the local git repository
+                which is connected to Deeploy
+            overwrite_contract (bool, optional): Whether or not to overwrite files that are in the
+                'model' and 'explainer' folders of the contracts. Defaults to False
+            overwrite_metadata (bool, optional): Whether or not to overwrite the metadata.json
+                files. Defaults to False.
+            commit_message (str, optional): Commit message to use
+            max_workers (int, optional): Number of contracts that are prepared, and deployments
+                that are updated, at the same time. Defaults to 4
+        Returns:
+            A report with the updated deployment or the error per contract path
+        """
+        if not (self.__config.access_key and self.__config.secret_key):
+            raise Exception('Missing access credentials to update deployment.')
+        self.__check_contract_paths([contract_path for _, _, contract_path in entries])
+
+        # only import GitPython when a local repository is used
+        from deeploy.services.git_service import GitService
+        git_service = GitService(local_repository_path)
+        self.__config.repository_id = self.__prepare_repository(git_service)
+
+        def prepare(entry: Tuple[Any, UpdateOptions, str]) -> Tuple[Deployment, int, int, bool]:
+            model, options, contract_path = entry
+            current_deployment = self.__deeploy_service.get_deployment(
+                self.__config.workspace_id, options.deployment_id)
+            model_type, explainer_type, commit, _ = self.__prepare_update_contract(
+                git_service, options, local_repository_path, model, None, None, None,
+                overwrite_contract, overwrite_metadata, None, contract_path)
+            return current_deployment, model_type, explainer_type, commit
+
+        def update(entry: Tuple[Any, UpdateOptions, str], prepared: Tuple[Deployment, int, int, bool],
+                   commit_sha: str) -> Deployment:
+            _, options, contract_path = entry
+            current_deployment, model_type, explainer_type, _ = prepared
+            return self.__update_deployment(options, current_deployment, model_type, explainer_type,
+                                            commit_sha, commit_message, contract_path)
+
+        commit_message = commit_message if commit_message else \
+            '[Deeploy Client] Update %d models' % len(entries)
+        return self.__deploy_entries(git_service, entries, prepare, update, commit_message, max_workers)
+
+    def clone_repository(self, remote_url: str, contract_paths: List[str] = None, branch_name: str = None,
+                         depth: int = 1, blobless: bool = True, local_repository_path: str = None) -> str:
+        """Clone a repository into the local cache, or fetch the latest commit into a clone that
+        was made before. Pass the returned path as local_repository_path to deploy and update
+        Parameters:
+            remote_url (str): URL of the git repository that is connected to Deeploy
+            contract_paths (List[str], optional): Relative repository subpaths of the contracts
+                to check out. Defaults to checking out the whole repository
+            branch_name (str, optional): Branch to check out. Defaults to the default branch
+            depth (int, optional): Number of commits of history to fetch. Set to None to fetch
+                the whole history. Defaults to 1
+            blobless (bool, optional): Whether to only download the files that are checked out.
+                Defaults to True
+            local_repository_path (str, optional): Folder to clone into. Defaults to a folder
+                per repository in the artifact_cache_dir of the upload options
+        Returns:
+            The path of the local repository
+        """
+        if not local_repository_path:
+            if not self.__upload_options.artifact_cache_dir:
+                raise Exception('Missing a folder to clone into. Pass local_repository_path or set '
+                                'artifact_cache_dir in the upload options.')
+            local_repository_path = os.path.join(
+                os.path.expanduser(self.__upload_options.artifact_cache_dir), 'repositories',
+                hashlib.sha256(normalize_remote_url(remote_url).encode()).hexdigest()[:16])
+
+        logging.info('Fetching %s into %s...' % (remote_url, local_repository_path))
+        # only import GitPython when a local repository is used
+        from deeploy.services.git_service import GitService
+        GitService.clone(remote_url, local_repository_path, branch_name, contract_paths, depth, blobless)
+        return local_repository_path
+
+    def batch_score(self, deployment_id: str, input_path: str, output_path: str, columns: List[str] = None,
+                    keep_columns: List[str] = None, chunk_size: int = 1000, max_workers: int = 4,
+                    rows_per_file: int = 100000, use_processes: bool = False, max_processes: int = None,
+                    preprocess: Callable[[Any], Any] = None, resume: bool = True) -> int:
+        """Score a Parquet or CSV file and write the predictions to Parquet files, with the
+        requestLogId and predictionLogId of every row, in the order of the input. The input
+        is read in chunks and progress is checkpointed, so a run that fails or crashes
+        continues where it stopped when it is started again. Requires pyarrow
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            input_path (str): Path of a .parquet or .csv file
+            output_path (str): Folder for the part-<n>.parquet files and the checkpoint
+            columns (List[str], optional): Columns to send, in the order the model expects.
+                Defaults to all columns
+            keep_columns (List[str], optional): Input columns to copy to the output, for
+                example an ID column
+            chunk_size (int, optional): Number of rows in one request. Defaults to 1000
+            max_workers (int, optional): Number of requests that are sent at the same time.
+                Defaults to 4
+            rows_per_file (int, optional): Minimum number of rows in an output file. Progress
+                is checkpointed every time a file is completed. Defaults to 100000
+            use_processes (bool, optional): Whether to convert and encode the chunks in a
+                process pool, for CPU-heavy preprocessing. Defaults to False
+            max_processes (int, optional): Number of worker processes. Defaults to the
+                number of CPUs
+            preprocess (Callable, optional): Function that converts a pandas DataFrame chunk
+                to the instances to send. It has to be picklable when use_processes is set.
+                Defaults to the values of the columns
+            resume (bool, optional): Whether to continue from the checkpoint in the output
+                folder. Defaults to True
+        Returns:
+            The number of rows in the output
+        """
+        workspace_id = self.__config.workspace_id
+
+        def predict(request_body: dict) -> dict:
+            return self.__deeploy_service.predict_raw(workspace_id, deployment_id, request_body)
+
+        def predict_encoded(body: bytes, headers: dict) -> dict:
+            return self.__deeploy_service.predict_encoded(workspace_id, deployment_id, body, headers)
+
+        return score_in_chunks(
+            predict, predict_encoded, self.__deeploy_service.encoding_options, input_path, output_path,
+            columns=columns, keep_columns=keep_columns, chunk_size=chunk_size, max_workers=max_workers,
+            rows_per_file=rows_per_file, use_processes=use_processes, max_processes=max_processes,
+            preprocess=preprocess, resume=resume)
+
+    def predict_batch(self, deployment_id: str, request_bodies: List[dict],
+                      max_batch_size: int = 64) -> List[V1Prediction or V2Prediction]:
+        """Make predict calls for many request bodies with as few requests as possible
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_bodies (List[dict]): Request bodies with an 'instances' field
+            max_batch_size (int, optional): Maximum number of instances in one request.
+                Defaults to 64
+        Returns:
+            One prediction per request body, in the same order
+        """
+        workspace_id = self.__config.workspace_id
+        predictions = predict_in_batches(
+            lambda request_body: self.__deeploy_service.predict(workspace_id, deployment_id, request_body),
+            [request_body['instances'] for request_body in request_bodies],
+            max_batch_size)
+        return predictions
+
+    def batcher(self, deployment_id: str, max_batch_size: int = 64, max_delay: float = 0.01,
+                max_concurrency: int = 1) -> PredictionBatcher:
+        """Create a micro-batcher that combines concurrent predict calls into batched requests
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            max_batch_size (int, optional): Maximum number of instances in one request.
+                Defaults to 64
+            max_delay (float, optional): Maximum number of seconds a call waits for other
+                calls to join its batch. Defaults to 0.01
+            max_concurrency (int, optional): Maximum number of batched requests in flight.
+                Defaults to 1
+        """
+        workspace_id = self.__config.workspace_id
+        return PredictionBatcher(
+            lambda request_body: self.__deeploy_service.predict(workspace_id, deployment_id, request_body),
+            max_batch_size=max_batch_size, max_delay=max_delay, max_concurrency=max_concurrency)
+
+    def iter_request_logs(self, deployment_id: str, page_size: int = 100,
+                          filters: LogFilters = None, offset: int = 0) -> Iterator[RequestLog]:
+        """Iterate over request logs, retrieved page by page
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            page_size (int, optional): Number of logs retrieved per request. Defaults to 100
+            filters (LogFilters, optional): An instance of the log filters class to select logs
+                by time range, status code or commit
+            offset (int, optional): Number of logs to skip. Defaults to 0
+        """
+        workspace_id = self.__config.workspace_id
+        return self.__deeploy_service.iter_request_logs(
+            workspace_id, deployment_id, page_size, filters, offset)
+
+    def iter_prediction_logs(self, deployment_id: str, page_size: int = 100,
+                             filters: LogFilters = None, offset: int = 0) -> Iterator[PredictionLog]:
+        """Iterate over prediction logs, retrieved page by page
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            page_size (int, optional): Number of logs retrieved per request. Defaults to 100
+            filters (LogFilters, optional): An instance of the log filters class to select logs
+                by time range, status code or commit
+            offset (int, optional): Number of logs to skip. Defaults to 0
+        """
+        workspace_id = self.__config.workspace_id
+        return self.__deeploy_service.iter_prediction_logs(
+            workspace_id, deployment_id, page_size, filters, offset)
+
+    def export_prediction_logs(self, deployment_id: str, path: str, format: str = 'parquet',
+                               page_size: int = 1000, filters: LogFilters = None,
+                               cursor: str = None) -> str:
+        """Export prediction logs to a columnar file, page by page. The file is overwritten,
+        so write every incremental export to a new file
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            path (str): Path of the file to write
+            format (str, optional): One of 'parquet', 'arrow' or 'jsonl' (gzip compressed).
+                'parquet' and 'arrow' require pyarrow. Defaults to 'parquet'
+            page_size (int, optional): Number of logs retrieved per request. Defaults to 1000
+            filters (LogFilters, optional): An instance of the log filters class to select logs
+                by time range, status code or commit
+            cursor (str, optional): Cursor returned by a previous export, to only export logs
+                that were created since and were not exported before
+        Returns:
+            The cursor to pass to the next incremental export
+        """
+        workspace_id = self.__config.workspace_id
+        export_cursor = ExportCursor(cursor)
+        filters = filters if filters else LogFilters()
+        if export_cursor.created_at and (not filters.start or filters.start < export_cursor.created_at):
+            filters = filters.copy(update={'start': export_cursor.created_at})
+        pages = self.__deeploy_service.iter_prediction_log_pages(
+            workspace_id, deployment_id, page_size, filters)
+        export_prediction_log_pages(export_cursor.filter_pages(pages), path, format)
+        return export_cursor.dumps()
+
+    def bulk_evaluate(self, deployment_id: str, evaluations: Iterable[Tuple[str, str, dict]],
+                      max_workers: int = 4) -> BulkReport:
+        """Evaluate many prediction logs concurrently
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            evaluations (Iterable): Tuples of request log ID, prediction log ID and
+                evaluation input dict with result, value, and explanation
+            max_workers (int, optional): Number of evaluations submitted at the same time.
+                Defaults to 4. An evaluation is only retried when it was rejected with a 429
+                response or never reached the API, following the RetryOptions of the client
+        Returns:
+            A report with the outcome per prediction log ID
+        """
+        workspace_id = self.__config.workspace_id
+
+        def submit(chunk: List[Tuple[str, str, dict]]) -> None:
+            request_log_id, prediction_log_id, evaluation_input = chunk[0]
+            self.__deeploy_service.evaluate(workspace_id, deployment_id, request_log_id,
+                                            prediction_log_id, evaluation_input)
+
+        return submit_in_chunks(chunked(evaluations, 1), submit, lambda evaluation: evaluation[1],
+                                max_workers)
+
+    def bulk_actuals(self, deployment_id: str, actuals: Any, chunk_size: int = 1000,
+                     max_workers: int = 4) -> BulkReport:
+        """Submit actuals for many prediction logs in concurrent chunks
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            actuals (Any): Iterable of (prediction log ID, actual value) tuples, or a pandas
+                DataFrame with the prediction log IDs in the first column and the actual
+                values in the second, i.e. ('e9c1...', {"predictions": [True]})
+            chunk_size (int, optional): Number of actuals per request. Defaults to 1000
+            max_workers (int, optional): Number of requests submitted at the same time.
+                Defaults to 4. Failed requests are retried following the RetryOptions of
+                the client
+        Returns:
+            A report with the outcome per prediction log ID
+        """
+        workspace_id = self.__config.workspace_id
+
+        def submit(chunk: List[Tuple[str, Any]]) -> None:
+            actuals_input = {
+                'predictionIds': [prediction_log_id for prediction_log_id, _ in chunk],
+                'actualValues': [actual_value for _, actual_value in chunk],
+            }
+            self.__deeploy_service.actuals(workspace_id, deployment_id, actuals_input)
+
+        return submit_in_chunks(chunked(iter_pairs(actuals), chunk_size), submit, lambda actual: actual[0],
+                                max_workers)
+
+    def __prepare_repository(self, git_service: 'GitService', pull: bool = True) -> str:
         repository_in_workspace, repository_id = self.__is_git_repository_in_workspace(git_service)
 
         if not repository_in_workspace:
             raise Exception(
                 'Repository was not found in the Deeploy workspace. \
                  Make sure you have connected it before.')
-        else:
-            self.__config.repository_id = repository_id
 
+        if not pull:
+            return repository_id
         logging.info('Pulling from the remote repository...')
         git_service.pull()
         logging.info('Successfully pulled from the remote repository.')
+        return repository_id
+
+    def __check_contract_paths(self, contract_paths: List[str]) -> None:
+        normalized_paths = [os.path.normpath(contract_path) for contract_path in contract_paths]
+        if len(set(normalized_paths)) != len(normalized_paths):
+            raise Exception('Every entry needs its own contract path.')
+        return
+
+    def __prepare_deploy_contract(
+            self, git_service: 'GitService', options: DeployOptions, local_repository_path: str,
+            model: Any, explainer: Any, model_type: int, explainer_type: int,
+            overwrite_contract: bool, overwrite_metadata: bool, commit_message: str,
+            contract_path: str) -> Tuple[int, int, bool, str]:
+        commit = False
 
         if model:
             model_type = self.__process_model(
@@ -125,6 +635,7 @@ class Client(object):
                 self.__create_reference_file(
                     model_folder, blobReference=options.model_blob_config)
             git_service.add_folder_to_staging(os.path.join(contract_path, 'model'))
+            self.__store_fingerprint(git_service, local_repository_path, contract_path, 'model')
             commit = True
         else:
             reference_path = os.path.join(
@@ -134,16 +645,8 @@ class Client(object):
 
             try:
                 with open(reference_path) as referenceFile:
-                    data = json.load(referenceFile)
-                    if 'reference' in data:
-                        if "blob" in data['reference']:
-                            model_type = model_type
-                        elif "docker" in data['reference']:
-                            model_type = ModelType.CUSTOM.value
-                        else:
-                            raise Exception('No information on to be deployed model available.')
-                    else:
-                        raise Exception('No information on to be deployed model available.')
+                    model_type = self.__get_reference_type(
+                        json.load(referenceFile), model_type, ModelType.CUSTOM.value, 'model')
             except IOError:
                 raise Exception('Failed to deploy model from reference.json file.')
 
@@ -151,8 +654,8 @@ class Client(object):
 
         if explainer:
             explainer_type = self.__process_explainer(
-                explainer, local_repository_path, git_service, overwrite_contract,
-                contract_path)
+                explainer, git_service, local_repository_path, overwrite_contract,
+                contract_path).value
             commit_message += ' and explainer' if not commit_message else ''
             commit = True
         elif options.explainer_docker_config or options.explainer_blob_config:
@@ -171,6 +674,7 @@ class Client(object):
                 self.__create_reference_file(
                     explainer_folder, blobReference=options.explainer_blob_config)
             git_service.add_folder_to_staging(os.path.join(contract_path, 'explainer'))
+            self.__store_fingerprint(git_service, local_repository_path, contract_path, 'explainer')
             commit_message += ' and explainer' if not commit_message else ''
             commit = True
         else:
@@ -179,16 +683,8 @@ class Client(object):
 
             try:
                 with open(reference_path) as referenceFile:
-                    data = json.load(referenceFile)
-                    if 'reference' in data:
-                        if "blob" in data['reference']:
-                            explainer_type = explainer_type
-                        elif "docker" in data['reference']:
-                            explainer_type = ExplainerType.CUSTOM.value
-                        else:
-                            raise Exception('No information on to be deployed explainer available.')
-                    else:
-                        raise Exception('No information on to be deployed explainer available.')
+                    explainer_type = self.__get_reference_type(
+                        json.load(referenceFile), explainer_type, ExplainerType.CUSTOM.value, 'explainer')
             except IOError:
                 explainer_type = ExplainerType.NO_EXPLAINER.value
 
@@ -196,110 +692,22 @@ class Client(object):
         self.__prepare_metadata_file(metadata_path, options.feature_labels, options.problem_type,
                                      options.prediction_classes, overwrite_metadata)
         git_service.add_folder_to_staging(os.path.join(contract_path, 'metadata.json'))
+        return model_type, explainer_type, commit, commit_message
 
-        if commit:
-            logging.info('Committing and pushing the result to the remote.')
-            commit_sha = git_service.commit(commit_message)
-            git_service.push()
-        else:
-            commit_sha = Repo(local_repository_path).head.commit.hexsha
-
-        deployment_options = {
-            'name': options.name,
-            'description': options.description,
-            'repository_id': self.__config.repository_id,
-            'example_input': options.example_input,
-            'example_output': options.example_output,
-            'model_type': model_type,
-            'model_serverless': options.model_serverless,
-            'model_instance_type': options.model_instance_type,
-            'model_cpu_limit': options.model_cpu_limit,
-            'model_cpu_request': options.model_cpu_request,
-            'model_mem_limit': options.model_mem_limit,
-            'model_mem_request': options.model_mem_request,
-            'branch_name': git_service.get_current_branch_name(),
-            'commit': commit_sha,
-            'explainer_type': explainer_type,
-            'explainer_serverless': options.explainer_serverless,
-            'explainer_instance_type': options.explainer_instance_type,
-            'explainer_cpu_limit': options.explainer_cpu_limit,
-            'explainer_cpu_request': options.explainer_cpu_request,
-            'explainer_mem_limit': options.explainer_mem_limit,
-            'explainer_mem_request': options.explainer_mem_request,
-            'contract_path': contract_path,
-            'tags': {'primary': options.custom_id, 'secondary': []},
-        }
-
-        deployment = self.__deeploy_service.create_deployment(
-            self.__config.workspace_id, CreateDeployment(**deployment_options))
-
-        return deployment
-
-    def update(self, options: UpdateOptions, local_repository_path: str = None,
-               model: Any = None, explainer: Any = None, model_type: int = None,
-               explainer_type: int = None, overwrite_contract: bool = False,
-               overwrite_metadata: bool = False, commit_sha: str = None, commit_message: str = None,
-               contract_path: str = "") -> Deployment:
-        """Update a model on Deeploy
-        Parameters:
-            model (Any): The class instance of an ML model
-            options (UpdateOptions): An instance of the update options class
-                containing the update options
-            local_repository_path (str): Absolute path to the local git repository
-                which is connected to Deeploy
-            explainer (Any, optional): The class instance of an optional model explainer
-            model_type (int, optional): model type enum from ModelType class
-            explainer_type (int, optional): mopel type enum from ExplainerType class
-            overwrite_contract (bool, optional): Whether or not to overwrite files that are in the
-                'model' and 'explainer' folders in the git folder. Defaults to False
-            overwrite_metadata (bool, optional): Whether or not to overwrite the metadata.json
-                file. Defaults to False.
-            commit_sha (str, optional): Commit SHA to update to
-            commit_message (str, optional): Commit message to use
-            contract_path (str, optional): Relative repository subpath that contains the
-                Deeploy contract to deploy from
-        """
-        if not (self.__config.access_key and self.__config.secret_key):
-            raise Exception('Missing access credentials to update deployment.')
-
-        if not (self.__deeploy_service.get_deployment(self.__config.workspace_id,
-                                                      options.deployment_id)):
-            raise Exception(
-                'Deployment was not found in the Deeploy workspace. \
-                 Make sure the Deployment Id is correct.')
-
-        git_service = GitService(local_repository_path)
-
-        current_deployment = self.__deeploy_service.get_deployment(
-            self.__config.workspace_id, options.deployment_id)
-
+    def __prepare_update_contract(
+            self, git_service: 'GitService', options: UpdateOptions, local_repository_path: str,
+            model: Any, explainer: Any, model_type: int, explainer_type: int,
+            overwrite_contract: bool, overwrite_metadata: bool, commit_message: str,
+            contract_path: str) -> Tuple[int, int, bool, str]:
         commit = False
 
         if (model or explainer):
-            if (local_repository_path is None):
-                raise Exception(
-                    'Local repository path is required to update \
-                     the model or explainer.')
-            else:
-                repository_in_workspace, repository_id = \
-                    self.__is_git_repository_in_workspace(git_service)
-
-            if not repository_in_workspace:
-                raise Exception(
-                    'Repository was not found in the Deeploy workspace. \
-                     Make sure you have connected it before.')
-
-            self.__config.repository_id = repository_id
-
             commit = True
-            logging.info('Pulling from the remote repository...')
-            git_service.pull()
-            logging.info('Successfully pulled from the remote repository.')
 
             if model:
-                model_wrapper = self.__process_model(
-                    model, options, local_repository_path, git_service, overwrite_contract, contract_path)
-                model_type = model_wrapper.get_model_type().value
+                model_type = self.__process_model(
+                    model, options, local_repository_path, git_service, overwrite_contract,
+                    contract_path).value
                 commit_message = '[Deeploy Client] Add new model' if not commit_message else commit_message
             else:
                 # TODO: read existing reference.json and check if its a blob url or image
@@ -307,9 +715,9 @@ class Client(object):
                 model_type = model_type if model_type else ModelType.CUSTOM.value
 
             if explainer:
-                explainer_wrapper = self.__process_explainer(
-                    explainer, git_service, local_repository_path, overwrite_contract, contract_path)
-                explainer_type = explainer_wrapper.get_explainer_type().value
+                explainer_type = self.__process_explainer(
+                    explainer, git_service, local_repository_path, overwrite_contract,
+                    contract_path).value
                 if explainer_type != ExplainerType.NO_EXPLAINER.value:
                     commit_message += ' and explainer' if not commit_message else ''
             else:
@@ -334,6 +742,7 @@ class Client(object):
                 self.__create_reference_file(
                     model_folder, blobReference=options.model_blob_config)
             git_service.add_folder_to_staging(os.path.join(contract_path, 'model'))
+            self.__store_fingerprint(git_service, local_repository_path, contract_path, 'model')
             commit = True
 
         # process explainer reference.json
@@ -353,6 +762,7 @@ class Client(object):
                 self.__create_reference_file(
                     explainer_folder, blobReference=options.explainer_blob_config)
             git_service.add_folder_to_staging(os.path.join(contract_path, 'explainer'))
+            self.__store_fingerprint(git_service, local_repository_path, contract_path, 'explainer')
             commit_message += ' and explainer' if not commit_message else ''
             commit = True
 
@@ -360,21 +770,224 @@ class Client(object):
         self.__prepare_metadata_file(metadata_path, options.feature_labels, options.problem_type,
                                      options.prediction_classes, overwrite_metadata)
         git_service.add_folder_to_staging(os.path.join(contract_path, 'metadata.json'))
+        return model_type, explainer_type, commit, commit_message
+
+    def __commit_and_push(self, git_service: 'GitService', commit: bool, commit_message: str,
+                          contract_paths: List[str]) -> str or None:
+        if commit and not any(git_service.has_staged_changes(contract_path)
+                              for contract_path in contract_paths):
+            logging.info('The contract did not change, skipping the commit and push.')
+            commit = False
+
+        if not commit:
+            return None
+        logging.info('Committing and pushing the result to the remote.')
+        commit_sha = git_service.commit(commit_message)
+        git_service.push()
+        return commit_sha
+
+    def __commit_contract_to_branch(
+            self, git_service: 'GitService', target_branch: str, options: DeployOptions or UpdateOptions,
+            local_repository_path: str, model: Any, explainer: Any, model_type: int,
+            explainer_type: int, overwrite_contract: bool, overwrite_metadata: bool, commit_message: str,
+            contract_path: str, require_model_reference: bool) -> Tuple[int, int, str]:
+        contract_path = contract_path.replace(os.sep, '/').strip('/')
+        logging.info('Fetching branch %s from the remote repository...' % target_branch)
+        parent_sha = git_service.fetch_branch(target_branch) or git_service.get_head_commit_sha()
+
+        savers = {}
+        if model:
+            # only import the model helpers when a model is saved
+            from deeploy.services.model_wrapper import ModelWrapper
+            model_wrapper = ModelWrapper(
+                model,
+                pytorch_model_file_path=options.pytorch_model_file_path,
+                pytorch_torchserve_handler_name=options.pytorch_torchserve_handler_name,
+                pytorch_archive_compression_level=options.pytorch_archive_compression_level)
+            savers['model'] = (model_wrapper.save, lambda: {
+                'model_type': model_wrapper.get_model_type().value,
+                'pytorch_model_file_path': options.pytorch_model_file_path,
+                'pytorch_torchserve_handler_name': options.pytorch_torchserve_handler_name})
+        if explainer:
+            # only import the explainer helpers when an explainer is saved
+            from deeploy.services.explainer_wrapper import ExplainerWrapper
+            explainer_wrapper = ExplainerWrapper(explainer)
+            savers['explainer'] = (explainer_wrapper.save, lambda: {
+                'explainer_type': explainer_wrapper.get_explainer_type().value})
+
+        # the serialized artifacts only live in a temporary folder until they are uploaded.
+        # They are saved and uploaded once, but the contract files are built again on every
+        # parent commit a push is tried on, so that the checks, the fingerprints and the
+        # metadata of a concurrent deploy to the branch are not overwritten
+        types = {'model': model_type, 'explainer': explainer_type}
+        with self.__temporary_directory() as temporary_folder:
+            artifacts = {}
+
+            def get_files(parent_sha: str) -> Dict[str, Optional[bytes]]:
+                files, types['model'], types['explainer'] = self.__get_branch_files(
+                    git_service, parent_sha, options, savers, model_type, explainer_type,
+                    overwrite_contract, overwrite_metadata, contract_path, require_model_reference,
+                    temporary_folder, artifacts)
+                return files
+
+            logging.info('Committing the contract and pushing branch %s to the remote.' % target_branch)
+            commit_sha = git_service.commit_files_to_branch(
+                target_branch, get_files,
+                commit_message if commit_message else '[Deeploy Client] Add new model', parent_sha=parent_sha)
+        return types['model'], types['explainer'], commit_sha
+
+    def __get_branch_files(
+            self, git_service: 'GitService', parent_sha: str, options: DeployOptions or UpdateOptions,
+            savers: dict, model_type: int, explainer_type: int, overwrite_contract: bool,
+            overwrite_metadata: bool, contract_path: str, require_model_reference: bool,
+            temporary_folder: str, artifacts: dict) -> Tuple[Dict[str, Optional[bytes]], int, int]:
+        # the contract files are collected in memory and written to the object database
+        files = {}
+        fingerprints = read_committed_fingerprints(git_service, parent_sha, contract_path)
+        stored_fingerprints = dict(fingerprints)
+
+        if 'model' in savers:
+            model_type = self.__process_branch_folder(
+                git_service, parent_sha, contract_path, 'model', savers['model'], overwrite_contract,
+                fingerprints, files, temporary_folder, artifacts)['model_type']
+        elif options.model_docker_config or options.model_blob_config:
+            self.__check_branch_folder(git_service, parent_sha, contract_path, 'model', overwrite_contract)
+            model_type = ModelType.CUSTOM.value if options.model_docker_config else model_type
+            self.__set_branch_reference(
+                contract_path, 'model', files, fingerprints,
+                self.__get_reference_json(options.model_docker_config, options.model_blob_config))
+        else:
+            reference = git_service.read_file(
+                parent_sha, posixpath.join(contract_path, 'model', 'reference.json'))
+            if reference:
+                model_type = self.__get_reference_type(
+                    json.loads(reference), model_type, ModelType.CUSTOM.value, 'model')
+            elif require_model_reference:
+                raise Exception('Missing model reference file in repository.')
 
-        if commit:
-            logging.info('Committing and pushing the result to the remote.')
-            commit_sha = git_service.commit(commit_message)
-            git_service.push()
+        if 'explainer' in savers:
+            explainer_type = self.__process_branch_folder(
+                git_service, parent_sha, contract_path, 'explainer', savers['explainer'],
+                overwrite_contract, fingerprints, files, temporary_folder, artifacts)['explainer_type']
+        elif options.explainer_docker_config or options.explainer_blob_config:
+            self.__check_branch_folder(
+                git_service, parent_sha, contract_path, 'explainer', overwrite_contract)
+            explainer_type = ExplainerType.CUSTOM.value if options.explainer_docker_config \
+                else explainer_type
+            self.__set_branch_reference(
+                contract_path, 'explainer', files, fingerprints,
+                self.__get_reference_json(options.explainer_docker_config, options.explainer_blob_config))
         else:
-            commit_sha = Repo(local_repository_path).head.commit.hexsha if commit_sha is None else commit_sha
+            reference = git_service.read_file(
+                parent_sha, posixpath.join(contract_path, 'explainer', 'reference.json'))
+            if reference:
+                explainer_type = self.__get_reference_type(
+                    json.loads(reference), explainer_type, ExplainerType.CUSTOM.value, 'explainer')
+            elif require_model_reference:
+                explainer_type = ExplainerType.NO_EXPLAINER.value
 
-        self.__config.repository_id = current_deployment.active_version['repositoryId']
+        metadata_path = posixpath.join(contract_path, 'metadata.json')
+        if overwrite_metadata or git_service.read_file(parent_sha, metadata_path) is None:
+            files[metadata_path] = json.dumps(self.__get_metadata(
+                options.feature_labels, options.problem_type, options.prediction_classes)).encode()
+        if fingerprints != stored_fingerprints:
+            files[posixpath.join(contract_path, FINGERPRINT_FILE)] = json.dumps(
+                fingerprints, sort_keys=True, indent=2).encode()
+        return files, model_type, explainer_type
+
+    def __check_branch_folder(self, git_service: 'GitService', commit_sha: str, contract_path: str,
+                              folder_name: str, overwrite_contract: bool) -> None:
+        folder_path = posixpath.join(contract_path, folder_name)
+        if not overwrite_contract and git_service.folder_exists(commit_sha, folder_path):
+            raise Exception(
+                'The folder %s is not empty. Pass \'overwrite=True\' to overwrite contents.' % folder_path)
+        return
+
+    def __process_branch_folder(self, git_service: 'GitService', commit_sha: str, contract_path: str,
+                                folder_name: str, saver: Tuple[Callable[[str], None], Callable[[], dict]],
+                                overwrite_contract: bool, fingerprints: dict, files: dict,
+                                temporary_folder: str, artifacts: dict) -> dict:
+        self.__check_branch_folder(git_service, commit_sha, contract_path, folder_name, overwrite_contract)
+        local_folder = os.path.join(temporary_folder, folder_name)
+        if folder_name not in artifacts:
+            save, get_settings = saver
+            logging.info('Saving the %s to a temporary folder...' % folder_name)
+            os.mkdir(local_folder)
+            save(local_folder)
+            settings = get_settings()
+            folder_hash = hash_folder(local_folder, self.__upload_options.max_workers)
+            artifacts[folder_name] = {'settings': settings, 'folder_hash': folder_hash,
+                                      'fingerprint': get_fingerprint(folder_hash, settings),
+                                      'blob_storage_link': None}
+        artifact = artifacts[folder_name]
+        if fingerprints.get(folder_name) == artifact['fingerprint'] and \
+                git_service.folder_exists(commit_sha, posixpath.join(contract_path, folder_name)):
+            logging.info('The %s did not change, keeping the committed %s reference.' %
+                         (folder_name, folder_name))
+            return artifact['settings']
+        if artifact['blob_storage_link'] is None:
+            artifact['blob_storage_link'] = self.__upload_folder_to_blob(
+                temporary_folder, local_folder, posixpath.join(contract_path, folder_name),
+                artifact['folder_hash'])
+        self.__set_branch_reference(
+            contract_path, folder_name, files, fingerprints,
+            self.__get_reference_json(blobReference=BlobReference(url=artifact['blob_storage_link'])),
+            artifact['fingerprint'])
+        return artifact['settings']
+
+    def __set_branch_reference(self, contract_path: str, folder_name: str, files: dict, fingerprints: dict,
+                               reference_json: dict, fingerprint: str = None) -> None:
+        folder_path = posixpath.join(contract_path, folder_name)
+        # the folder is replaced as a whole by a folder with only the reference file
+        files[folder_path] = None
+        files[posixpath.join(folder_path, 'reference.json')] = json.dumps(reference_json).encode()
+        if fingerprint:
+            fingerprints[folder_name] = fingerprint
+        else:
+            fingerprints.pop(folder_name, None)
+        return
+
+    def __get_create_deployment(self, options: DeployOptions, model_type: int, explainer_type: int,
+                                branch_name: str, commit_sha: str, contract_path: str) -> CreateDeployment:
+        deployment_options = {
+            'name': options.name,
+            'description': options.description,
+            'repository_id': self.__config.repository_id,
+            'example_input': options.example_input,
+            'example_output': options.example_output,
+            'model_type': model_type,
+            'model_serverless': options.model_serverless,
+            'model_instance_type': options.model_instance_type,
+            'model_cpu_limit': options.model_cpu_limit,
+            'model_cpu_request': options.model_cpu_request,
+            'model_mem_limit': options.model_mem_limit,
+            'model_mem_request': options.model_mem_request,
+            'branch_name': branch_name,
+            'commit': commit_sha,
+            'explainer_type': explainer_type,
+            'explainer_serverless': options.explainer_serverless,
+            'explainer_instance_type': options.explainer_instance_type,
+            'explainer_cpu_limit': options.explainer_cpu_limit,
+            'explainer_cpu_request': options.explainer_cpu_request,
+            'explainer_mem_limit': options.explainer_mem_limit,
+            'explainer_mem_request': options.explainer_mem_request,
+            'contract_path': contract_path,
+            'tags': {'primary': options.custom_id, 'secondary': []},
+        }
+        return CreateDeployment(**deployment_options)
+
+    def __update_deployment(self, options: UpdateOptions, current_deployment: Deployment,
+                            model_type: int, explainer_type: int, commit_sha: str,
+                            commit_message: str, contract_path: str, branch_name: str = None) -> Deployment:
+        if self.__prediction_cache and commit_sha != (current_deployment.active_version or {}).get('commit'):
+            self.__prediction_cache.invalidate(options.deployment_id)
+            self.__deployment_commits[options.deployment_id] = commit_sha
 
         update_options = {
             'deployment_id': options.deployment_id,
             'name': options.name,
             'description': options.description,
-            'repository_id': self.__config.repository_id,
+            'repository_id': current_deployment.active_version['repositoryId'],
             'example_input': options.example_input,
             'example_output': options.example_output,
             'model_type': model_type,
@@ -384,6 +997,7 @@ class Client(object):
             'model_cpu_request': options.model_cpu_request,
             'model_mem_limit': options.model_mem_limit,
             'model_mem_request': options.model_mem_request,
+            'branch_name': branch_name,
             'commit': commit_sha,
             'commit_message': commit_message,
             'explainer_type': explainer_type,
@@ -408,87 +1022,66 @@ class Client(object):
 
         return updated_deployment
 
-    def predict(self, deployment_id: str, request_body: dict) -> V1Prediction or V2Prediction:
-        """Make a predict call
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-            request_body (dict): Request body with input data for the model
-        """
-
-        workspace_id = self.__config.workspace_id
-        prediction = self.__deeploy_service.predict(workspace_id, deployment_id, request_body)
-        return prediction
-
-    def explain(self, deployment_id: str, request_body: dict, image: bool = False) -> object:
-        """Make an explain call
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-            request_body (dict): Request body with input data for the model
-            image (bool): Return image or not
-        """
-        workspace_id = self.__config.workspace_id
-        explanation = self.__deeploy_service.explain(
-            workspace_id, deployment_id, request_body, image)
-        return explanation
-
-    def getRequestLogs(self, deployment_id: str) -> RequestLogs:
-        """Retrieve request logs
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-        """
-        workspace_id = self.__config.workspace_id
-        requestLogs = self.__deeploy_service.getRequestLogs(workspace_id, deployment_id)
-        return requestLogs
-
-    def getPredictionLogs(self, deployment_id: str) -> PredictionLogs:
-        """Retrieve prediction logs
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-        """
-        workspace_id = self.__config.workspace_id
-        predictionLogs = self.__deeploy_service.getPredictionLogs(workspace_id, deployment_id)
-        return predictionLogs
-
-    def getOnePredictionLog(self, deployment_id: str, request_log_id: str,
-                            prediction_log_id: str) -> PredictionLog:
-        """Retrieve one log
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-            request_log_id (str): ID of the request_log containing the prediction
-            prediction_log_id (str): ID of the prediction_log to be retrieved
-        """
-        workspace_id = self.__config.workspace_id
-        predictionLog = self.__deeploy_service.getOnePredictionLog(workspace_id, deployment_id,
-                                                                   request_log_id, prediction_log_id)
-        return predictionLog
-
-    def evaluate(self, deployment_id: str, request_log_id: str, prediction_log_id: str,
-                 evaluation_input: dict) -> None:
-        """Evaluate a prediction log
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-            log_id (int): ID of the log to be evaluated
-            evaluation_input: Dict with result, value, and explanation
-        """
-        workspace_id = self.__config.workspace_id
-        self.__deeploy_service.evaluate(workspace_id, deployment_id,
-                                        request_log_id, prediction_log_id,
-                                        evaluation_input)
-
-    def actuals(self, deployment_id: str, actuals_input: dict) -> None:
-        """Evaluate a prediction log
-        Parameters:
-            deployment_id (str): ID of the Deeploy deployment
-            actuals_input (dict): Object with predictionIds and actualsValues
-                                 where the order of the values will match
-                                 predictions with the actuals
-                                 {
-                                    "predictionIds": [],
-                                    "actualValues": {"predictions" | "output": []}
-                                 }
-        """
-        workspace_id = self.__config.workspace_id
-        self.__deeploy_service.actuals(workspace_id, deployment_id, actuals_input)
+    def __deploy_entries(self, git_service: 'GitService', entries: List[Tuple[Any, Any, str]],
+                         prepare: Callable[[Tuple[Any, Any, str]], tuple],
+                         apply: Callable[[Tuple[Any, Any, str], tuple, str], Deployment],
+                         commit_message: str, max_workers: int) -> DeploymentReport:
+        contract_paths = [contract_path for _, _, contract_path in entries]
+        errors = {}
+        prepared = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            prepare_futures = [executor.submit(prepare, entry) for entry in entries]
+        for index, future in enumerate(prepare_futures):
+            try:
+                prepared[index] = future.result()
+            except Exception as e:
+                errors[index] = str(e)
+                # the changes of a contract that failed are kept out of the shared commit
+                git_service.reset_staging(contract_paths[index])
+
+        commit = any(result[-1] for result in prepared.values())
+        commit_sha = self.__commit_and_push(
+            git_service, commit, commit_message, [contract_paths[index] for index in prepared])
+        commit_sha = commit_sha if commit_sha else git_service.get_head_commit_sha()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            apply_futures = {index: executor.submit(apply, entries[index], prepared[index], commit_sha)
+                             for index in prepared}
+        results = []
+        for index, contract_path in enumerate(contract_paths):
+            if index in apply_futures:
+                try:
+                    deployment = apply_futures[index].result()
+                    results.append(DeploymentResult.construct(
+                        contract_path=contract_path, success=True, error=None, deployment=deployment))
+                    continue
+                except Exception as e:
+                    errors[index] = str(e)
+            results.append(DeploymentResult.construct(
+                contract_path=contract_path, success=False, error=errors[index], deployment=None))
+
+        succeeded = sum(1 for result in results if result.success)
+        return DeploymentReport.construct(succeeded=succeeded, failed=len(results) - succeeded,
+                                          commit=commit_sha, results=results)
+
+    def _get_cache_commit(self, deployment_id: str) -> Optional[str]:
+        return self.__get_active_commit(deployment_id)
+
+    def __get_active_commit(self, deployment_id: str) -> str or None:
+        if deployment_id not in self.__deployment_commits:
+            commit = None
+            # the active commit can only be looked up with access keys, with a deployment
+            # token the cached responses are only bounded by their time to live
+            if self.__config.access_key and self.__config.secret_key:
+                try:
+                    deployment = self.__deeploy_service.get_deployment(
+                        self.__config.workspace_id, deployment_id)
+                    commit = (deployment.active_version or {}).get('commit')
+                except Exception as e:
+                    logging.warning('Failed to look up the active commit of deployment %s. Reason: %s'
+                                    % (deployment_id, e))
+            self.__deployment_commits[deployment_id] = commit
+        return self.__deployment_commits[deployment_id]
 
     def __are_clientoptions_valid(self, config: ClientConfig) -> bool:
         """Check if the supplied options are valid
@@ -500,39 +1093,29 @@ class Client(object):
 
         return True
 
-    def __is_git_repository_in_workspace(self, git_service: GitService) -> Tuple[bool, str]:
+    def __is_git_repository_in_workspace(self, git_service: 'GitService') -> Tuple[bool, str]:
         remote_url = git_service.get_remote_url()
         workspace_id = self.__config.workspace_id
+        workspace_key = '%s/%s' % (self.__config.host, workspace_id)
 
-        repositories = self.__deeploy_service.get_repositories(workspace_id)
+        if self.__repository_index:
+            repository_id = self.__repository_index.get(workspace_key, remote_url)
+            if repository_id:
+                return True, repository_id
 
-        correct_repositories = list(
-            filter(lambda x: x.remote_path == self.__parse_url_ssh_to_https(remote_url) or
-                   x.remote_path == remote_url, repositories))
+        repositories = self.__deeploy_service.get_repositories(workspace_id)
+        repository_ids = {normalize_remote_url(repository.remote_path): repository.id
+                          for repository in reversed(repositories)}
+        if self.__repository_index:
+            self.__repository_index.put(workspace_key, repository_ids)
 
-        if len(correct_repositories) != 0:
-            repository_id = correct_repositories[0].id
+        repository_id = repository_ids.get(normalize_remote_url(remote_url))
+        if repository_id:
             return True, repository_id
 
         return False, None
 
-    def __parse_url_ssh_to_https(self, remote_path: str) -> str or None:
-        if (remote_path[:4] != 'git@'):
-            # https to ssh
-            path_tokens = remote_path.split('/')
-            provider = path_tokens[2]
-            user = path_tokens[3]
-            path = path_tokens[4:]
-            link = "git@" + provider + ":" + user
-            for sub_directory in path:
-                link += "/" + sub_directory
-        else:
-            # ssh to https
-            path_tokens = remote_path.split('@')
-            link = "https://" + path_tokens[1].replace(':', '/')
-        return link
-
-    def __prepare_model_directory(self, git_service: GitService, local_repository_path: str,
+    def __prepare_model_directory(self, git_service: 'GitService', local_repository_path: str,
                                   contract_path: str, overwrite_contract) -> None:
         model_folder_path = os.path.join(
             local_repository_path, contract_path, 'model')
@@ -548,12 +1131,12 @@ class Client(object):
                     'The folder %s is not empty. Pass \'overwrite=True\' to overwrite contents.' %
                     model_folder_path)
             delete_all_contents_in_directory(model_folder_path)
-            git_service.delete_folder_from_staging('model')
+            git_service.delete_folder_from_staging(os.path.join(contract_path, 'model'))
         else:  # folder exists and empty
             pass
         return
 
-    def __prepare_explainer_directory(self, git_service: GitService, local_repository_path: str,
+    def __prepare_explainer_directory(self, git_service: 'GitService', local_repository_path: str,
                                       contract_path: str, overwrite_contract) -> None:
         explainer_folder_path = os.path.join(
             local_repository_path, contract_path, 'explainer')
@@ -569,7 +1152,7 @@ class Client(object):
                     'The folder %s is not empty. Pass \'overwrite=True\' to overwrite contents.' %
                     explainer_folder_path)
             delete_all_contents_in_directory(explainer_folder_path)
-            git_service.delete_folder_from_staging('explainer')
+            git_service.delete_folder_from_staging(os.path.join(contract_path, 'explainer'))
         else:  # folder exists and empty
             pass
         return
@@ -577,6 +1160,16 @@ class Client(object):
     def __prepare_metadata_file(self, path: str, feature_labels=None,
                                 problem_type=None, prediction_classes=None,
                                 overwrite_metadata=False) -> None:
+        if file_exists(path) and not overwrite_metadata:
+            pass
+        else:
+            try:
+                with open(path, 'w') as f:
+                    json.dump(self.__get_metadata(feature_labels, problem_type, prediction_classes), f)
+            except OSError:
+                logging.error("Creation of the file %s failed" % path)
+
+    def __get_metadata(self, feature_labels=None, problem_type=None, prediction_classes=None) -> dict:
         data = {
             'featureLabels': [],
             'problemType': {},
@@ -589,15 +1182,7 @@ class Client(object):
             data['problemType'] = problem_type
         if prediction_classes:
             data['predictionClasses'] = prediction_classes
-
-        if file_exists(path) and not overwrite_metadata:
-            pass
-        else:
-            try:
-                with open(path, 'w') as f:
-                    json.dump(data, f)
-            except OSError:
-                logging.error("Creation of the file %s failed" % path)
+        return data
 
     def __get_upload_size(self, local_folder_path: str) -> int:
         total_file_sizes = 0
@@ -608,27 +1193,62 @@ class Client(object):
                 total_file_sizes += file_size
         return total_file_sizes
 
-    def __upload_folder_to_blob(self, local_repository_path: str, local_folder_path: str) -> str:
-        upload_locations = list()
+    def __upload_folder_to_blob(self, local_repository_path: str, local_folder_path: str,
+                                relative_folder_path: str = None, folder_hash: str = None) -> str:
+        if self.__artifact_cache:
+            if folder_hash is None:
+                folder_hash = hash_folder(local_folder_path, self.__upload_options.max_workers)
+            cache_key = '%s/%s/%s/%s' % (
+                self.__config.host, self.__config.workspace_id, self.__config.repository_id, folder_hash)
+            blob_folder_path = self.__artifact_cache.get(cache_key)
+            if blob_folder_path:
+                logging.info('The contents of %s were uploaded before, reusing %s.' %
+                             (local_folder_path, blob_folder_path))
+                return blob_folder_path
+
         blob_folder_uuid = str(uuid.uuid4())
-        relative_folder_path = os.path.relpath(local_folder_path, local_repository_path)
+        if relative_folder_path is None:
+            relative_folder_path = os.path.relpath(local_folder_path, local_repository_path)
+        uploads = list()
         for root, _, files in os.walk(local_folder_path):
             for single_file in files:
                 relative_file_path = os.path.join(
                     relative_folder_path, os.path.relpath(root, local_folder_path))
                 file_path = os.path.join(root, single_file)
-                blob_file_location = self.__deeploy_service.upload_blob_file(
-                    file_path,
-                    relative_file_path,
-                    self.__config.workspace_id,
-                    self.__config.repository_id,
-                    blob_folder_uuid)
-                upload_locations.append(blob_file_location)
+                uploads.append((file_path, relative_file_path))
+
+        progress = UploadProgress(self.__get_upload_size(local_folder_path),
+                                  self.__upload_options.progress_callback)
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.__upload_options.max_workers) as executor:
+            upload_locations = list(executor.map(
+                lambda upload: self.__upload_file_to_blob(*upload, blob_folder_uuid, progress), uploads))
+        duration = max(time.monotonic() - start_time, 1e-6)
+        logging.info('Uploaded %.1f MB in %.1f seconds (%.1f MB/s).' % (
+            progress.total_bytes / 1e6, duration, progress.total_bytes / 1e6 / duration))
 
         partition = upload_locations[0].partition(relative_folder_path)
         blob_folder_path = partition[0] + partition[1]
+        if self.__artifact_cache:
+            self.__artifact_cache.put(cache_key, blob_folder_path)
         return blob_folder_path
 
+    def __upload_file_to_blob(self, file_path: str, relative_file_path: str,
+                              blob_folder_uuid: str, progress: UploadProgress) -> str:
+        return retry_call(
+            lambda: self.__deeploy_service.upload_blob_file(
+                file_path,
+                relative_file_path,
+                self.__config.workspace_id,
+                self.__config.repository_id,
+                blob_folder_uuid,
+                chunk_size=self.__upload_options.chunk_size,
+                progress_callback=progress.file_callback(file_path)),
+            self.__upload_options.max_retries,
+            self.__upload_options.retry_backoff,
+            'Upload of %s' % file_path,
+            is_transient_error)
+
     def __remove_null_values(self, d: dict) -> dict:
         def empty(x):
             return x is None or x == {} or x == []
@@ -645,6 +1265,12 @@ class Client(object):
                                 blobReference: BlobReference = None) -> None:
         file_path = os.path.join(local_folder_path, 'reference.json')
 
+        with open(file_path, 'w') as outfile:
+            json.dump(self.__get_reference_json(dockerReference, blobReference), outfile)
+        return
+
+    def __get_reference_json(self, dockerReference: DockerReference = None,
+                             blobReference: BlobReference = None) -> dict:
         reference_json = {
             'reference': {
                 'docker': {
@@ -662,45 +1288,124 @@ class Client(object):
         reference_json = self.__remove_null_values(reference_json)
 
         data = parse_obj_as(ModelReferenceJson, reference_json)
+        return data.dict()
 
-        with open(file_path, 'w') as outfile:
-            json.dump(data.dict(), outfile)
-        return
+    def __get_reference_type(self, data: dict, blob_type: int, docker_type: int, folder_name: str) -> int:
+        if 'reference' in data:
+            if "blob" in data['reference']:
+                return blob_type
+            elif "docker" in data['reference']:
+                return docker_type
+        raise Exception('No information on to be deployed %s available.' % folder_name)
 
     def __process_model(self, model, options: DeployOptions or UpdateOptions,
-                        local_repository_path: str, git_service: GitService,
+                        local_repository_path: str, git_service: 'GitService',
                         overwrite_contract: bool, contract_path: str) -> ModelType:
-        logging.info('Saving the model to disk...')
-        model_folder = os.path.join(
-            local_repository_path, contract_path, 'model')
+        logging.info('Saving the model to a temporary folder...')
+        # only import the model helpers when a model is saved
+        from deeploy.services.model_wrapper import ModelWrapper
         model_wrapper = ModelWrapper(
             model,
             pytorch_model_file_path=options.pytorch_model_file_path,
-            pytorch_torchserve_handler_name=options.pytorch_torchserve_handler_name)
-        model_wrapper.save(model_folder)
-        self.__prepare_model_directory(
-            git_service, local_repository_path, contract_path, overwrite_contract)
-        blob_storage_link = self.__upload_folder_to_blob(
-            local_repository_path, model_folder)
-        shutil.rmtree(model_folder)
-        os.mkdir(model_folder)
-        self.__create_reference_file(model_folder, blob_storage_link)
+            pytorch_torchserve_handler_name=options.pytorch_torchserve_handler_name,
+            pytorch_archive_compression_level=options.pytorch_archive_compression_level)
+        # the model is serialized once, outside of the working tree, and only its reference
+        # is written to the contract
+        with self.__temporary_directory() as temporary_folder:
+            model_folder = os.path.join(temporary_folder, 'model')
+            os.mkdir(model_folder)
+            model_wrapper.save(model_folder)
+            model_type = model_wrapper.get_model_type()
+
+            folder_hash = hash_folder(model_folder, self.__upload_options.max_workers)
+            fingerprint = get_fingerprint(folder_hash, {
+                'model_type': model_type.value,
+                'pytorch_model_file_path': options.pytorch_model_file_path,
+                'pytorch_torchserve_handler_name': options.pytorch_torchserve_handler_name,
+            })
+            if self.__restore_unchanged_folder(git_service, local_repository_path, contract_path,
+                                               'model', fingerprint):
+                logging.info('The model did not change, keeping the committed model reference.')
+                return model_type
+
+            self.__prepare_model_directory(
+                git_service, local_repository_path, contract_path, overwrite_contract)
+            blob_storage_link = self.__upload_folder_to_blob(
+                temporary_folder, model_folder, os.path.join(contract_path, 'model'), folder_hash)
+
+        self.__create_reference_file(os.path.join(local_repository_path, contract_path, 'model'),
+                                     blobReference=BlobReference(url=blob_storage_link))
         git_service.add_folder_to_staging(os.path.join(contract_path, 'model'))
-        return model_wrapper.get_model_type()
+        self.__store_fingerprint(git_service, local_repository_path, contract_path, 'model', fingerprint)
+        return model_type
 
-    def __process_explainer(self, explainer, git_service: GitService,
+    def __process_explainer(self, explainer, git_service: 'GitService',
                             local_repository_path: str, overwrite_contract: bool,
                             contract_path: str) -> ExplainerType:
-        logging.info('Saving the explainer to disk...')
+        logging.info('Saving the explainer to a temporary folder...')
+        # only import the explainer helpers when an explainer is saved
+        from deeploy.services.explainer_wrapper import ExplainerWrapper
         explainer_wrapper = ExplainerWrapper(explainer)
-        self.__prepare_explainer_directory(git_service, contract_path, overwrite_contract)
-        explainer_folder = os.path.join(
-            local_repository_path, contract_path, 'explainer')
-        explainer_wrapper.save(explainer_folder)
-        blob_storage_link = self.__upload_folder_to_blob(
-            local_repository_path, explainer_folder)
-        shutil.rmtree(explainer_folder)
-        os.mkdir(explainer_folder)
-        self.__create_reference_file(explainer_folder, blob_storage_link)
+        with self.__temporary_directory() as temporary_folder:
+            explainer_folder = os.path.join(temporary_folder, 'explainer')
+            os.mkdir(explainer_folder)
+            explainer_wrapper.save(explainer_folder)
+            explainer_type = explainer_wrapper.get_explainer_type()
+
+            folder_hash = hash_folder(explainer_folder, self.__upload_options.max_workers)
+            fingerprint = get_fingerprint(folder_hash, {
+                'explainer_type': explainer_type.value,
+            })
+            if self.__restore_unchanged_folder(git_service, local_repository_path, contract_path,
+                                               'explainer', fingerprint):
+                logging.info('The explainer did not change, keeping the committed explainer reference.')
+                return explainer_type
+
+            self.__prepare_explainer_directory(
+                git_service, local_repository_path, contract_path, overwrite_contract)
+            blob_storage_link = self.__upload_folder_to_blob(
+                temporary_folder, explainer_folder, os.path.join(contract_path, 'explainer'), folder_hash)
+
+        self.__create_reference_file(os.path.join(local_repository_path, contract_path, 'explainer'),
+                                     blobReference=BlobReference(url=blob_storage_link))
         git_service.add_folder_to_staging(os.path.join(contract_path, 'explainer'))
-        return explainer_wrapper
+        self.__store_fingerprint(git_service, local_repository_path, contract_path, 'explainer',
+                                 fingerprint)
+        return explainer_type
+
+    def __restore_unchanged_folder(self, git_service: 'GitService', local_repository_path: str,
+                                   contract_path: str, folder_name: str, fingerprint: str) -> bool:
+        # the fingerprint is compared with the commit the folder is restored from, because the
+        # working tree may already have been changed by this or an earlier run
+        try:
+            head_sha = git_service.get_head_commit_sha()
+        except ValueError:
+            # the repository does not have any commits yet
+            return False
+        committed_fingerprints = read_committed_fingerprints(
+            git_service, head_sha, contract_path.replace(os.sep, '/'))
+        if committed_fingerprints.get(folder_name) != fingerprint:
+            return False
+        git_service.restore_folder(os.path.join(contract_path, folder_name))
+        return True
+
+    def __temporary_directory(self) -> tempfile.TemporaryDirectory:
+        temp_dir = self.__upload_options.temp_dir
+        if temp_dir:
+            temp_dir = os.path.expanduser(temp_dir)
+            os.makedirs(temp_dir, exist_ok=True)
+        return tempfile.TemporaryDirectory(prefix='deeploy-', dir=temp_dir)
+
+    def __store_fingerprint(self, git_service: 'GitService', local_repository_path: str,
+                            contract_path: str, folder_name: str, fingerprint: str = None) -> None:
+        local_contract_path = os.path.join(local_repository_path, contract_path)
+        fingerprints = read_fingerprints(local_contract_path)
+        if fingerprints.get(folder_name) == fingerprint:
+            return
+        if fingerprint:
+            fingerprints[folder_name] = fingerprint
+        else:
+            fingerprints.pop(folder_name, None)
+        write_fingerprints(local_contract_path, fingerprints)
+        git_service.add_folder_to_staging(os.path.join(contract_path, FINGERPRINT_FILE))
+        return
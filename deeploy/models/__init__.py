@@ -1,13 +1,38 @@
-from .deployment import Deployment  # noqa
-from .update_deployment import UpdateDeployment, UpdateDeploymentMetadata  # noqa
-from .create_version import CreateVersion  # noqa
-from .repository import Repository  # noqa
-from .client_options import ClientConfig  # noqa
-from .create_deployment import CreateDeployment  # noqa
-from .workspace import Workspace  # noqa
-from .deploy_options import DeployOptions  # noqa
-from .update_options import UpdateOptions  # noqa
-from .prediction import V1Prediction, V2Prediction  # noqa
-from .prediction_log import RequestLog, PredictionLog  # noqa
-from .prediction_logs import RequestLogs, PredictionLogs  # noqa
-from .model_reference_json import ModelReferenceJson, BlobReference, DockerReference  # noqa
+from deeploy.common.functions import lazy_imports
+
+# models are imported from their module on first use, to keep `import deeploy` fast
+_LAZY_ATTRIBUTES = {
+    'Deployment': '.deployment',
+    'UpdateDeployment': '.update_deployment',
+    'UpdateDeploymentMetadata': '.update_deployment',
+    'CreateVersion': '.create_version',
+    'Repository': '.repository',
+    'ClientConfig': '.client_options',
+    'CreateDeployment': '.create_deployment',
+    'Workspace': '.workspace',
+    'DeployOptions': '.deploy_options',
+    'UpdateOptions': '.update_options',
+    'V1Prediction': '.prediction',
+    'V2Prediction': '.prediction',
+    'RequestLog': '.prediction_log',
+    'PredictionLog': '.prediction_log',
+    'RequestLogs': '.prediction_logs',
+    'PredictionLogs': '.prediction_logs',
+    'ModelReferenceJson': '.model_reference_json',
+    'BlobReference': '.model_reference_json',
+    'DockerReference': '.model_reference_json',
+    'ConnectionOptions': '.connection_options',
+    'UploadOptions': '.upload_options',
+    'LogFilters': '.log_filters',
+    'BulkItemResult': '.bulk_report',
+    'BulkReport': '.bulk_report',
+    'RetryOptions': '.retry_options',
+    'CacheOptions': '.cache_options',
+    'EncodingOptions': '.encoding_options',
+    'InstrumentationOptions': '.instrumentation_options',
+    'DeploymentResult': '.deployment_report',
+    'DeploymentReport': '.deployment_report',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+__getattr__, __dir__ = lazy_imports(__name__, _LAZY_ATTRIBUTES)
@@ -0,0 +1,20 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    id: str
+    success: bool
+    error: Optional[str]
+
+
+class BulkReport(BaseModel):
+    """Class that contains the outcome of a bulk submission
+    """  # noqa
+    succeeded: int
+    """int: number of items that were submitted successfully"""  # noqa
+    failed: int
+    """int: number of items that could not be submitted"""  # noqa
+    results: List[BulkItemResult]
+    """List[BulkItemResult]: the outcome per item, in input order"""  # noqa
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class CacheOptions(BaseModel):
+    """Class that contains the options for caching prediction responses on the client
+    """  # noqa
+    max_size: int = 1024
+    """int, optional: maximum number of cached prediction responses. The least recently used
+        response is evicted first. Defaults to 1024"""  # noqa
+    ttl: float = 300
+    """float, optional: number of seconds a cached prediction response is used. Defaults to 300"""  # noqa
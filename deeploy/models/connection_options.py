@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ConnectionOptions(BaseModel):
+    """Class that contains the options for the HTTP connection pool of the client
+    """  # noqa
+    pool_connections: int = 10
+    """int, optional: number of per-host connection pools to keep. Defaults to 10"""  # noqa
+    pool_maxsize: int = 10
+    """int, optional: maximum number of connections kept alive per host. Defaults to 10"""  # noqa
+    pool_block: bool = False
+    """bool, optional: whether to wait for a free connection when the per-host limit is reached
+        instead of opening a connection that is discarded afterwards. Defaults to False"""  # noqa
+    keep_alive: bool = True
+    """bool, optional: whether to keep connections open between requests. Defaults to True"""  # noqa
+    connect_timeout: Optional[float] = 10
+    """float, optional: seconds to wait for a connection to be established. Defaults to 10"""  # noqa
+    read_timeout: Optional[float] = 300
+    """float, optional: seconds to wait for the server to send a response. Defaults to 300"""  # noqa
@@ -55,6 +55,10 @@ class DeployOptions(BaseModel):
         ['image_classifier', 'image_segmenter', 'object_detector', 'text_classifier'].
         See the [TorchServe documentation](https://github.com/pytorch/serve/blob/master/docs/default_handlers.md#torchserve-default-inference-handlers)
         for more info."""  # noqa
+    pytorch_archive_compression_level: Optional[int]
+    """int, optional: zlib compression level from 0 to 9 of the TorchServe model archive. 0 stores
+        the files without compression, which is fastest for weights that hardly compress.
+        Defaults to the zlib default"""  # noqa
     model_docker_config: Optional[DockerReference] = None
     """DockerReference: docker configuration object of the model"""  # noqa
     model_blob_config: Optional[BlobReference] = None
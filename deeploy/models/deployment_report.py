@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from deeploy.models.deployment import Deployment
+
+
+class DeploymentResult(BaseModel):
+    contract_path: str
+    success: bool
+    error: Optional[str]
+    deployment: Optional[Deployment]
+
+
+class DeploymentReport(BaseModel):
+    """Class that contains the outcome of deploying or updating many models
+    """  # noqa
+    succeeded: int
+    """int: number of deployments that were created or updated"""  # noqa
+    failed: int
+    """int: number of deployments that failed"""  # noqa
+    commit: Optional[str]
+    """str, optional: the commit all deployments were created or updated to"""  # noqa
+    results: List[DeploymentResult]
+    """List[DeploymentResult]: the outcome per contract path, in input order"""  # noqa
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class EncodingOptions(BaseModel):
+    """Class that contains the options for encoding the request bodies of predict and explain
+    calls, and for decoding their responses
+    """  # noqa
+    format: str = 'json'
+    """str, optional: one of 'json', 'msgpack' or 'kserve_binary'. With 'kserve_binary', NumPy
+        arrays in the 'data' of the 'inputs' of a V2 inference request are sent as raw bytes
+        with the KServe binary tensor extension, and binary outputs are returned as NumPy
+        arrays. Defaults to 'json'"""  # noqa
+    compression: Optional[str] = None
+    """str, optional: compress request bodies with 'gzip' or 'zstd'. The deployment has to
+        accept the content encoding. Defaults to no compression"""  # noqa
+    compression_level: Optional[int] = None
+    """int, optional: compression level, defaults to the default level of the algorithm"""  # noqa
+    min_compression_size: int = 1024
+    """int, optional: request bodies smaller than this number of bytes are not compressed.
+        Defaults to 1024"""  # noqa
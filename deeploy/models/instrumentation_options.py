@@ -0,0 +1,18 @@
+from typing import Any, Callable, List, Optional
+
+from pydantic import BaseModel
+
+
+class InstrumentationOptions(BaseModel):
+    """Class that contains the options for measuring the API calls of the client. Without
+    hooks and a tracer the calls are not measured at all
+    """  # noqa
+    hooks: List[Callable[[Any], None]] = []
+    """List[Callable[[RequestEvent], None]], optional: functions that are called with a
+        RequestEvent after every API call, with its timing phases, payload sizes, status code,
+        retries and whether it was served from the prediction cache. A MetricsCollector can be
+        passed as a hook to collect Prometheus metrics. Defaults to no hooks"""  # noqa
+    tracer: Optional[Any] = None
+    """opentelemetry.trace.Tracer, optional: a tracer to create a span per API call with. Any
+        object with an OpenTelemetry compatible start_span method can be used. Defaults to no
+        spans"""  # noqa
@@ -0,0 +1,25 @@
+from typing import Optional, Dict
+
+from pydantic import BaseModel
+
+
+class LogFilters(BaseModel):
+    """Class that contains the filters for retrieving request and prediction logs
+    """  # noqa
+    start: Optional[str]
+    """str, optional: only return logs created at or after this ISO 8601 timestamp"""  # noqa
+    end: Optional[str]
+    """str, optional: only return logs created before this ISO 8601 timestamp"""  # noqa
+    status_code: Optional[int]
+    """int, optional: only return logs of requests with this HTTP status code"""  # noqa
+    commit: Optional[str]
+    """str, optional: only return logs of this deployment commit"""  # noqa
+
+    def to_request_params(self) -> Dict:
+        request_params = {
+            'start': self.start,
+            'end': self.end,
+            'statusCode': self.status_code,
+            'commit': self.commit,
+        }
+        return {k: v for k, v in request_params.items() if v is not None}
@@ -0,0 +1,36 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class RetryOptions(BaseModel):
+    """Class that contains the options for retrying failed API calls and failing fast
+    during outages
+    """  # noqa
+    max_retries: int = 3
+    """int, optional: number of times a failed call is retried. Defaults to 3"""  # noqa
+    backoff_factor: float = 0.5
+    """float, optional: seconds to wait before the first retry, doubled on every next retry.
+        Defaults to 0.5"""  # noqa
+    max_backoff: float = 30
+    """float, optional: maximum number of seconds to wait between retries, also when the
+        server asks for a longer wait with a Retry-After header. Defaults to 30"""  # noqa
+    jitter: bool = True
+    """bool, optional: whether to wait a random time between zero and the backoff, to spread
+        retries of many clients. Defaults to True"""  # noqa
+    retry_status_codes: List[int] = [429, 500, 502, 503, 504]
+    """List[int], optional: response status codes that are retried. Status codes other than
+        429 are only retried for idempotent calls. Defaults to [429, 500, 502, 503, 504]"""  # noqa
+    respect_retry_after: bool = True
+    """bool, optional: whether to wait as long as the Retry-After response header asks.
+        Defaults to True"""  # noqa
+    timeouts: Dict[str, float] = {}
+    """Dict[str, float], optional: read timeout in seconds per endpoint, overriding
+        ConnectionOptions.read_timeout. Endpoints are 'predict', 'explain', 'logs', 'evaluate',
+        'actuals', 'upload', 'deployments', 'repositories' and 'workspaces'"""  # noqa
+    circuit_breaker_threshold: int = 5
+    """int, optional: number of consecutive failed calls to a deployment after which calls
+        to it fail immediately. Set to 0 to disable the circuit breaker. Defaults to 5"""  # noqa
+    circuit_breaker_reset_timeout: float = 30
+    """float, optional: seconds after which a single trial call is let through to a
+        deployment whose circuit is open. Defaults to 30"""  # noqa
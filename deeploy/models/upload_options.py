@@ -0,0 +1,37 @@
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+
+class UploadOptions(BaseModel):
+    """Class that contains the options for uploading model and explainer files to blob storage,
+    and for the local caches that are used while deploying
+    """  # noqa
+    max_workers: int = 4
+    """int, optional: number of files that are uploaded in parallel. Keep this at or below
+        ConnectionOptions.pool_maxsize to reuse connections. Defaults to 4"""  # noqa
+    max_retries: int = 3
+    """int, optional: number of times the upload of a single file is retried after a connection
+        error or a 429 or 5xx response. Defaults to 3"""  # noqa
+    retry_backoff: float = 1
+    """float, optional: seconds to wait before the first retry, doubled on every next retry.
+        Defaults to 1"""  # noqa
+    chunk_size: int = 1024 * 1024
+    """int, optional: number of bytes that are streamed from disk between progress updates.
+        Defaults to 1 MiB"""  # noqa
+    progress_callback: Optional[Callable[[int, int], None]] = None
+    """Callable, optional: called with the number of uploaded bytes and the total number of
+        bytes of the folder that is being uploaded"""  # noqa
+    temp_dir: Optional[str] = None
+    """str, optional: directory in which models and explainers are serialized until they are
+        uploaded. Each deploy uses its own folder in it, which is removed afterwards. Defaults
+        to the temporary directory of the system"""  # noqa
+    artifact_cache_dir: Optional[str] = None
+    """str, optional: directory of the local index of uploaded model and explainer folders,
+        for example '~/.deeploy/cache'. A folder whose files were uploaded before is not
+        uploaded again. Defaults to None, which always uploads and keeps nothing on disk"""  # noqa
+    repository_cache_ttl: Optional[float] = None
+    """float, optional: number of seconds the repositories of a workspace are remembered in
+        artifact_cache_dir, to find the repository of a git remote without listing all
+        repositories. Requires artifact_cache_dir. Defaults to None, which lists the
+        repositories on every deploy"""  # noqa
@@ -0,0 +1,76 @@
+from deeploy.services.deeploy_service import DeeployService
+from deeploy.services.prediction_cache import PredictionCache
+from deeploy.prediction_methods import PredictionMethods
+from deeploy.models import ClientConfig, ConnectionOptions, RetryOptions, CacheOptions, EncodingOptions, \
+    InstrumentationOptions
+
+
+class PredictionClient(PredictionMethods):
+    """
+    A lightweight class for making predictions with a deployment token. It does not
+    call the API until the first prediction, and does not load any of the git and
+    model serialization dependencies of the Client
+    """
+
+    __config: ClientConfig
+
+    def __init__(
+            self, host: str, workspace_id: str, deployment_token: str,
+            connection_options: ConnectionOptions = None, retry_options: RetryOptions = None,
+            cache_options: CacheOptions = None, encoding_options: EncodingOptions = None,
+            instrumentation_options: InstrumentationOptions = None) -> None:
+        """Initialise the prediction client
+        Parameters:
+            host (str): The host at which Deeploy is located, i.e. deeploy.example.com
+            workspace_id (str): The ID of the workspace in which your deployments
+                are located
+            deployment_token (str): Deployment token generated from the Deeploy UI
+            connection_options (ConnectionOptions, optional): An instance of the connection
+                options class to configure the pooled HTTP session that is shared by all calls
+            retry_options (RetryOptions, optional): An instance of the retry options class to
+                configure timeouts per endpoint, retries with backoff and the circuit breaker
+            cache_options (CacheOptions, optional): An instance of the cache options class to
+                cache prediction responses of identical request bodies. Defaults to no caching
+            encoding_options (EncodingOptions, optional): An instance of the encoding options
+                class to send predict and explain requests as compressed JSON, msgpack or
+                KServe binary tensors. Defaults to JSON
+            instrumentation_options (InstrumentationOptions, optional): An instance of the
+                instrumentation options class with hooks, such as a MetricsCollector, and a
+                tracer that measure every API call. Defaults to no instrumentation
+        """
+
+        self.__config = ClientConfig(**{
+            'token': deployment_token,
+            'host': host,
+            'workspace_id': workspace_id,
+            'repository_id': '',
+        })
+        self.__prediction_cache = PredictionCache(cache_options.max_size, cache_options.ttl) \
+            if cache_options else None
+
+        self.__deeploy_service = DeeployService(
+            host,
+            workspace_id,
+            token=deployment_token,
+            connection_options=connection_options,
+            retry_options=retry_options,
+            lazy_validation=True,
+            encoding_options=encoding_options,
+            instrumentation_options=instrumentation_options,
+        )
+        super().__init__(self.__deeploy_service, workspace_id, self.__prediction_cache)
+
+        return
+
+    def close(self) -> None:
+        """Close the HTTP session and release all pooled connections
+        """
+        self.__deeploy_service.close()
+        return
+
+    def __enter__(self) -> 'PredictionClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        return
@@ -0,0 +1,167 @@
+from typing import Any, List, Optional
+
+from deeploy.services.deeploy_service import DeeployService
+from deeploy.services.prediction_cache import PredictionCache
+from deeploy.services.array_prediction import predict_array
+from deeploy.models import V1Prediction, V2Prediction, PredictionLog, RequestLogs, PredictionLogs
+
+
+class PredictionMethods(object):
+    """
+    The inference, log and evaluation methods that the Client and the PredictionClient
+    share, so that both clients behave the same
+    """
+
+    def __init__(self, deeploy_service: DeeployService, workspace_id: str,
+                 prediction_cache: Optional[PredictionCache] = None) -> None:
+        self.__deeploy_service = deeploy_service
+        self.__workspace_id = workspace_id
+        self.__prediction_cache = prediction_cache
+        return
+
+    def _get_cache_commit(self, deployment_id: str) -> Optional[str]:
+        """Return the active commit of a deployment that cached responses are stored for. The
+        active commit can not be looked up with a deployment token, so by default cached
+        responses are only bounded by their time to live
+        """
+        return None
+
+    def predict(self, deployment_id: str, request_body: dict) -> V1Prediction or V2Prediction:
+        """Make a predict call
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_body (dict): Request body with input data for the model
+        """
+        workspace_id = self.__workspace_id
+        if not self.__prediction_cache:
+            return self.__deeploy_service.predict(workspace_id, deployment_id, request_body)
+
+        commit = self._get_cache_commit(deployment_id)
+        with self.__deeploy_service.instrumentation.call('predict', 'POST', deployment_id) as event:
+            prediction = self.__prediction_cache.get(deployment_id, commit, request_body)
+            event.cache_hit = prediction is not None
+            if prediction is None:
+                prediction = self.__deeploy_service.predict(workspace_id, deployment_id, request_body)
+                self.__prediction_cache.put(deployment_id, commit, request_body, prediction)
+        return prediction.copy(deep=True)
+
+    def get_prediction_cache_stats(self) -> dict:
+        """Retrieve the number of cached prediction responses, cache hits and cache misses
+        """
+        if not self.__prediction_cache:
+            raise Exception('The prediction cache is not enabled, use cache_options to enable it.')
+        return self.__prediction_cache.stats()
+
+    def predict_array(self, deployment_id: str, instances: Any, batch_size: int = None,
+                      max_workers: int = 1, dtype: Any = None) -> Any:
+        """Make predict calls for a NumPy array and return the predictions as a NumPy array.
+        The array is serialized as a whole and the response is not validated element by
+        element. With the kserve_binary payload format the array is sent as a binary tensor
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            instances (numpy.ndarray): Array with one instance per row
+            batch_size (int, optional): Maximum number of rows in one request. Defaults to
+                all rows in one request
+            max_workers (int, optional): Number of requests that are sent at the same time.
+                Defaults to 1
+            dtype (optional): NumPy data type of the predictions. Defaults to the type
+                that is inferred
+        """
+        workspace_id = self.__workspace_id
+
+        def predict(request_body: dict) -> dict:
+            return self.__deeploy_service.predict_raw(workspace_id, deployment_id, request_body)
+
+        binary = self.__deeploy_service.encoding_options.format == 'kserve_binary'
+        return predict_array(predict, instances, binary, batch_size, max_workers, dtype)
+
+    def predict_frame(self, deployment_id: str, frame: Any, columns: List[str] = None,
+                      batch_size: int = None, max_workers: int = 1, dtype: Any = None) -> Any:
+        """Make predict calls for the rows of a pandas DataFrame and return the predictions
+        as a NumPy array
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            frame (pandas.DataFrame): DataFrame with one instance per row
+            columns (List[str], optional): Columns to send, in the order the model expects.
+                Defaults to all columns
+            batch_size (int, optional): Maximum number of rows in one request. Defaults to
+                all rows in one request
+            max_workers (int, optional): Number of requests that are sent at the same time.
+                Defaults to 1
+            dtype (optional): NumPy data type of the predictions. Defaults to the type
+                that is inferred
+        """
+        if columns is not None:
+            frame = frame[columns]
+        return self.predict_array(deployment_id, frame.to_numpy(), batch_size, max_workers, dtype)
+
+    def explain(self, deployment_id: str, request_body: dict, image: bool = False) -> object:
+        """Make an explain call
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_body (dict): Request body with input data for the model
+            image (bool): Return image or not
+        """
+        workspace_id = self.__workspace_id
+        explanation = self.__deeploy_service.explain(
+            workspace_id, deployment_id, request_body, image)
+        return explanation
+
+    def getRequestLogs(self, deployment_id: str) -> RequestLogs:
+        """Retrieve request logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+        """
+        workspace_id = self.__workspace_id
+        requestLogs = self.__deeploy_service.getRequestLogs(workspace_id, deployment_id)
+        return requestLogs
+
+    def getPredictionLogs(self, deployment_id: str) -> PredictionLogs:
+        """Retrieve prediction logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+        """
+        workspace_id = self.__workspace_id
+        predictionLogs = self.__deeploy_service.getPredictionLogs(workspace_id, deployment_id)
+        return predictionLogs
+
+    def getOnePredictionLog(self, deployment_id: str, request_log_id: str,
+                            prediction_log_id: str) -> PredictionLog:
+        """Retrieve one log
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_log_id (str): ID of the request_log containing the prediction
+            prediction_log_id (str): ID of the prediction_log to be retrieved
+        """
+        workspace_id = self.__workspace_id
+        predictionLog = self.__deeploy_service.getOnePredictionLog(
+            workspace_id, deployment_id, request_log_id, prediction_log_id)
+        return predictionLog
+
+    def evaluate(self, deployment_id: str, request_log_id: str, prediction_log_id: str,
+                 evaluation_input: dict) -> None:
+        """Evaluate a prediction log
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            request_log_id (str): ID of the request_log containing the prediction
+            prediction_log_id (str): ID of the prediction_log to be evaluated
+            evaluation_input: Dict with result, value, and explanation
+        """
+        workspace_id = self.__workspace_id
+        self.__deeploy_service.evaluate(workspace_id, deployment_id, request_log_id,
+                                        prediction_log_id, evaluation_input)
+
+    def actuals(self, deployment_id: str, actuals_input: dict) -> None:
+        """Submit actuals for prediction logs
+        Parameters:
+            deployment_id (str): ID of the Deeploy deployment
+            actuals_input (dict): Object with predictionIds and actualsValues
+                                 where the order of the values will match
+                                 predictions with the actuals
+                                 {
+                                    "predictionIds": [],
+                                    "actualValues": {"predictions" | "output": []}
+                                 }
+        """
+        workspace_id = self.__workspace_id
+        self.__deeploy_service.actuals(workspace_id, deployment_id, actuals_input)
@@ -1,4 +1,18 @@
-from .deeploy_service import DeeployService # noqa
-from .git_service import GitService # noqa
-from .model_wrapper import ModelWrapper # noqa
-from .explainer_wrapper import ExplainerWrapper # noqa
+from deeploy.common.functions import lazy_imports
+
+# services are imported from their module on first use, so that GitPython and the model
+# and explainer helpers are not loaded by code that only makes predictions
+_LAZY_ATTRIBUTES = {
+    'DeeployService': '.deeploy_service',
+    'AsyncDeeployService': '.async_deeploy_service',
+    'GitService': '.git_service',
+    'ModelWrapper': '.model_wrapper',
+    'ExplainerWrapper': '.explainer_wrapper',
+    'PredictionBatcher': '.prediction_batcher',
+    'PredictionCache': '.prediction_cache',
+    'MetricsCollector': '.instrumentation',
+    'RequestEvent': '.instrumentation',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+__getattr__, __dir__ = lazy_imports(__name__, _LAZY_ATTRIBUTES)
@@ -0,0 +1,74 @@
+from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+def get_array_request_body(instances: Any, binary: bool = False) -> dict:
+    """Return the request body for an array of instances
+
+    Parameters
+    ----------
+      instances: numpy.ndarray
+        array with one instance per row
+      binary: bool
+        whether to build a V2 inference request, whose input is sent as a binary tensor
+    """
+    if binary:
+        return {'inputs': [{'name': 'input-0', 'data': instances}]}
+    return {'instances': instances}
+
+
+def read_array_predictions(response_body: dict, dtype: Any = None) -> Any:
+    """Return the predictions of a decoded response body as a NumPy array, without
+    validating them element by element
+    """
+    # only import numpy when it is needed
+    import numpy
+
+    if 'outputs' in response_body:
+        return numpy.asarray(response_body['outputs'][0]['data'], dtype=dtype)
+    if 'predictions' not in response_body:
+        raise Exception('The response does not contain predictions.')
+    return numpy.asarray(response_body['predictions'], dtype=dtype)
+
+
+def predict_array(predict: Callable[[dict], dict], instances: Any, binary: bool = False,
+                  batch_size: int = None, max_workers: int = 1, dtype: Any = None) -> Any:
+    """Make predict calls for the rows of an array and combine the predictions
+
+    Parameters
+    ----------
+      predict: Callable[[dict], dict]
+        function that sends one request body to the predict endpoint and returns the
+        decoded response body
+      instances: numpy.ndarray
+        array with one instance per row
+      binary: bool
+        whether to send V2 inference requests with binary tensors
+      batch_size: int, optional
+        maximum number of rows in one request. Defaults to all rows in one request
+      max_workers: int
+        number of requests that are sent at the same time
+      dtype: optional
+        NumPy data type of the predictions. Defaults to the type that is inferred
+    """
+    import numpy
+
+    instances = numpy.asarray(instances)
+    if instances.ndim == 0:
+        raise Exception('The instances must have at least one dimension.')
+    batch_size = batch_size if batch_size else max(len(instances), 1)
+
+    def predict_batch(start: int) -> Any:
+        # slicing the rows creates a view, the batch is not copied
+        request_body = get_array_request_body(instances[start:start + batch_size], binary)
+        return read_array_predictions(predict(request_body), dtype)
+
+    starts = range(0, len(instances), batch_size)
+    if max_workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batches = list(executor.map(predict_batch, starts))
+    else:
+        batches = [predict_batch(start) for start in starts]
+    if not batches:
+        return numpy.asarray([], dtype=dtype)
+    return batches[0] if len(batches) == 1 else numpy.concatenate(batches)
@@ -0,0 +1,68 @@
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+
+from deeploy.services.index_file import IndexFile
+
+
+def hash_file(local_file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks
+    """
+    sha256 = hashlib.sha256()
+    with open(local_file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def hash_folder(local_folder_path: str, max_workers: int = 4) -> str:
+    """Return a SHA-256 hex digest over the relative paths and contents of all files
+    in a folder. Files are hashed in parallel
+    """
+    relative_file_paths: List[str] = []
+    for root, _, files in os.walk(local_folder_path):
+        for single_file in files:
+            relative_file_paths.append(
+                os.path.relpath(os.path.join(root, single_file), local_folder_path))
+    relative_file_paths.sort()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        file_hashes = list(executor.map(
+            lambda path: hash_file(os.path.join(local_folder_path, path)), relative_file_paths))
+
+    sha256 = hashlib.sha256()
+    for relative_file_path, file_hash in zip(relative_file_paths, file_hashes):
+        sha256.update(relative_file_path.replace(os.sep, '/').encode())
+        sha256.update(b'\0')
+        sha256.update(file_hash.encode())
+        sha256.update(b'\n')
+    return sha256.hexdigest()
+
+
+class ArtifactCache(object):
+    """
+    A class that keeps a local, content-addressed index of uploaded artifact folders
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """Initialise the cache
+
+        Parameters
+        ----------
+          cache_dir: str
+            directory in which the index file is stored
+        """
+        self.__index = IndexFile(os.path.join(cache_dir, 'artifacts.json'), 'artifact cache')
+        return
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the blob folder path stored for a key, if any
+        """
+        return self.__index.read().get(key)
+
+    def put(self, key: str, blob_folder_path: str) -> None:
+        """Store the blob folder path for a key
+        """
+        self.__index.update(lambda index: index.update({key: blob_folder_path}))
+        return
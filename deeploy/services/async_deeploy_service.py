@@ -0,0 +1,228 @@
+import asyncio
+
+from pydantic import parse_obj_as
+
+from deeploy.models import V1Prediction, V2Prediction, PredictionLog, RequestLogs, PredictionLogs, \
+    ConnectionOptions, RetryOptions, EncodingOptions
+from deeploy.enums import AuthType
+from deeploy.services.request_helpers import request_is_successful, get_auth_header, \
+    parse_prediction, check_evaluation_input, check_evaluation_status, check_actuals_status
+from deeploy.services.retry_policy import RetryPolicy
+from deeploy.services.payload_encoding import PayloadEncoder
+
+
+class AsyncDeeployService(object):
+    """
+    A class for interacting with the Deeploy API from asyncio code
+    """
+
+    def __init__(
+            self, host: str, workspace_id: str, access_key: str = None, secret_key: str = None,
+            token: str = None, insecure=False, connection_options: ConnectionOptions = None,
+            max_concurrency: int = None, retry_options: RetryOptions = None,
+            encoding_options: EncodingOptions = None) -> None:
+        # only import the async HTTP stack when it is needed
+        try:
+            import httpx
+        except ImportError:
+            raise Exception('The async client requires httpx. Install it with: pip install deeploy[async]')
+
+        if not ((access_key and secret_key) or token):
+            raise Exception('Missing authentication data.')
+
+        self.__access_key = access_key
+        self.__secret_key = secret_key
+        self.__token = token
+        self.__workspace_id = workspace_id
+        self.__host = 'http://api.%s' % host if insecure else 'https://api.%s' % host
+        self.__connection_options = connection_options if connection_options else ConnectionOptions()
+        self.__max_concurrency = max_concurrency
+        self.__semaphore = None
+        self.__retry_policy = RetryPolicy(retry_options)
+        self.__payload_encoder = PayloadEncoder(encoding_options)
+        self.__httpx = httpx
+        self.__auth_headers = {}
+
+        options = self.__connection_options
+        self.__client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=options.pool_maxsize if options.pool_block else None,
+                max_keepalive_connections=options.pool_maxsize if options.keep_alive else 0),
+            timeout=httpx.Timeout(options.read_timeout, connect=options.connect_timeout))
+        return
+
+    async def close(self) -> None:
+        """Close all pooled connections held by the service
+        """
+        await self.__client.aclose()
+        return
+
+    async def __aenter__(self) -> 'AsyncDeeployService':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+        return
+
+    async def predict(self, workspace_id: str, deployment_id: str,
+                      request_body: dict) -> V1Prediction or V2Prediction:
+        url = '%s/workspaces/%s/deployments/%s/predict' % (
+            self.__host, workspace_id, deployment_id)
+
+        # the async HTTP client sends a single buffer
+        body, headers = self.__payload_encoder.encode(request_body, zero_copy=False)
+        prediction_response = await self.__request(
+            'POST', url, 'predict', deployment_id, content=body,
+            headers={**self.__get_auth_header(AuthType.ALL), **headers})
+
+        if not request_is_successful(prediction_response.status_code):
+            raise Exception('Failed to call predictive model.')
+        prediction = parse_prediction(self.__payload_encoder.decode(
+            prediction_response.content, prediction_response.headers))
+        return prediction
+
+    async def explain(self, workspace_id: str, deployment_id: str, request_body: dict,
+                      image: bool = False) -> object:
+        url = '%s/workspaces/%s/deployments/%s/explain' % (
+            self.__host, workspace_id, deployment_id)
+        params = {
+            'image': str(image).lower(),
+        }
+
+        body, headers = self.__payload_encoder.encode(request_body, zero_copy=False)
+        explanation_response = await self.__request(
+            'POST', url, 'explain', deployment_id, content=body, params=params,
+            headers={**self.__get_auth_header(AuthType.ALL), **headers})
+
+        if not request_is_successful(explanation_response.status_code):
+            raise Exception('Failed to call explainer model.')
+        explanation = self.__payload_encoder.decode(
+            explanation_response.content, explanation_response.headers)
+        return explanation
+
+    async def getOnePredictionLog(self, workspace_id: str, deployment_id: str, request_log_id: str,
+                                  prediction_log_id: str) -> PredictionLog:
+        url = '%s/workspaces/%s/deployments/%s/requestLogs/%s/predictionLogs/%s' % (
+            self.__host, workspace_id, deployment_id, request_log_id, prediction_log_id)
+
+        log_response = await self.__request(
+            'GET', url, 'logs', deployment_id, headers=self.__get_auth_header(AuthType.ALL))
+
+        if not request_is_successful(log_response.status_code):
+            raise Exception('Failed to get log %s.' % prediction_log_id)
+
+        log = parse_obj_as(PredictionLog, log_response.json())
+        return log
+
+    async def getPredictionLogs(self, workspace_id: str, deployment_id: str) -> PredictionLogs:
+        url = '%s/workspaces/%s/deployments/%s/predictionLogs' % (self.__host,
+                                                                  workspace_id,
+                                                                  deployment_id)
+
+        logs_response = await self.__request(
+            'GET', url, 'logs', deployment_id, headers=self.__get_auth_header(AuthType.ALL))
+
+        if not request_is_successful(logs_response.status_code):
+            raise Exception('Failed to get logs.')
+        logs = parse_obj_as(PredictionLogs, logs_response.json())
+        return logs
+
+    async def getRequestLogs(self, workspace_id: str, deployment_id: str) -> RequestLogs:
+        url = '%s/workspaces/%s/deployments/%s/requestLogs' % (self.__host,
+                                                               workspace_id,
+                                                               deployment_id)
+
+        logs_response = await self.__request(
+            'GET', url, 'logs', deployment_id, headers=self.__get_auth_header(AuthType.ALL))
+
+        if not request_is_successful(logs_response.status_code):
+            raise Exception('Failed to get logs.')
+        logs = parse_obj_as(RequestLogs, logs_response.json())
+        return logs
+
+    async def evaluate(self, workspace_id: str, deployment_id: str, request_log_id: str,
+                       prediction_log_id: str, evaluation_input: dict) -> None:
+        url = "%s/workspaces/%s/deployments/%s/requestLogs/%s/predictionLogs/%s/evaluations" % (
+            self.__host, workspace_id, deployment_id, request_log_id, prediction_log_id)
+
+        check_evaluation_input(evaluation_input)
+
+        evaluation_response = await self.__request(
+            'POST', url, 'evaluate', deployment_id, json=evaluation_input,
+            headers=self.__get_auth_header(AuthType.TOKEN))
+        check_evaluation_status(evaluation_response.status_code)
+
+    async def actuals(self, workspace_id: str, deployment_id: str, actuals_input: dict) -> None:
+        url = "%s/workspaces/%s/deployments/%s/actuals" % (
+            self.__host, workspace_id, deployment_id)
+
+        actuals_response = await self.__request(
+            'PUT', url, 'actuals', deployment_id, json=actuals_input,
+            headers=self.__get_auth_header(AuthType.TOKEN))
+        check_actuals_status(actuals_response.status_code)
+
+    async def __request(self, method: str, url: str, endpoint: str, deployment_id: str = None,
+                        idempotent: bool = None, **kwargs):
+        kwargs.setdefault('timeout', self.__httpx.Timeout(
+            self.__retry_policy.get_timeout(endpoint, self.__connection_options.read_timeout),
+            connect=self.__connection_options.connect_timeout))
+        idempotent = self.__retry_policy.is_idempotent(method, idempotent)
+
+        circuit_breaker = self.__retry_policy.get_circuit_breaker(deployment_id)
+        if circuit_breaker and not circuit_breaker.allow_call():
+            raise Exception('Calls to deployment %s keep failing, not calling it until the circuit '
+                            'breaker resets.' % deployment_id)
+
+        try:
+            response = await self.__send_attempts(method, url, idempotent, **kwargs)
+        except BaseException:
+            # every call that is let through has to be recorded, a trial call that fails
+            # without a response would otherwise keep the circuit open
+            if circuit_breaker:
+                circuit_breaker.record_failure()
+            raise
+
+        if circuit_breaker:
+            if self.__retry_policy.is_failure_status(response.status_code):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+        return response
+
+    async def __send_attempts(self, method: str, url: str, idempotent: bool, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                response = await self.__send(method, url, **kwargs)
+            except self.__httpx.TransportError as e:
+                request_sent = not isinstance(
+                    e, (self.__httpx.ConnectError, self.__httpx.ConnectTimeout, self.__httpx.PoolTimeout))
+                if self.__retry_policy.should_retry_error(attempt, request_sent, idempotent):
+                    await asyncio.sleep(self.__retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise e
+
+            if self.__retry_policy.should_retry_status(attempt, response.status_code, idempotent):
+                retry_after = response.headers.get('Retry-After')
+                await asyncio.sleep(self.__retry_policy.get_backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            return response
+
+    async def __send(self, method: str, url: str, **kwargs):
+        if not self.__max_concurrency:
+            return await self.__client.request(method, url, **kwargs)
+
+        # the semaphore is created lazily so that it binds to the running event loop
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        async with self.__semaphore:
+            return await self.__client.request(method, url, **kwargs)
+
+    def __get_auth_header(self, supported_auth: AuthType) -> dict:
+        # the credentials do not change, so the encoded header is built once per auth type
+        if supported_auth not in self.__auth_headers:
+            self.__auth_headers[supported_auth] = get_auth_header(
+                supported_auth, self.__access_key, self.__secret_key, self.__token)
+        return dict(self.__auth_headers[supported_auth])
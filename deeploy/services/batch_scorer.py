@@ -0,0 +1,391 @@
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+import glob
+import json
+import os
+
+from deeploy.models import EncodingOptions
+from deeploy.services.array_prediction import get_array_request_body
+from deeploy.services.payload_encoding import PayloadEncoder, is_array
+
+CHECKPOINT_FILE = '_checkpoint.json'
+PART_FILE = 'part-%05d.parquet'
+INPUT_FORMATS = ['parquet', 'csv']
+
+
+def get_input_format(input_path: str) -> str:
+    extension = os.path.splitext(input_path)[1].lower().lstrip('.')
+    if extension == 'pq':
+        return 'parquet'
+    if extension not in INPUT_FORMATS:
+        raise Exception('Unsupported input file %s. Use one of %s.' % (input_path, INPUT_FORMATS))
+    return extension
+
+
+def iter_input_chunks(input_path: str, chunk_size: int, skip_rows: int = 0,
+                      columns: List[str] = None) -> Iterator[Any]:
+    """Read a Parquet or CSV file as pandas DataFrames of at most chunk_size rows, without
+    loading the whole file
+
+    Parameters
+    ----------
+      input_path: str
+        path of a .parquet or .csv file
+      chunk_size: int
+        maximum number of rows in a chunk
+      skip_rows: int
+        number of rows at the start of the file to skip. Parquet row groups that are
+        skipped entirely are not read
+      columns: List[str], optional
+        columns to read. Defaults to all columns
+    """
+    if get_input_format(input_path) == 'csv':
+        # only import pandas when it is needed
+        import pandas
+
+        skiprows = range(1, skip_rows + 1) if skip_rows else None
+        with pandas.read_csv(input_path, chunksize=chunk_size, usecols=columns, skiprows=skiprows) as reader:
+            for chunk in reader:
+                yield chunk.reset_index(drop=True)
+        return
+
+    # only import pyarrow when it is needed
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception('Reading Parquet files requires pyarrow. Install it with: pip install deeploy[arrow]')
+
+    parquet_file = pyarrow.parquet.ParquetFile(input_path)
+    first_row_group = 0
+    while first_row_group < parquet_file.num_row_groups and \
+            parquet_file.metadata.row_group(first_row_group).num_rows <= skip_rows:
+        skip_rows -= parquet_file.metadata.row_group(first_row_group).num_rows
+        first_row_group += 1
+
+    batches = parquet_file.iter_batches(batch_size=chunk_size, columns=columns,
+                                        row_groups=range(first_row_group, parquet_file.num_row_groups))
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        if skip_rows:
+            skipped = min(skip_rows, batch.num_rows)
+            batch, skip_rows = batch.slice(skipped), skip_rows - skipped
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        # batches can be shorter than chunk_size at row group boundaries
+        while pending_rows >= chunk_size:
+            table = pyarrow.Table.from_batches(pending)
+            yield table.slice(0, chunk_size).to_pandas()
+            pending = table.slice(chunk_size).to_batches()
+            pending_rows -= chunk_size
+    if pending_rows:
+        yield pyarrow.Table.from_batches(pending).to_pandas()
+
+
+def get_instances(chunk: Any, columns: Optional[List[str]],
+                  preprocess: Optional[Callable[[Any], Any]]) -> Any:
+    if preprocess:
+        return preprocess(chunk)
+    return (chunk[columns] if columns else chunk).to_numpy()
+
+
+def encode_chunk(chunk: Any, columns: Optional[List[str]], preprocess: Optional[Callable[[Any], Any]],
+                 encoding_options: EncodingOptions) -> Tuple[bytes, dict]:
+    """Convert a chunk to an encoded request body. Runs in a worker process in the process
+    pool mode, so it is a module function
+    """
+    binary = encoding_options.format == 'kserve_binary'
+    request_body = get_array_request_body(get_instances(chunk, columns, preprocess), binary)
+    return PayloadEncoder(encoding_options).encode(request_body, zero_copy=False)
+
+
+def read_scored_chunk(response_body: dict, chunk: Any, keep_columns: List[str]) -> dict:
+    """Return the columns of the output for a chunk: the kept input columns, the prediction
+    per row and the log ids of the request
+    """
+    if 'outputs' in response_body:
+        predictions = response_body['outputs'][0]['data']
+    elif 'predictions' in response_body:
+        predictions = response_body['predictions']
+    else:
+        raise Exception('The response does not contain predictions.')
+    if is_array(predictions) and predictions.ndim > 1:
+        predictions = list(predictions)
+    if len(predictions) != len(chunk):
+        raise Exception('The deployment returned %s predictions for %s instances.' %
+                        (len(predictions), len(chunk)))
+
+    prediction_log_ids = response_body.get('predictionLogIds')
+    columns = {column: chunk[column].to_numpy() for column in keep_columns}
+    columns['prediction'] = predictions
+    columns['requestLogId'] = [response_body.get('requestLogId')] * len(chunk)
+    columns['predictionLogId'] = prediction_log_ids if prediction_log_ids else [None] * len(chunk)
+    return columns
+
+
+class BatchCheckpoint(object):
+    """
+    The progress of a batch scoring run, stored next to the output files. Only rows in
+    closed output files are counted, so a run that is resumed starts after the last
+    complete file
+    """
+
+    def __init__(self, output_path: str, input_path: str) -> None:
+        self.__path = os.path.join(output_path, CHECKPOINT_FILE)
+        stat = os.stat(input_path)
+        self.__input = {'path': os.path.abspath(input_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+        self.rows = 0
+        self.files = 0
+        return
+
+    def load(self) -> None:
+        if not os.path.exists(self.__path):
+            return
+        with open(self.__path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('input') != self.__input:
+            raise Exception('The output folder contains the results of another input file. '
+                            'Use another output folder or pass resume=False.')
+        self.rows = checkpoint['rows']
+        self.files = checkpoint['files']
+        return
+
+    def save(self) -> None:
+        temporary_path = self.__path + '.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump({'input': self.__input, 'rows': self.rows, 'files': self.files}, f)
+        # the checkpoint is replaced atomically, so a crash never leaves a partial checkpoint
+        os.replace(temporary_path, self.__path)
+        return
+
+
+class PartWriter(object):
+    """
+    Writes scored chunks to numbered Parquet files. A file is written under a temporary
+    name and only gets its final name when it is closed. When a chunk has a column type
+    that the schema of the file can not hold, like floats in an integer column, the open
+    file is rewritten with the promoted schema
+    """
+
+    def __init__(self, output_path: str, checkpoint: BatchCheckpoint, rows_per_file: int) -> None:
+        # only import pyarrow when it is needed
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception('Batch scoring requires pyarrow. Install it with: pip install deeploy[arrow]')
+        # the column types of chunks are promoted with unify_schemas, which takes promote_options
+        # since pyarrow 14
+        if int(pyarrow.__version__.split('.')[0]) < 14:
+            raise Exception('Batch scoring requires pyarrow 14 or later. Install it with: '
+                            'pip install deeploy[arrow]')
+        self.__pyarrow = pyarrow
+        self.__output_path = output_path
+        self.__checkpoint = checkpoint
+        self.__rows_per_file = rows_per_file
+        self.__writer = None
+        self.__schema = None
+        self.__rows = 0
+        return
+
+    def write(self, columns: dict) -> None:
+        pyarrow = self.__pyarrow
+        table = pyarrow.Table.from_pydict(columns)
+        if self.__schema is None:
+            self.__schema = table.schema
+        elif not table.schema.equals(self.__schema):
+            try:
+                # a column that is all null in one chunk or integer in one chunk and float in
+                # another gets the type that holds the values of both
+                schema = pyarrow.unify_schemas([self.__schema, table.schema], promote_options='permissive')
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+                raise Exception('Failed to write the predictions, the column types of a chunk do not '
+                                'match the previous chunks. Reason: %s' % e)
+            if not schema.equals(self.__schema):
+                self.__schema = schema
+                self.__promote_part()
+            table = table.select(self.__schema.names).cast(self.__schema)
+        if self.__writer is None:
+            self.__writer = pyarrow.parquet.ParquetWriter(self.__part_path() + '.tmp', self.__schema)
+        self.__writer.write_table(table)
+        self.__rows += table.num_rows
+        if self.__rows >= self.__rows_per_file:
+            self.close()
+        return
+
+    def close(self) -> None:
+        if self.__writer is None:
+            return
+        self.__writer.close()
+        os.replace(self.__part_path() + '.tmp', self.__part_path())
+        self.__writer = None
+        self.__checkpoint.rows += self.__rows
+        self.__checkpoint.files += 1
+        self.__checkpoint.save()
+        self.__rows = 0
+        return
+
+    def promote_parts(self) -> None:
+        """Rewrite the closed files that were written before a column type was promoted, so
+        that all files of the output have the same schema
+        """
+        pyarrow = self.__pyarrow
+        paths = [os.path.join(self.__output_path, PART_FILE % i) for i in range(self.__checkpoint.files)]
+        schemas = [pyarrow.parquet.read_schema(path) for path in paths]
+        if not schemas:
+            return
+        schema = pyarrow.unify_schemas(schemas, promote_options='permissive')
+        for path, part_schema in zip(paths, schemas):
+            if part_schema.equals(schema):
+                continue
+            table = pyarrow.parquet.read_table(path).select(schema.names).cast(schema)
+            pyarrow.parquet.write_table(table, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        return
+
+    def __promote_part(self) -> None:
+        if self.__writer is None:
+            return
+        # the schema of a Parquet file can not change while it is written, so the rows of
+        # the open file are read back and written again with the promoted schema
+        self.__writer.close()
+        temporary_path = self.__part_path() + '.tmp'
+        table = self.__pyarrow.parquet.read_table(temporary_path)
+        self.__writer = self.__pyarrow.parquet.ParquetWriter(temporary_path, self.__schema)
+        self.__writer.write_table(table.select(self.__schema.names).cast(self.__schema))
+        return
+
+    def __part_path(self) -> str:
+        return os.path.join(self.__output_path, PART_FILE % self.__checkpoint.files)
+
+
+def remove_incomplete_parts(output_path: str, files: int) -> None:
+    """Remove the files of an interrupted run that are not covered by the checkpoint
+    """
+    for path in glob.glob(os.path.join(output_path, 'part-*.parquet*')):
+        name = os.path.basename(path)
+        if name.endswith('.tmp') or int(name[len('part-'):].split('.')[0]) >= files:
+            os.remove(path)
+    return
+
+
+def score_in_chunks(predict: Callable[[dict], dict], predict_encoded: Callable[[bytes, dict], dict],
+                    encoding_options: EncodingOptions, input_path: str, output_path: str,
+                    columns: List[str] = None, keep_columns: List[str] = None, chunk_size: int = 1000,
+                    max_workers: int = 4, rows_per_file: int = 100000, use_processes: bool = False,
+                    max_processes: int = None, preprocess: Callable[[Any], Any] = None,
+                    resume: bool = True) -> int:
+    """Score a Parquet or CSV file chunk by chunk and write the predictions to Parquet files
+    in the order of the input
+
+    Parameters
+    ----------
+      predict: Callable[[dict], dict]
+        function that sends one request body and returns the decoded response body
+      predict_encoded: Callable[[bytes, dict], dict]
+        function that sends one encoded request body with its headers and returns the
+        decoded response body
+      encoding_options: EncodingOptions
+        the encoding options of the service, to encode request bodies in worker processes
+      input_path: str
+        path of a .parquet or .csv file
+      output_path: str
+        folder for the part-<n>.parquet files and the checkpoint
+      columns: List[str], optional
+        columns to send to the deployment, in the order the model expects. Defaults to
+        all columns
+      keep_columns: List[str], optional
+        input columns to copy to the output, for example an ID column
+      chunk_size: int
+        number of rows in one request
+      max_workers: int
+        number of requests that are sent at the same time
+      rows_per_file: int
+        minimum number of rows in an output file. Progress is checkpointed every time a
+        file is closed
+      use_processes: bool
+        whether to convert and encode the chunks in a process pool, for preprocessing that
+        is too CPU-heavy for threads
+      max_processes: int, optional
+        number of worker processes. Defaults to the number of CPUs
+      preprocess: Callable[[pandas.DataFrame], Any], optional
+        function that converts a chunk to the instances to send. It has to be picklable
+        in the process pool mode. Defaults to the values of the columns
+      resume: bool
+        whether to continue from the checkpoint in the output folder
+
+    Returns the number of rows in the output
+    """
+    keep_columns = keep_columns if keep_columns else []
+    read_columns = list(dict.fromkeys(columns + keep_columns)) if columns else None
+    os.makedirs(output_path, exist_ok=True)
+
+    checkpoint = BatchCheckpoint(output_path, input_path)
+    if resume:
+        checkpoint.load()
+    remove_incomplete_parts(output_path, checkpoint.files)
+    checkpoint.save()
+    writer = PartWriter(output_path, checkpoint, rows_per_file)
+    chunks = iter_input_chunks(input_path, chunk_size, checkpoint.rows, read_columns)
+    binary = encoding_options.format == 'kserve_binary'
+    process_pool = ProcessPoolExecutor(max_workers=max_processes) if use_processes else None
+
+    def score_chunk(chunk: Any) -> dict:
+        if process_pool:
+            body, headers = process_pool.submit(
+                encode_chunk, chunk, columns, preprocess, encoding_options).result()
+            response_body = predict_encoded(body, headers)
+        else:
+            response_body = predict(get_array_request_body(get_instances(chunk, columns, preprocess), binary))
+        return read_scored_chunk(response_body, chunk, keep_columns)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            write_in_order(executor, score_chunk, chunks, writer, 2 * max_workers)
+    finally:
+        # the rows written so far follow each other without gaps, so after a failure they are
+        # kept and a resumed run starts at the first row that was not written
+        writer.close()
+        if process_pool:
+            process_pool.shutdown()
+    writer.promote_parts()
+    return checkpoint.rows
+
+
+def write_in_order(executor: Executor, score_chunk: Callable[[Any], dict], chunks: Iterator[Any],
+                   writer: PartWriter, max_in_flight: int) -> None:
+    """Score chunks concurrently and write them in input order. At most max_in_flight chunks
+    are read ahead, so memory stays bounded for inputs of any size
+    """
+    in_flight = {}
+    scored = {}
+    next_index = 0
+    chunk_iterator = enumerate(chunks)
+    for index, chunk in islice(chunk_iterator, max_in_flight):
+        in_flight[executor.submit(score_chunk, chunk)] = index
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = in_flight.pop(future)
+            try:
+                scored[index] = future.result()
+            except Exception:
+                # the chunks before the failed one are still written, so a resumed run
+                # repeats as little work as possible
+                for pending in in_flight:
+                    pending.cancel()
+                write_completed(scored, next_index, writer)
+                raise
+        next_index = write_completed(scored, next_index, writer)
+        for index, chunk in islice(chunk_iterator, len(done)):
+            in_flight[executor.submit(score_chunk, chunk)] = index
+    return
+
+
+def write_completed(scored: dict, next_index: int, writer: PartWriter) -> int:
+    while next_index in scored:
+        writer.write(scored.pop(next_index))
+        next_index += 1
+    return next_index
@@ -0,0 +1,124 @@
+from typing import Callable, Dict
+import os
+import threading
+import uuid
+
+
+class MultipartFileEncoder(object):
+    """
+    A file-like multipart/form-data body that streams a single file from disk
+    instead of loading it into memory
+    """
+
+    def __init__(self, local_file_path: str, field_name: str = 'file', chunk_size: int = 1024 * 1024,
+                 progress_callback: Callable[[int], None] = None) -> None:
+        """Initialise the encoder
+
+        Parameters
+        ----------
+          local_file_path: str
+            path of the file to upload
+          field_name: str
+            name of the form field that holds the file
+          chunk_size: int
+            number of bytes after which the progress callback is called
+          progress_callback: Callable[[int], None]
+            called with the number of file bytes read so far
+        """
+        self.__boundary = uuid.uuid4().hex
+        self.__preamble = (
+            '--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n' % (
+                self.__boundary, field_name, os.path.basename(local_file_path))).encode()
+        self.__epilogue = ('\r\n--%s--\r\n' % self.__boundary).encode()
+        self.__file_size = os.path.getsize(local_file_path)
+        self.__file = open(local_file_path, 'rb')
+        self.__chunk_size = chunk_size
+        self.__progress_callback = progress_callback
+        self.__position = 0
+        self.__reported = 0
+        return
+
+    @property
+    def content_type(self) -> str:
+        return 'multipart/form-data; boundary=%s' % self.__boundary
+
+    def __len__(self) -> int:
+        return len(self.__preamble) + self.__file_size + len(self.__epilogue)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self)
+
+        data = b''
+        file_start = len(self.__preamble)
+        file_end = file_start + self.__file_size
+        while len(data) < size and self.__position < len(self):
+            wanted = size - len(data)
+            if self.__position < file_start:
+                chunk = self.__preamble[self.__position:self.__position + wanted]
+            elif self.__position < file_end:
+                chunk = self.__file.read(min(wanted, file_end - self.__position))
+                if not chunk:
+                    raise Exception('File changed size during the upload.')
+            else:
+                offset = self.__position - file_end
+                chunk = self.__epilogue[offset:offset + wanted]
+            data += chunk
+            self.__position += len(chunk)
+
+        self.__report_progress(min(max(self.__position - file_start, 0), self.__file_size))
+        if self.__position >= len(self):
+            self.close()
+        return data
+
+    def close(self) -> None:
+        if not self.__file.closed:
+            self.__file.close()
+        return
+
+    def __enter__(self) -> 'MultipartFileEncoder':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        return
+
+    def __report_progress(self, file_bytes_read: int) -> None:
+        if not self.__progress_callback:
+            return
+        if file_bytes_read - self.__reported >= self.__chunk_size or \
+                (file_bytes_read == self.__file_size and file_bytes_read != self.__reported):
+            self.__reported = file_bytes_read
+            self.__progress_callback(file_bytes_read)
+        return
+
+
+class UploadProgress(object):
+    """
+    A class that sums the progress of files that are uploaded in parallel
+    """
+
+    def __init__(self, total_bytes: int, progress_callback: Callable[[int, int], None] = None) -> None:
+        self.total_bytes = total_bytes
+        self.__progress_callback = progress_callback
+        self.__file_bytes: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+        return
+
+    @property
+    def uploaded_bytes(self) -> int:
+        with self.__lock:
+            return sum(self.__file_bytes.values())
+
+    def file_callback(self, local_file_path: str) -> Callable[[int], None]:
+        """Return a callback that records the progress of a single file. A retried
+        file starts counting from zero again
+        """
+        def callback(file_bytes_read: int) -> None:
+            with self.__lock:
+                self.__file_bytes[local_file_path] = file_bytes_read
+                uploaded_bytes = sum(self.__file_bytes.values())
+            if self.__progress_callback:
+                self.__progress_callback(uploaded_bytes, self.total_bytes)
+        return callback
@@ -0,0 +1,66 @@
+from typing import Any, Callable, Iterable, Iterator, List
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from deeploy.models import BulkItemResult, BulkReport
+
+
+def chunked(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most chunk_size items without materialising it
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_pairs(items: Any) -> Iterator[tuple]:
+    """Iterate over pairs from an iterable of tuples, or over the first two columns of a
+    pandas DataFrame
+    """
+    if hasattr(items, 'itertuples'):
+        return (row[:2] for row in items.itertuples(index=False, name=None))
+    return iter(items)
+
+
+def submit_in_chunks(chunks: Iterable[List[Any]], submit: Callable[[List[Any]], None],
+                     get_id: Callable[[Any], str], max_workers: int = 4) -> BulkReport:
+    """Submit chunks of items concurrently. Failed calls are retried by the retry policy of
+    the service, so a chunk is submitted once here and a chunk that still fails is reported
+
+    Parameters
+    ----------
+      chunks: Iterable[List[Any]]
+        the chunks to submit. Chunks are read lazily, at most 2 * max_workers at a time
+      submit: Callable[[List[Any]], None]
+        function that submits one chunk and raises when it fails
+      get_id: Callable[[Any], str]
+        function that returns the id of an item for the report
+      max_workers: int
+        number of chunks that are submitted at the same time
+    """
+    def submit_chunk(chunk: List[Any]) -> List[BulkItemResult]:
+        try:
+            submit(chunk)
+        except Exception as e:
+            return [BulkItemResult.construct(id=get_id(item), success=False, error=str(e)) for item in chunk]
+        return [BulkItemResult.construct(id=get_id(item), success=True, error=None) for item in chunk]
+
+    chunk_results = {}
+    chunk_iterator = enumerate(chunks)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        for index, chunk in islice(chunk_iterator, 2 * max_workers):
+            in_flight[executor.submit(submit_chunk, chunk)] = index
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_results[in_flight.pop(future)] = future.result()
+            for index, chunk in islice(chunk_iterator, len(done)):
+                in_flight[executor.submit(submit_chunk, chunk)] = index
+
+    results = [result for index in sorted(chunk_results) for result in chunk_results[index]]
+    succeeded = sum(1 for result in results if result.success)
+    return BulkReport.construct(succeeded=succeeded, failed=len(results) - succeeded, results=results)
@@ -0,0 +1,51 @@
+from typing import Any, Dict
+import hashlib
+import json
+import logging
+import os
+import posixpath
+
+FINGERPRINT_FILE = 'fingerprint.json'
+
+
+def get_fingerprint(folder_hash: str, settings: Dict[str, Any]) -> str:
+    """Return a SHA-256 hex digest over the hash of a serialized artifact folder, as returned
+    by hash_folder, and the settings it was serialized with
+    """
+    sha256 = hashlib.sha256()
+    sha256.update(folder_hash.encode())
+    sha256.update(b'\n')
+    sha256.update(json.dumps(settings, sort_keys=True, separators=(',', ':'), default=str).encode())
+    return sha256.hexdigest()
+
+
+def read_fingerprints(local_contract_path: str) -> Dict[str, str]:
+    """Return the fingerprints that are stored in a contract, by sub-folder
+    """
+    try:
+        with open(os.path.join(local_contract_path, FINGERPRINT_FILE)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def read_committed_fingerprints(git_service: Any, commit_sha: str, contract_path: str) -> Dict[str, str]:
+    """Return the fingerprints that are stored in a contract in a commit, by sub-folder
+    """
+    data = git_service.read_file(commit_sha, posixpath.join(contract_path, FINGERPRINT_FILE))
+    try:
+        return json.loads(data) if data else {}
+    except ValueError:
+        return {}
+
+
+def write_fingerprints(local_contract_path: str, fingerprints: Dict[str, str]) -> None:
+    """Store the fingerprints of the sub-folders of a contract
+    """
+    file_path = os.path.join(local_contract_path, FINGERPRINT_FILE)
+    try:
+        with open(file_path, 'w') as f:
+            json.dump(fingerprints, f, sort_keys=True, indent=2)
+    except OSError:
+        logging.error("Creation of the file %s failed" % file_path)
+    return
@@ -1,13 +1,24 @@
-import base64
-from typing import List
+from typing import Any, Callable, Iterator, List
+from concurrent.futures import ThreadPoolExecutor
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 from pydantic import parse_obj_as
 
 from deeploy.models import Deployment, Repository, CreateDeployment, Workspace, \
-    V1Prediction, V2Prediction, PredictionLog, RequestLogs, PredictionLogs, UpdateDeployment, \
-    UpdateDeploymentMetadata
-from deeploy.enums import PredictionVersion, AuthType
+    V1Prediction, V2Prediction, PredictionLog, RequestLog, RequestLogs, PredictionLogs, UpdateDeployment, \
+    UpdateDeploymentMetadata, ConnectionOptions, LogFilters, RetryOptions, EncodingOptions, \
+    InstrumentationOptions
+from deeploy.enums import AuthType
+from deeploy.services.request_helpers import request_is_successful, get_auth_header, \
+    parse_prediction, check_evaluation_input, check_evaluation_status, check_actuals_status, \
+    is_transient_status, TransientRequestError
+from deeploy.services.blob_upload import MultipartFileEncoder
+from deeploy.services.retry_policy import RetryPolicy
+from deeploy.services.payload_encoding import PayloadEncoder
+from deeploy.services.instrumentation import Instrumentation, RequestEvent
 
 
 class DeeployService(object):
@@ -17,20 +28,44 @@ class DeeployService(object):
 
     def __init__(
             self, host: str, workspace_id: str, access_key: str = None, secret_key: str = None,
-            token: str = None, insecure=False) -> None:
+            token: str = None, insecure=False, connection_options: ConnectionOptions = None,
+            retry_options: RetryOptions = None, lazy_validation: bool = False,
+            encoding_options: EncodingOptions = None,
+            instrumentation_options: InstrumentationOptions = None) -> None:
         self.__access_key = access_key
         self.__secret_key = secret_key
         self.__token = token
         self.__workspace_id = workspace_id
         self.__host = 'http://api.%s' % host if insecure else 'https://api.%s' % host
+        self.__connection_options = connection_options if connection_options else ConnectionOptions()
+        self.__instrumentation = Instrumentation(instrumentation_options)
+        self.__session = self.__create_session(self.__connection_options)
+        self.__retry_policy = RetryPolicy(retry_options)
+        self.__payload_encoder = PayloadEncoder(encoding_options)
+        self.__auth_headers = {}
+        # with lazy validation the credentials are checked by the first call that is made
+        self.__credentials_validated = not lazy_validation
 
         if (access_key and secret_key) or token:
-            if (access_key and secret_key) and not self.__keys_are_valid():
+            if (access_key and secret_key) and not lazy_validation and not self.__keys_are_valid():
                 raise Exception('Access keys are not valid.')
         else:
             raise Exception('Missing authentication data.')
         return
 
+    def close(self) -> None:
+        """Close all pooled connections held by the service
+        """
+        self.__session.close()
+        return
+
+    def __enter__(self) -> 'DeeployService':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        return
+
     def get_repositories(self, workspace_id: str) -> List[Repository]:
         url = '%s/workspaces/%s/repositories' % (
             self.__host, workspace_id)
@@ -38,8 +73,8 @@ class DeeployService(object):
             'isArchived': False,
         }
 
-        repositories_response = requests.get(
-            url, params=params, auth=(self.__access_key, self.__secret_key))
+        repositories_response = self.__request(
+            'GET', url, 'repositories', params=params, auth=(self.__access_key, self.__secret_key))
 
         repositories = parse_obj_as(
             List[Repository], repositories_response.json())
@@ -50,8 +85,8 @@ class DeeployService(object):
         url = '%s/workspaces/%s/repositories/%s' % (
             self.__host, workspace_id, repository_id)
 
-        repository_response = requests.get(
-            url, auth=(self.__access_key, self.__secret_key))
+        repository_response = self.__request(
+            'GET', url, 'repositories', auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(repository_response):
             raise Exception('Repository does not exist in the workspace.')
 
@@ -66,8 +101,8 @@ class DeeployService(object):
         params = {
             'withExamples': withExamples,
         }
-        deployment_response = requests.get(
-            url, params=params, auth=(self.__access_key, self.__secret_key))
+        deployment_response = self.__request(
+            'GET', url, 'deployments', params=params, auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(deployment_response):
             raise Exception('Failed to retrieve the deployment: %s' %
                             str(deployment_response.json()))
@@ -81,8 +116,8 @@ class DeeployService(object):
         url = '%s/workspaces/%s/deployments' % (self.__host, workspace_id)
         data = deployment.to_request_body()
 
-        deployment_response = requests.post(
-            url, json=data, auth=(self.__access_key, self.__secret_key))
+        deployment_response = self.__request(
+            'POST', url, 'deployments', json=data, auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(deployment_response):
             raise Exception('Failed to create the deployment: %s' % str(deployment_response.json()))
 
@@ -97,8 +132,8 @@ class DeeployService(object):
                                                    update.deployment_id)
         data = update.to_request_body()
 
-        deployment_response = requests.patch(
-            url, json=data, auth=(self.__access_key, self.__secret_key))
+        deployment_response = self.__request(
+            'PATCH', url, 'deployments', json=data, auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(deployment_response):
             raise Exception('Failed to update the deployment: %s' % str(deployment_response.json()))
 
@@ -114,8 +149,8 @@ class DeeployService(object):
                                                             update.deployment_id)
         data = update.to_request_body()
 
-        deployment_response = requests.patch(
-            url, json=data, auth=(self.__access_key, self.__secret_key))
+        deployment_response = self.__request(
+            'PATCH', url, 'deployments', json=data, auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(deployment_response):
             raise Exception('Failed to update the deployment: %s' % str(deployment_response.json()))
 
@@ -127,8 +162,8 @@ class DeeployService(object):
     def get_workspace(self, workspace_id: str) -> Workspace:
         url = '%s/workspaces/%s' % (self.__host, workspace_id)
 
-        workspace_response = requests.get(
-            url, auth=(self.__access_key, self.__secret_key))
+        workspace_response = self.__request(
+            'GET', url, 'workspaces', auth=(self.__access_key, self.__secret_key))
         if not self.__request_is_successful(workspace_response):
             raise Exception('Workspace does not exist.')
 
@@ -138,32 +173,68 @@ class DeeployService(object):
 
     def upload_blob_file(
             self, local_file_path: str, relative_folder_path: str, workspace_id: str,
-            repository_id: str, uuid: str) -> str:
+            repository_id: str, uuid: str, chunk_size: int = 1024 * 1024,
+            progress_callback: Callable[[int], None] = None) -> str:
         url = '%s/workspaces/%s/repositories/%s/upload' % (
             self.__host, workspace_id, repository_id)
         params = {
             'commitSha': uuid,
             'folderPath': relative_folder_path,
         }
-        files = {'file': open(local_file_path, 'rb')}
-        r = requests.post(url, files=files, params=params,
-                          auth=(self.__access_key, self.__secret_key))
+        with MultipartFileEncoder(local_file_path, chunk_size=chunk_size,
+                                  progress_callback=progress_callback) as body:
+            # the body can only be read once, a failed upload is retried by the caller
+            r = self.__request('POST', url, 'upload', retry=False, data=body, params=params,
+                               headers={'Content-Type': body.content_type},
+                               auth=(self.__access_key, self.__secret_key))
+        if not self.__request_is_successful(r):
+            if is_transient_status(r.status_code):
+                raise TransientRequestError('Failed to upload %s.' % local_file_path)
+            raise Exception('Failed to upload %s.' % local_file_path)
 
         blob_storage_path = r.json()['data']['referencePath']
         return blob_storage_path
 
     def predict(self, workspace_id: str, deployment_id: str,
                 request_body: dict) -> V1Prediction or V2Prediction:
+        with self.__instrumentation.call('predict', 'POST', deployment_id) as event:
+            prediction_body = self.predict_raw(workspace_id, deployment_id, request_body)
+            with event.phase('parse'):
+                prediction = parse_prediction(prediction_body)
+        return prediction
+
+    def predict_raw(self, workspace_id: str, deployment_id: str, request_body: dict) -> dict:
+        """Make a predict call and return the decoded response body, without validating it
+        """
+        with self.__instrumentation.call('predict', 'POST', deployment_id) as event:
+            with event.phase('encode'):
+                body, headers = self.__payload_encoder.encode(request_body)
+            return self.predict_encoded(workspace_id, deployment_id, body, headers)
+
+    def predict_encoded(self, workspace_id: str, deployment_id: str, body: bytes, headers: dict) -> dict:
+        """Make a predict call with a request body that is already encoded with the encoding
+        options of the service, and return the decoded response body
+        """
         url = '%s/workspaces/%s/deployments/%s/predict' % (
             self.__host, workspace_id, deployment_id)
 
-        prediction_response = requests.post(
-            url, json=request_body, headers=self.__get_auth_header(AuthType.ALL))
+        with self.__instrumentation.call('predict', 'POST', deployment_id) as event:
+            prediction_response = self.__request(
+                'POST', url, 'predict', deployment_id=deployment_id, data=body,
+                headers={**self.__get_auth_header(AuthType.ALL), **headers})
 
-        if not self.__request_is_successful(prediction_response):
-            raise Exception('Failed to call predictive model.')
-        prediction = self.__parse_prediction(prediction_response)
-        return prediction
+            if not self.__request_is_successful(prediction_response):
+                raise Exception('Failed to call predictive model.')
+            with event.phase('decode'):
+                return self.__payload_encoder.decode(prediction_response.content, prediction_response.headers)
+
+    @property
+    def encoding_options(self) -> EncodingOptions:
+        return self.__payload_encoder.options
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        return self.__instrumentation
 
     def explain(self, workspace_id: str, deployment_id: str, request_body: dict,
                 image: bool = False) -> object:
@@ -173,12 +244,18 @@ class DeeployService(object):
             'image': str(image).lower(),
         }
 
-        explanation_response = requests.post(
-            url, json=request_body, params=params, headers=self.__get_auth_header(AuthType.ALL))
-
-        if not self.__request_is_successful(explanation_response):
-            raise Exception('Failed to call explainer model.')
-        explanation = explanation_response.json()
+        with self.__instrumentation.call('explain', 'POST', deployment_id) as event:
+            with event.phase('encode'):
+                body, headers = self.__payload_encoder.encode(request_body)
+            explanation_response = self.__request(
+                'POST', url, 'explain', deployment_id=deployment_id, data=body, params=params,
+                headers={**self.__get_auth_header(AuthType.ALL), **headers})
+
+            if not self.__request_is_successful(explanation_response):
+                raise Exception('Failed to call explainer model.')
+            with event.phase('decode'):
+                explanation = self.__payload_encoder.decode(
+                    explanation_response.content, explanation_response.headers)
         return explanation
 
     def getOnePredictionLog(self, workspace_id: str, deployment_id: str, request_log_id: str,
@@ -186,13 +263,14 @@ class DeeployService(object):
         url = '%s/workspaces/%s/deployments/%s/requestLogs/%s/predictionLogs/%s' % (
             self.__host, workspace_id, deployment_id, request_log_id, prediction_log_id)
 
-        log_response = requests.get(
-            url, headers=self.__get_auth_header(AuthType.ALL))
+        with self.__instrumentation.call('logs', 'GET', deployment_id) as event:
+            log_response = self.__request(
+                'GET', url, 'logs', deployment_id=deployment_id, headers=self.__get_auth_header(AuthType.ALL))
 
-        if not self.__request_is_successful(log_response):
-            raise Exception('Failed to get log %s.' % prediction_log_id)
+            if not self.__request_is_successful(log_response):
+                raise Exception('Failed to get log %s.' % prediction_log_id)
 
-        log = parse_obj_as(PredictionLog, log_response.json())
+            log = self.__parse_response(event, PredictionLog, log_response)
         return log
 
     def getPredictionLogs(self, workspace_id: str, deployment_id: str) -> PredictionLogs:
@@ -200,12 +278,13 @@ class DeeployService(object):
                                                                   workspace_id,
                                                                   deployment_id)
 
-        logs_response = requests.get(
-            url, headers=self.__get_auth_header(AuthType.ALL))
+        with self.__instrumentation.call('logs', 'GET', deployment_id) as event:
+            logs_response = self.__request(
+                'GET', url, 'logs', deployment_id=deployment_id, headers=self.__get_auth_header(AuthType.ALL))
 
-        if not self.__request_is_successful(logs_response):
-            raise Exception('Failed to get logs.')
-        logs = parse_obj_as(PredictionLogs, logs_response.json())
+            if not self.__request_is_successful(logs_response):
+                raise Exception('Failed to get logs.')
+            logs = self.__parse_response(event, PredictionLogs, logs_response)
         return logs
 
     def getRequestLogs(self, workspace_id: str, deployment_id: str) -> RequestLogs:
@@ -213,51 +292,63 @@ class DeeployService(object):
                                                                workspace_id,
                                                                deployment_id)
 
-        logs_response = requests.get(
-            url, headers=self.__get_auth_header(AuthType.ALL))
+        with self.__instrumentation.call('logs', 'GET', deployment_id) as event:
+            logs_response = self.__request(
+                'GET', url, 'logs', deployment_id=deployment_id, headers=self.__get_auth_header(AuthType.ALL))
 
-        if not self.__request_is_successful(logs_response):
-            raise Exception('Failed to get logs.')
-        logs = parse_obj_as(RequestLogs, logs_response.json())
+            if not self.__request_is_successful(logs_response):
+                raise Exception('Failed to get logs.')
+            logs = self.__parse_response(event, RequestLogs, logs_response)
         return logs
 
+    def iter_request_log_pages(self, workspace_id: str, deployment_id: str, page_size: int = 100,
+                               filters: LogFilters = None, offset: int = 0) -> Iterator[List[dict]]:
+        return self.__iter_log_pages(
+            'requestLogs', workspace_id, deployment_id, page_size, filters, offset)
+
+    def iter_prediction_log_pages(self, workspace_id: str, deployment_id: str, page_size: int = 100,
+                                  filters: LogFilters = None, offset: int = 0) -> Iterator[List[dict]]:
+        return self.__iter_log_pages(
+            'predictionLogs', workspace_id, deployment_id, page_size, filters, offset)
+
+    def iter_request_logs(self, workspace_id: str, deployment_id: str, page_size: int = 100,
+                          filters: LogFilters = None, offset: int = 0) -> Iterator[RequestLog]:
+        for page in self.iter_request_log_pages(workspace_id, deployment_id, page_size, filters, offset):
+            for log in page:
+                yield parse_obj_as(RequestLog, log)
+
+    def iter_prediction_logs(self, workspace_id: str, deployment_id: str, page_size: int = 100,
+                             filters: LogFilters = None, offset: int = 0) -> Iterator[PredictionLog]:
+        for page in self.iter_prediction_log_pages(workspace_id, deployment_id, page_size, filters, offset):
+            for log in page:
+                yield parse_obj_as(PredictionLog, log)
+
     def evaluate(self, workspace_id: str, deployment_id: str, request_log_id: str, prediction_log_id: str,
                  evaluation_input: dict) -> None:
         url = "%s/workspaces/%s/deployments/%s/requestLogs/%s/predictionLogs/%s/evaluations" % (
             self.__host, workspace_id, deployment_id, request_log_id, prediction_log_id)
 
-        if ((evaluation_input['result'] == 0) and ('value' in evaluation_input)):
-            raise Exception('An evaluation value can not be provided when confirming the inference.')
+        check_evaluation_input(evaluation_input)
 
-        evaluation_response = requests.post(
-            url, json=evaluation_input,
+        evaluation_response = self.__request(
+            'POST', url, 'evaluate', deployment_id=deployment_id, json=evaluation_input,
             headers=self.__get_auth_header(AuthType.TOKEN))
-        if not self.__request_is_successful(evaluation_response):
-            if evaluation_response.status_code == 409:
-                raise Exception('Log has already been evaluated.')
-            elif evaluation_response.status_code == 401:
-                raise Exception('No permission to perform this action.')
-            else:
-                raise Exception('Failed to request evaluation.')
+        check_evaluation_status(evaluation_response.status_code)
 
     def actuals(self, workspace_id: str, deployment_id: str, actuals_input: dict) -> None:
         url = "%s/workspaces/%s/deployments/%s/actuals" % (
             self.__host, workspace_id, deployment_id)
 
-        actuals_response = requests.put(
-            url, json=actuals_input,
+        actuals_response = self.__request(
+            'PUT', url, 'actuals', deployment_id=deployment_id, json=actuals_input,
             headers=self.__get_auth_header(AuthType.TOKEN))
-        if not self.__request_is_successful(actuals_response):
-            if actuals_response.status_code == 401:
-                raise Exception('No permission to perform this action.')
-            else:
-                raise Exception('Failed to submit actuals.')
+        check_actuals_status(actuals_response.status_code)
 
     def __keys_are_valid(self) -> bool:
         host_for_testing = '%s/workspaces' % self.__host
 
-        workspaces_response = requests.get(
-            host_for_testing, auth=(self.__access_key, self.__secret_key))
+        workspaces_response = self.__request(
+            'GET', host_for_testing, 'workspaces', auth=(self.__access_key, self.__secret_key))
         if self.__request_is_successful(workspaces_response):
             return True
         return False
@@ -266,45 +357,145 @@ class DeeployService(object):
         host_for_testing = '%s/workspaces/%s/deployments/%s/requestLogs' % (
             self.__host, workspace_id, deployment_id)
         headers = {'Authorization': 'Bearer ' + self.__token}
-        logs_response = requests.get(
-            host_for_testing, headers=headers)
+        logs_response = self.__request(
+            'GET', host_for_testing, 'logs', headers=headers)
         if self.__request_is_successful(logs_response):
             return True
         return False
 
-    def __request_is_successful(self, request: requests.Response) -> bool:
-        if str(request.status_code)[0] == '2':
-            return True
-        return False
+    def __get_log_page(self, url: str, deployment_id: str, params: dict) -> dict:
+        logs_response = self.__request(
+            'GET', url, 'logs', deployment_id=deployment_id, params=params,
+            headers=self.__get_auth_header(AuthType.ALL))
 
-    def __check_prediction_version(self, prediction_response: dict) -> PredictionVersion:
-        if len(prediction_response.json()) > 1:
-            return PredictionVersion.V2
-        else:
-            return PredictionVersion.V1
+        if not self.__request_is_successful(logs_response):
+            raise Exception('Failed to get logs.')
+        return logs_response.json()
+
+    def __iter_log_pages(self, log_type: str, workspace_id: str, deployment_id: str, page_size: int,
+                         filters: LogFilters, offset: int) -> Iterator[List[dict]]:
+        url = '%s/workspaces/%s/deployments/%s/%s' % (self.__host,
+                                                      workspace_id,
+                                                      deployment_id,
+                                                      log_type)
+        params = filters.to_request_params() if filters else {}
+
+        # the next page is fetched in the background while the current page is consumed
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(
+                self.__get_log_page, url, deployment_id, {**params, 'offset': offset, 'limit': page_size})
+            while next_page:
+                page = next_page.result()
+                logs = page['data']
+                offset += len(logs)
+                if logs and offset < page['count']:
+                    next_page = executor.submit(self.__get_log_page, url, deployment_id,
+                                                {**params, 'offset': offset, 'limit': page_size})
+                else:
+                    next_page = None
+                if logs:
+                    yield logs
+
+    def __create_session(self, options: ConnectionOptions) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=options.pool_connections,
+                              pool_maxsize=options.pool_maxsize,
+                              pool_block=options.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not options.keep_alive:
+            session.headers['Connection'] = 'close'
+        self.__instrumentation.instrument_session(session)
+        return session
+
+    def __request(self, method: str, url: str, endpoint: str, deployment_id: str = None,
+                  idempotent: bool = None, retry: bool = True, **kwargs) -> requests.Response:
+        with self.__instrumentation.call(endpoint, method, deployment_id) as event:
+            return self.__send_request(
+                event, method, url, endpoint, deployment_id, idempotent, retry, **kwargs)
+
+    def __send_request(self, event: RequestEvent, method: str, url: str, endpoint: str, deployment_id: str,
+                       idempotent: bool, retry: bool, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', (
+            self.__connection_options.connect_timeout,
+            self.__retry_policy.get_timeout(endpoint, self.__connection_options.read_timeout)))
+        idempotent = self.__retry_policy.is_idempotent(method, idempotent)
+
+        circuit_breaker = self.__retry_policy.get_circuit_breaker(deployment_id)
+        if circuit_breaker and not circuit_breaker.allow_call():
+            raise Exception('Calls to deployment %s keep failing, not calling it until the circuit '
+                            'breaker resets.' % deployment_id)
+
+        try:
+            response = self.__send_attempts(event, method, url, idempotent, retry, **kwargs)
+        except BaseException:
+            # every call that is let through has to be recorded, a trial call that fails
+            # without a response would otherwise keep the circuit open
+            if circuit_breaker:
+                circuit_breaker.record_failure()
+            raise
+
+        if circuit_breaker:
+            if self.__retry_policy.is_failure_status(response.status_code):
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+        if not self.__credentials_validated:
+            self.__validate_credentials(response)
+        return response
+
+    def __send_attempts(self, event: RequestEvent, method: str, url: str, idempotent: bool, retry: bool,
+                        **kwargs) -> requests.Response:
+        attempt = 0
+        while True:
+            event.attempt_started()
+            try:
+                response = self.__session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                event.attempt_finished(error=e)
+                if retry and self.__retry_policy.should_retry_error(
+                        attempt, self.__request_was_sent(e), idempotent):
+                    with event.phase('backoff'):
+                        time.sleep(self.__retry_policy.get_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise e
+            event.attempt_finished(response)
+
+            if retry and self.__retry_policy.should_retry_status(attempt, response.status_code, idempotent):
+                with event.phase('backoff'):
+                    time.sleep(self.__retry_policy.get_backoff(attempt, response.headers.get('Retry-After')))
+                attempt += 1
+                continue
+            return response
+
+    def __validate_credentials(self, response: requests.Response) -> None:
+        if response.status_code == 401:
+            if self.__access_key and self.__secret_key:
+                raise Exception('Access keys are not valid.')
+            raise Exception('Deployment token is not valid.')
+        if self.__request_is_successful(response):
+            self.__credentials_validated = True
+        return
 
-    def __parse_prediction(self, prediction_response: dict) -> V1Prediction or V2Prediction:
-        if self.__check_prediction_version(prediction_response) == PredictionVersion.V1:
-            prediction = parse_obj_as(
-                V1Prediction, prediction_response.json())
-        else:
-            prediction = parse_obj_as(
-                V2Prediction, prediction_response.json())
-        return prediction
+    def __request_was_sent(self, error: Exception) -> bool:
+        if isinstance(error, requests.ConnectTimeout):
+            return False
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return not isinstance(reason, NewConnectionError)
 
-    def __get_auth_header(self, supported_auth: AuthType):
-        if (self.__access_key and self.__secret_key) and \
-                (supported_auth == AuthType.BASIC or supported_auth == AuthType.ALL):
-            credentials = self.__access_key + ":" + self.__secret_key
-            b64Val = base64.b64encode(credentials.encode()).decode()
-            header = {'Authorization': 'Basic %s' % b64Val}
-        elif (self.__token) and \
-                (supported_auth == AuthType.TOKEN or supported_auth == AuthType.ALL):
-            header = {'Authorization': 'Bearer ' + self.__token}
-        elif (self.__access_key and self.__secret_key) and \
-                not (supported_auth == AuthType.BASIC or supported_auth == AuthType.ALL):
-            raise Exception('This function currently does not support Basic authentication.')
-        else:
-            raise Exception('This function currently does not support Token authentication.')
+    def __parse_response(self, event: RequestEvent, model: Any, response: requests.Response) -> Any:
+        with event.phase('decode'):
+            body = response.json()
+        with event.phase('parse'):
+            return parse_obj_as(model, body)
 
-        return header
+    def __request_is_successful(self, request: requests.Response) -> bool:
+        return request_is_successful(request.status_code)
+
+    def __get_auth_header(self, supported_auth: AuthType) -> dict:
+        # the credentials do not change, so the encoded header is built once per auth type
+        if supported_auth not in self.__auth_headers:
+            self.__auth_headers[supported_auth] = get_auth_header(
+                supported_auth, self.__access_key, self.__secret_key, self.__token)
+        return dict(self.__auth_headers[supported_auth])
@@ -1,4 +1,13 @@
-from git import Repo, Remote
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from io import BytesIO
+import os
+import threading
+
+if TYPE_CHECKING:
+    from git import Repo, Remote
+
+FILE_MODE = 0o100644
+TREE_MODE = 0o040000
 
 
 class GitService(object):
@@ -6,22 +15,83 @@ class GitService(object):
     A class for interacting with a local Git project
     """
 
-    repository: Repo
-    remote: Remote
+    repository: 'Repo'
+    remote: 'Remote'
 
     def __init__(self, local_repository_path: str, branch_name: str = None) -> None:
         """Initialise the Git client
         """
+        # only import GitPython when a local repository is used
+        from git import Repo
+
         # TODO: branch name
         self.repository = Repo(local_repository_path)
         self.branch = self.repository.active_branch
         self.remote = self.repository.remote('origin')
+        # contracts can be prepared in parallel, changes to the index are made one at a time
+        self.__lock = threading.RLock()
 
         if not self.__is_valid_git_project():
             raise Exception('Not a valid git project')
 
         return
 
+    @staticmethod
+    def clone(remote_url: str, local_repository_path: str, branch_name: str = None,
+              sparse_paths: List[str] = None, depth: Optional[int] = 1,
+              blobless: bool = True) -> 'GitService':
+        """Clone a remote repository into a local folder, or fetch the latest commit of the branch
+        into a folder that was cloned before. The folder is managed by the client: local changes
+        in it are discarded
+
+        Parameters
+        ----------
+          remote_url: str
+            URL of the remote repository
+          local_repository_path: str
+            folder to clone into
+          branch_name: str, optional
+            branch to check out. Defaults to the default branch of the remote
+          sparse_paths: List[str], optional
+            relative paths of the folders to check out, for example the contract paths.
+            Defaults to checking out the whole tree
+          depth: int, optional
+            number of commits of history to fetch. Set to None to fetch the whole history.
+            Defaults to 1
+          blobless: bool, optional
+            whether to only download the file contents that are checked out. Defaults to True
+        """
+        # only import GitPython when a local repository is used
+        from git import Repo
+
+        fetch_options = {}
+        if depth:
+            fetch_options['depth'] = depth
+        if blobless:
+            fetch_options['filter'] = 'blob:none'
+        sparse_paths = [path for path in (sparse_paths or []) if path.strip('/')]
+
+        if not os.path.isdir(os.path.join(local_repository_path, '.git')):
+            if branch_name:
+                fetch_options['branch'] = branch_name
+            repository = Repo.clone_from(remote_url, local_repository_path, sparse=bool(sparse_paths),
+                                         **fetch_options)
+            if sparse_paths:
+                repository.git.sparse_checkout('set', *sparse_paths)
+            return GitService(local_repository_path)
+
+        repository = Repo(local_repository_path)
+        branch_name = branch_name or repository.active_branch.name
+        # an incremental fetch only downloads the commits since the last run
+        repository.remote('origin').fetch(
+            '+refs/heads/%s:refs/remotes/origin/%s' % (branch_name, branch_name), **fetch_options)
+        repository.git.checkout('--force', '-B', branch_name, 'origin/%s' % branch_name)
+        repository.git.clean('-d', '--force')
+        sparse_checkout = repository.git.config('--get', 'core.sparseCheckout', with_exceptions=False)
+        if sparse_paths and sparse_checkout == 'true':
+            repository.git.sparse_checkout('add', *sparse_paths)
+        return GitService(local_repository_path)
+
     def __is_valid_git_project(self) -> bool:
         """Check if the supplied repository is valid
         """
@@ -41,11 +111,13 @@ class GitService(object):
             represents the relative path to the folder from the root of
             the git directory
         """
-        self.repository.index.add([relative_folder_path])
+        with self.__lock:
+            self.repository.index.add([relative_folder_path])
         return
 
     def delete_folder_from_staging(self, relative_folder_path: str) -> None:
-        self.repository.index.remove([relative_folder_path], False, r=True, ignore_unmatch=True)
+        with self.__lock:
+            self.repository.index.remove([relative_folder_path], False, r=True, ignore_unmatch=True)
         return
 
     def commit(self, commit_message: str) -> str:
@@ -56,8 +128,58 @@ class GitService(object):
           commit_message: str
             representing the commit message
         """
-        self.repository.index.commit(commit_message)
-        return self.repository.head.commit.hexsha
+        with self.__lock:
+            self.repository.index.commit(commit_message)
+            return self.repository.head.commit.hexsha
+
+    def has_staged_changes(self, relative_path: str) -> bool:
+        """Check if the staging area differs from the last commit in a path
+
+        Parameters
+        ----------
+          relative_path: str
+            represents the relative path to a file or folder from the root of
+            the git directory
+        """
+        with self.__lock:
+            if not self.repository.head.is_valid():
+                return True
+            return len(self.repository.index.diff('HEAD', paths=[relative_path or '.'])) > 0
+
+    def restore_folder(self, relative_folder_path: str) -> None:
+        """Restore a folder in the working tree and the staging area to the last commit
+
+        Parameters
+        ----------
+          relative_folder_path: str
+            represents the relative path to the folder from the root of
+            the git directory
+        """
+        with self.__lock:
+            self.repository.git.checkout('HEAD', '--', relative_folder_path)
+        return
+
+    def reset_staging(self, relative_path: str) -> None:
+        """Undo the staged changes in a path, keeping the files in the working tree
+
+        Parameters
+        ----------
+          relative_path: str
+            represents the relative path to a file or folder from the root of
+            the git directory
+        """
+        with self.__lock:
+            if self.repository.head.is_valid():
+                self.repository.git.reset('--quiet', 'HEAD', '--', relative_path or '.')
+            else:
+                self.repository.git.rm('--cached', '-r', '--quiet', '--ignore-unmatch', relative_path or '.')
+        return
+
+    def get_head_commit_sha(self) -> str:
+        """Return the SHA of the commit the current branch points to
+        """
+        with self.__lock:
+            return self.repository.head.commit.hexsha
 
     def pull(self) -> None:
         """Pull from the default remote repository
@@ -76,3 +198,196 @@ class GitService(object):
 
     def get_current_branch_name(self) -> str:
         return self.repository.active_branch.name
+
+    def fetch_branch(self, branch_name: str) -> Optional[str]:
+        """Fetch a branch from the default remote repository, without touching the working tree
+        or the staging area
+
+        Parameters
+        ----------
+          branch_name: str
+            name of the branch on the remote repository
+
+        Returns the SHA of the fetched commit, or None if the branch does not exist on the remote
+        """
+        from git import GitCommandError
+
+        remote_ref = 'refs/remotes/%s/%s' % (self.remote.name, branch_name)
+        try:
+            self.remote.fetch('+refs/heads/%s:%s' % (branch_name, remote_ref))
+        except GitCommandError as e:
+            # other errors, like a failed authentication, must not be mistaken for a new branch
+            if "couldn't find remote ref" not in str(e.stderr):
+                raise
+            return None
+        return self.repository.commit(remote_ref).hexsha
+
+    def read_file(self, commit_sha: str, relative_file_path: str) -> Optional[bytes]:
+        """Read a file from a commit in the object database
+
+        Parameters
+        ----------
+          commit_sha: str
+            SHA of the commit to read from
+          relative_file_path: str
+            represents the relative path to the file from the root of
+            the git directory, with forward slashes
+        """
+        # the object database is read through a single git cat-file process, which can not
+        # be shared by threads
+        with self.__lock:
+            try:
+                blob = self.repository.commit(commit_sha).tree / relative_file_path
+            except KeyError:
+                return None
+            if blob.type != 'blob':
+                return None
+            return blob.data_stream.read()
+
+    def folder_exists(self, commit_sha: str, relative_folder_path: str) -> bool:
+        """Check if a commit contains a folder with at least one file
+
+        Parameters
+        ----------
+          commit_sha: str
+            SHA of the commit to look in
+          relative_folder_path: str
+            represents the relative path to the folder from the root of
+            the git directory, with forward slashes
+        """
+        with self.__lock:
+            try:
+                tree = self.repository.commit(commit_sha).tree / relative_folder_path
+            except KeyError:
+                return False
+            return tree.type == 'tree' and len(tree) > 0
+
+    def commit_files(self, parent_sha: str, files: Dict[str, Optional[bytes]], commit_message: str) -> str:
+        """Create a commit on top of a parent commit by writing blob and tree objects directly
+        to the object database. The working tree, the staging area and the branches are not
+        touched
+
+        Parameters
+        ----------
+          parent_sha: str
+            SHA of the commit whose tree the files are applied to
+          files: Dict[str, Optional[bytes]]
+            file contents by relative path, with forward slashes. A path that maps to None
+            is removed, which removes a folder with all its contents. Removals are applied
+            before the files in the same folder are written
+          commit_message: str
+            representing the commit message
+
+        Returns the SHA of the new commit, or the parent SHA if the files did not change the tree
+        """
+        from git.objects import Commit, Tree
+
+        parent = self.repository.commit(parent_sha)
+        tree_binsha = self.__write_tree(parent.tree.binsha, files) or self.__store_tree({})
+        if tree_binsha == parent.tree.binsha:
+            return parent.hexsha
+        commit = Commit.create_from_tree(self.repository, Tree(self.repository, tree_binsha, path=''),
+                                         commit_message, parent_commits=[parent], head=False)
+        return commit.hexsha
+
+    def push_commit(self, commit_sha: str, branch_name: str) -> bool:
+        """Push a commit to a branch of the default remote repository. Only that ref is pushed
+
+        Parameters
+        ----------
+          commit_sha: str
+            SHA of the commit to push
+          branch_name: str
+            name of the branch on the remote repository
+
+        Returns False if the remote rejected the push because the branch moved on
+        """
+        from git import GitCommandError
+
+        try:
+            self.repository.git.push(self.remote.name, '%s:refs/heads/%s' % (commit_sha, branch_name),
+                                     porcelain=True)
+        except GitCommandError as e:
+            # the porcelain status of a ref that is not a fast-forward of the remote branch is
+            # [rejected], any other failure is raised
+            if '[rejected]' not in str(e.stdout):
+                raise
+            return False
+        return True
+
+    def commit_files_to_branch(self, branch_name: str, get_files: Callable[[str], Dict[str, Optional[bytes]]],
+                               commit_message: str, parent_sha: str = None, max_attempts: int = 3) -> str:
+        """Commit files on a branch of the default remote repository and push only that ref.
+        When another process pushed to the branch in the meantime, the files are built again
+        from the new tip and committed on top of it
+
+        Parameters
+        ----------
+          branch_name: str
+            name of the branch on the remote repository
+          get_files: Callable[[str], Dict[str, Optional[bytes]]]
+            function that returns the file contents by relative path for a parent SHA, see
+            commit_files. It may raise to stop when the new tip conflicts with the files
+          commit_message: str
+            representing the commit message
+          parent_sha: str, optional
+            SHA of the commit to use as the parent for the first attempt. Defaults to the
+            fetched tip of the branch, or the current commit if the branch does not exist yet
+          max_attempts: int, optional
+            number of times a rejected push is tried again
+
+        Returns the SHA of the pushed commit, or the parent SHA if nothing changed
+        """
+        for attempt in range(max_attempts):
+            if attempt > 0 or parent_sha is None:
+                parent_sha = self.fetch_branch(branch_name) or self.get_head_commit_sha()
+            commit_sha = self.commit_files(parent_sha, get_files(parent_sha), commit_message)
+            if commit_sha == parent_sha or self.push_commit(commit_sha, branch_name):
+                return commit_sha
+        raise Exception('Failed to push to branch %s, it kept changing on the remote.' % branch_name)
+
+    def __write_tree(self, tree_binsha: Optional[bytes],
+                     files: Dict[str, Optional[bytes]]) -> Optional[bytes]:
+        from git.objects.fun import tree_entries_from_data
+
+        entries: Dict[str, Tuple[bytes, int]] = {}
+        if tree_binsha:
+            for binsha, mode, name in tree_entries_from_data(self.repository.odb.stream(tree_binsha).read()):
+                entries[name] = (binsha, mode)
+
+        sub_folders: Dict[str, Dict[str, Optional[bytes]]] = {}
+        for path, data in files.items():
+            name, _, sub_path = path.strip('/').partition('/')
+            if sub_path:
+                sub_folders.setdefault(name, {})[sub_path] = data
+            elif data is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = (self.__store_object(b'blob', data), FILE_MODE)
+
+        # only the trees on the paths to the changed files are rewritten
+        for name, sub_files in sub_folders.items():
+            binsha, mode = entries.get(name, (None, TREE_MODE))
+            binsha = self.__write_tree(binsha if mode == TREE_MODE else None, sub_files)
+            if binsha:
+                entries[name] = (binsha, TREE_MODE)
+            else:
+                entries.pop(name, None)
+
+        return self.__store_tree(entries) if entries else None
+
+    def __store_tree(self, entries: Dict[str, Tuple[bytes, int]]) -> bytes:
+        from git.objects.fun import tree_to_stream
+
+        # git orders the entries of a tree by name, with a slash appended to folder names
+        sorted_entries: List[Tuple[bytes, int, str]] = sorted(
+            ((binsha, mode, name) for name, (binsha, mode) in entries.items()),
+            key=lambda entry: entry[2].encode() + (b'/' if entry[1] == TREE_MODE else b''))
+        stream = BytesIO()
+        tree_to_stream(sorted_entries, stream.write)
+        return self.__store_object(b'tree', stream.getvalue())
+
+    def __store_object(self, object_type: bytes, data: bytes) -> bytes:
+        from gitdb import IStream
+
+        return self.repository.odb.store(IStream(object_type, len(data), BytesIO(data))).binsha
@@ -0,0 +1,71 @@
+from typing import Callable
+import json
+import logging
+import os
+import tempfile
+import threading
+
+
+class IndexFile(object):
+    """
+    A class that reads and atomically replaces a local JSON index file. Reads and updates
+    of the same instance are serialized, so that the threads of a client do not lose updates
+    """
+
+    def __init__(self, index_path: str, description: str) -> None:
+        """Initialise the index file
+
+        Parameters
+        ----------
+          index_path: str
+            path of the JSON file, created on the first update
+          description: str
+            name of the index in warnings, like 'artifact cache'
+        """
+        self.__index_path = os.path.expanduser(index_path)
+        self.__description = description
+        self.__lock = threading.Lock()
+        return
+
+    def read(self) -> dict:
+        """Return the contents of the index, or an empty index if the file does not exist or
+        can not be read
+        """
+        with self.__lock:
+            return self.__read()
+
+    def update(self, update_index: Callable[[dict], None]) -> None:
+        """Change the index in place with a function and write it back. A failed write is
+        logged, the index is only an optimisation
+        """
+        with self.__lock:
+            index = self.__read()
+            update_index(index)
+            self.__write(index)
+        return
+
+    def __read(self) -> dict:
+        try:
+            with open(self.__index_path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def __write(self, index: dict) -> None:
+        index_dir = os.path.dirname(self.__index_path)
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            # the index is written to a temporary file first, so that readers in other
+            # processes never see a partially written file
+            fd, temporary_path = tempfile.mkstemp(dir=index_dir)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(index, f)
+                os.replace(temporary_path, self.__index_path)
+            except BaseException:
+                os.remove(temporary_path)
+                raise
+        except OSError as e:
+            logging.warning('Failed to write the %s %s. Reason: %s' %
+                            (self.__description, self.__index_path, e))
+        return
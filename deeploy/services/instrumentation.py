@@ -0,0 +1,474 @@
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from contextvars import ContextVar
+import bisect
+import functools
+import logging
+import re
+import threading
+import time
+
+from deeploy.models import InstrumentationOptions
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 10240, 102400, 1048576, 10485760, 104857600)
+
+# the event of the API call in progress, so that nested service methods add to one event
+_current_event: ContextVar = ContextVar('deeploy_request_event', default=None)
+# new connections are timed in the thread that opens them, the request picks the timings up
+_connection_timings = threading.local()
+
+
+class RequestEvent(object):
+    """
+    The measurements of one API call. The phases are durations in seconds:
+
+    - connect: DNS lookup and TCP connect, when a new connection was opened
+    - tls: TLS handshake, when a new connection was opened
+    - wait: sending the request until the response headers arrived, including connect and tls
+    - server: the processing time the server reported in its Server-Timing or
+      x-envoy-upstream-service-time header
+    - download: reading the response body
+    - backoff: waiting between retries
+    - encode, decode and parse: encoding the request body, decoding the response body and
+      validating it with pydantic
+    """
+    __slots__ = ('endpoint', 'method', 'deployment_id', 'status_code', 'attempts', 'duration', 'phases',
+                 'request_bytes', 'response_bytes', 'cache_hit', 'error', 'start_time', '_started',
+                 '_attempt_started')
+
+    def __init__(self, endpoint: str, method: str, deployment_id: str = None) -> None:
+        self.endpoint = endpoint
+        self.method = method
+        self.deployment_id = deployment_id
+        self.status_code: Optional[int] = None
+        self.attempts = 0
+        self.duration = 0.0
+        self.phases: Dict[str, float] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.cache_hit: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.start_time = time.time_ns()
+        self._started = time.perf_counter()
+        self._attempt_started = 0.0
+        return
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    def phase(self, name: str) -> Any:
+        return _Phase(self, name)
+
+    def add_phase(self, name: str, duration: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        return
+
+    def attempt_started(self) -> None:
+        self.attempts += 1
+        _connection_timings.phases = {}
+        self._attempt_started = time.perf_counter()
+        return
+
+    def attempt_finished(self, response: Any = None, error: Exception = None) -> None:
+        duration = time.perf_counter() - self._attempt_started
+        for name, phase_duration in _get_connection_phases().items():
+            self.add_phase(name, phase_duration)
+        _connection_timings.phases = {}
+        if error is not None:
+            self.error = type(error).__name__
+            return
+
+        self.error = None
+        self.status_code = response.status_code
+        self.request_bytes = int(response.request.headers.get('Content-Length') or 0)
+        self.response_bytes = len(response.content)
+        wait = response.elapsed.total_seconds()
+        self.add_phase('wait', wait)
+        self.add_phase('download', max(duration - wait, 0.0))
+        server_time = get_server_time(response.headers)
+        if server_time is not None:
+            self.add_phase('server', server_time)
+        return
+
+    def to_dict(self) -> dict:
+        return {'endpoint': self.endpoint, 'method': self.method, 'deployment_id': self.deployment_id,
+                'status_code': self.status_code, 'attempts': self.attempts, 'retries': self.retries,
+                'duration': self.duration, 'phases': dict(self.phases), 'request_bytes': self.request_bytes,
+                'response_bytes': self.response_bytes, 'cache_hit': self.cache_hit, 'error': self.error}
+
+
+class _Phase(object):
+    __slots__ = ('__event', '__name', '__started')
+
+    def __init__(self, event: RequestEvent, name: str) -> None:
+        self.__event = event
+        self.__name = name
+
+    def __enter__(self) -> None:
+        self.__started = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self.__event.add_phase(self.__name, time.perf_counter() - self.__started)
+
+
+class _NullEvent(object):
+    """
+    Stands in for the event when instrumentation is disabled, so that the service does not
+    measure anything
+    """
+    __slots__ = ()
+
+    def phase(self, name: str) -> Any:
+        return _NULL_CONTEXT
+
+    def attempt_started(self) -> None:
+        return
+
+    def attempt_finished(self, response: Any = None, error: Exception = None) -> None:
+        return
+
+    @property
+    def cache_hit(self) -> None:
+        return None
+
+    @cache_hit.setter
+    def cache_hit(self, value: bool) -> None:
+        return
+
+
+class _NullContext(object):
+    __slots__ = ()
+
+    def __enter__(self) -> _NullEvent:
+        return NULL_EVENT
+
+    def __exit__(self, *args) -> None:
+        return
+
+
+NULL_EVENT = _NullEvent()
+_NULL_CONTEXT = _NullContext()
+
+
+def get_server_time(headers: Any) -> Optional[float]:
+    """Return the processing time in seconds a server reported in its response headers
+    """
+    server_timing = headers.get('Server-Timing')
+    if server_timing:
+        durations = re.findall(r'dur=([0-9.]+)', server_timing)
+        if durations:
+            return max(float(duration) for duration in durations) / 1000
+    upstream_time = headers.get('x-envoy-upstream-service-time')
+    if upstream_time and upstream_time.isdigit():
+        return int(upstream_time) / 1000
+    return None
+
+
+class Instrumentation(object):
+    """
+    A class that measures API calls and reports them to the hooks and the tracer of the
+    instrumentation options. Without hooks and a tracer it is disabled, and its calls return
+    a shared event that does not measure anything
+    """
+
+    def __init__(self, options: InstrumentationOptions = None) -> None:
+        options = options if options else InstrumentationOptions()
+        self.__hooks = list(options.hooks)
+        self.__tracer = options.tracer
+        self.enabled = bool(self.__hooks or self.__tracer)
+        return
+
+    def call(self, endpoint: str, method: str = 'POST', deployment_id: str = None) -> Any:
+        """Return a context manager that measures an API call and yields its event. A call
+        inside another call adds to the event of the outer call
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Call(self, endpoint, method, deployment_id)
+
+    def instrument_session(self, session: Any) -> None:
+        """Time the DNS lookup, TCP connect and TLS handshake of the new connections of a
+        requests session
+        """
+        if not self.enabled:
+            return
+        pool_classes = get_timed_pool_classes()
+        for adapter in session.adapters.values():
+            adapter.poolmanager.pool_classes_by_scheme = pool_classes
+        return
+
+    def start_span(self, event: RequestEvent) -> Any:
+        if not self.__tracer:
+            return None
+        attributes = {'http.request.method': event.method, 'deeploy.endpoint': event.endpoint}
+        if event.deployment_id:
+            attributes['deeploy.deployment_id'] = event.deployment_id
+        return self.__tracer.start_span('deeploy.%s' % event.endpoint, attributes=attributes,
+                                        start_time=event.start_time)
+
+    def finish(self, event: RequestEvent, span: Any) -> None:
+        if span is not None:
+            end_span(span, event)
+        for hook in self.__hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                # a failing hook does not fail the API call it measured
+                logging.warning('Instrumentation hook %r failed: %s' % (hook, e))
+        return
+
+
+class _Call(object):
+    __slots__ = ('__instrumentation', '__event', '__span', '__token')
+
+    def __init__(self, instrumentation: Instrumentation, endpoint: str, method: str,
+                 deployment_id: Optional[str]) -> None:
+        self.__instrumentation = instrumentation
+        self.__event = RequestEvent(endpoint, method, deployment_id)
+        self.__token = None
+
+    def __enter__(self) -> RequestEvent:
+        current_event = _current_event.get()
+        if current_event is not None:
+            return current_event
+        self.__span = self.__instrumentation.start_span(self.__event)
+        self.__token = _current_event.set(self.__event)
+        return self.__event
+
+    def __exit__(self, error_type: Any, error: Any, traceback: Any) -> None:
+        if self.__token is None:
+            return
+        _current_event.reset(self.__token)
+        event = self.__event
+        event.duration = time.perf_counter() - event._started
+        if error_type is not None and event.error is None:
+            event.error = error_type.__name__
+        self.__instrumentation.finish(event, self.__span)
+
+
+def end_span(span: Any, event: RequestEvent) -> None:
+    if event.status_code is not None:
+        span.set_attribute('http.response.status_code', event.status_code)
+    if event.retries:
+        span.set_attribute('deeploy.retries', event.retries)
+    if event.cache_hit is not None:
+        span.set_attribute('deeploy.cache_hit', event.cache_hit)
+    span.set_attribute('deeploy.request_bytes', event.request_bytes)
+    span.set_attribute('deeploy.response_bytes', event.response_bytes)
+    for name, duration in event.phases.items():
+        span.set_attribute('deeploy.phase.%s_ms' % name, duration * 1000)
+    if event.error:
+        span.set_attribute('error.type', event.error)
+    span.end(end_time=event.start_time + int(event.duration * 1e9))
+    return
+
+
+def _get_connection_phases() -> Dict[str, float]:
+    phases = getattr(_connection_timings, 'phases', None)
+    if phases is None:
+        phases = _connection_timings.phases = {}
+    return phases
+
+
+def _record_connection_phase(name: str, duration: float) -> None:
+    phases = _get_connection_phases()
+    phases[name] = phases.get(name, 0.0) + duration
+    return
+
+
+@functools.lru_cache(maxsize=None)
+def get_timed_pool_classes() -> Dict[str, Any]:
+    """Return urllib3 connection pool classes whose connections time how they are opened
+    """
+    # only import urllib3 when it is needed
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedHTTPConnection(HTTPConnection):
+        def _new_conn(self) -> Any:
+            started = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                _record_connection_phase('connect', time.perf_counter() - started)
+
+    class TimedHTTPSConnection(HTTPSConnection):
+        def _new_conn(self) -> Any:
+            started = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                _record_connection_phase('connect', time.perf_counter() - started)
+
+        def connect(self) -> None:
+            phases = _get_connection_phases()
+            connect_before = phases.get('connect', 0.0)
+            started = time.perf_counter()
+            super().connect()
+            duration = time.perf_counter() - started
+            # the handshake is what is left after the DNS lookup and the TCP connect
+            connect_duration = _get_connection_phases().get('connect', 0.0) - connect_before
+            _record_connection_phase('tls', max(duration - connect_duration, 0.0))
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    return {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class _Histogram(object):
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+# name, type and help text of every metric of the collector
+METRICS = {
+    'requests_total': ('counter', 'API calls that sent a request, by final status code'),
+    'retries_total': ('counter', 'Requests that were repeated after a failed attempt'),
+    'errors_total': ('counter', 'API calls that failed with an exception, by exception type'),
+    'cache_lookups_total': ('counter', 'Prediction cache lookups, by result'),
+    'request_duration_seconds': ('histogram', 'Duration of API calls'),
+    'phase_duration_seconds': ('histogram', 'Duration of the phases of API calls'),
+    'request_size_bytes': ('histogram', 'Size of request bodies'),
+    'response_size_bytes': ('histogram', 'Size of response bodies'),
+}
+
+
+class MetricsCollector(object):
+    """
+    A hook that aggregates the events of API calls into Prometheus style counters and
+    histograms in memory. Pass it in the hooks of the InstrumentationOptions, and call
+    render() to get the metrics in the Prometheus text exposition format
+    """
+
+    def __init__(self, namespace: str = 'deeploy_client',
+                 duration_buckets: Sequence[float] = DURATION_BUCKETS,
+                 size_buckets: Sequence[float] = SIZE_BUCKETS) -> None:
+        self.__namespace = namespace
+        self.__duration_buckets = tuple(sorted(duration_buckets))
+        self.__size_buckets = tuple(sorted(size_buckets))
+        self.__counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.__histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+        self.__lock = threading.Lock()
+        return
+
+    def __call__(self, event: RequestEvent) -> None:
+        endpoint = (('endpoint', event.endpoint),)
+        with self.__lock:
+            if event.attempts:
+                status = str(event.status_code) if event.status_code is not None else 'error'
+                self.__increment('requests_total', endpoint + (('method', event.method), ('status', status)))
+            if event.retries:
+                self.__increment('retries_total', endpoint, event.retries)
+            if event.error:
+                self.__increment('errors_total', endpoint + (('error', event.error),))
+            if event.cache_hit is not None:
+                self.__increment('cache_lookups_total',
+                                 endpoint + (('result', 'hit' if event.cache_hit else 'miss'),))
+            self.__observe('request_duration_seconds', endpoint, event.duration, self.__duration_buckets)
+            for name, duration in event.phases.items():
+                self.__observe('phase_duration_seconds', endpoint + (('phase', name),), duration,
+                               self.__duration_buckets)
+            if event.attempts:
+                self.__observe('request_size_bytes', endpoint, event.request_bytes, self.__size_buckets)
+                self.__observe('response_size_bytes', endpoint, event.response_bytes, self.__size_buckets)
+        return
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """Return the sum of a counter over the series that have the given labels
+        """
+        with self.__lock:
+            return sum(value for (metric, series), value in self.__counters.items()
+                       if metric == name and _matches(series, labels))
+
+    def get_histogram(self, name: str, **labels: str) -> Dict[str, float]:
+        """Return the count and sum of a histogram over the series that have the given labels
+        """
+        with self.__lock:
+            histograms = [histogram for (metric, series), histogram in self.__histograms.items()
+                          if metric == name and _matches(series, labels)]
+            return {'count': sum(histogram.count for histogram in histograms),
+                    'sum': sum(histogram.sum for histogram in histograms)}
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format
+        """
+        lines = []
+        with self.__lock:
+            for name, (metric_type, help_text) in METRICS.items():
+                full_name = '%s_%s' % (self.__namespace, name)
+                if metric_type == 'counter':
+                    series = sorted((labels, value) for (metric, labels), value in self.__counters.items()
+                                    if metric == name)
+                    samples = ['%s%s %s' % (full_name, _format_labels(labels), _format_value(value))
+                               for labels, value in series]
+                else:
+                    samples = []
+                    for (metric, labels), histogram in sorted(self.__histograms.items(), key=lambda i: i[0]):
+                        if metric == name:
+                            samples.extend(_render_histogram(full_name, labels, histogram))
+                if samples:
+                    lines.extend(['# HELP %s %s' % (full_name, help_text),
+                                  '# TYPE %s %s' % (full_name, metric_type)] + samples)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+        return
+
+    def __increment(self, name: str, labels: Tuple[Tuple[str, str], ...], amount: float = 1) -> None:
+        key = (name, labels)
+        self.__counters[key] = self.__counters.get(key, 0) + amount
+
+    def __observe(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float,
+                  buckets: Sequence[float]) -> None:
+        key = (name, labels)
+        histogram = self.__histograms.get(key)
+        if histogram is None:
+            histogram = self.__histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+
+def _matches(series: Tuple[Tuple[str, str], ...], labels: Dict[str, str]) -> bool:
+    series = dict(series)
+    return all(series.get(name) == str(value) for name, value in labels.items())
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    escaped = ('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in labels)
+    return '{%s}' % ','.join(escaped)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _render_histogram(name: str, labels: Tuple[Tuple[str, str], ...], histogram: _Histogram) -> Iterator[str]:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        yield '%s_bucket%s %s' % (name, _format_labels(labels + (('le', _format_value(bound)),)), cumulative)
+    yield '%s_bucket%s %s' % (name, _format_labels(labels + (('le', '+Inf'),)), histogram.count)
+    yield '%s_sum%s %s' % (name, _format_labels(labels), repr(float(histogram.sum)))
+    yield '%s_count%s %s' % (name, _format_labels(labels), histogram.count)
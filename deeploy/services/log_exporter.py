@@ -0,0 +1,163 @@
+from typing import Any, Dict, Iterator, List, Optional
+import gzip
+import json
+
+# column name, column type and the function that reads the value from a raw prediction log
+PREDICTION_LOG_COLUMNS = [
+    ('id', 'string', lambda log: log.get('id')),
+    ('createdAt', 'string', lambda log: log.get('createdAt')),
+    ('requestBodyBlobLink', 'string', lambda log: log.get('requestBodyBlobLink')),
+    ('requestBody', 'json', lambda log: log.get('requestBody')),
+    ('responseBody', 'json', lambda log: log.get('responseBody')),
+    ('requestLog.id', 'string', lambda log: (log.get('requestLog') or {}).get('id')),
+    ('requestLog.deploymentId', 'string', lambda log: (log.get('requestLog') or {}).get('deploymentId')),
+    ('requestLog.commit', 'string', lambda log: (log.get('requestLog') or {}).get('commit')),
+    ('requestLog.requestContentType', 'string',
+     lambda log: (log.get('requestLog') or {}).get('requestContentType')),
+    ('requestLog.responseTimeMS', 'int', lambda log: (log.get('requestLog') or {}).get('responseTimeMS')),
+    ('requestLog.statusCode', 'int', lambda log: (log.get('requestLog') or {}).get('statusCode')),
+    ('requestLog.personalKeysId', 'string', lambda log: (log.get('requestLog') or {}).get('personalKeysId')),
+    ('requestLog.tokenId', 'string', lambda log: (log.get('requestLog') or {}).get('tokenId')),
+    ('requestLog.createdAt', 'string', lambda log: (log.get('requestLog') or {}).get('createdAt')),
+    ('evaluation.result', 'int', lambda log: (log.get('evaluation') or {}).get('result')),
+    ('evaluation.value', 'json', lambda log: (log.get('evaluation') or {}).get('value')),
+    ('evaluation.explanation', 'string', lambda log: (log.get('evaluation') or {}).get('explanation')),
+    ('actual', 'json', lambda log: log.get('actual') or None),
+    ('tags.primary', 'string', lambda log: (log.get('tags') or {}).get('primary')),
+    ('tags.secondary', 'string_list', lambda log: (log.get('tags') or {}).get('secondary')),
+]
+
+EXPORT_FORMATS = ['parquet', 'arrow', 'jsonl']
+
+
+class ExportCursor(object):
+    """
+    The position of an incremental export: the newest creation time of the exported logs and
+    the IDs of the logs created at that time. A next export only requests the logs created
+    at or after that time and skips the logs that were exported before, so the cursor does
+    not depend on the order of the pages or on logs that were removed
+    """
+
+    def __init__(self, cursor: Optional[str] = None) -> None:
+        """Initialise the cursor
+
+        Parameters
+        ----------
+          cursor: str, optional
+            cursor returned by a previous export
+        """
+        state = json.loads(cursor) if cursor else {}
+        self.created_at = state.get('createdAt')
+        self.__ids = set(state.get('ids', []))
+        self.__exported_created_at = self.created_at
+        self.__exported_ids = set(self.__ids)
+        return
+
+    def filter_pages(self, pages: Iterator[List[dict]]) -> Iterator[List[dict]]:
+        """Yield the pages without the logs that were exported before, and move the cursor
+        past the logs that are yielded
+        """
+        for page in pages:
+            page = [log for log in page if not (log.get('createdAt') == self.__exported_created_at and
+                                                log.get('id') in self.__exported_ids)]
+            for log in page:
+                self.__add(log)
+            if page:
+                yield page
+
+    def dumps(self) -> str:
+        return json.dumps({'createdAt': self.created_at, 'ids': sorted(self.__ids)})
+
+    def __add(self, log: dict) -> None:
+        created_at = log.get('createdAt')
+        if created_at is None:
+            return
+        # the timestamps of the API have the same ISO 8601 format, so they sort as strings
+        if self.created_at is None or created_at > self.created_at:
+            self.created_at = created_at
+            self.__ids = set()
+        if created_at == self.created_at:
+            self.__ids.add(log.get('id'))
+        return
+
+
+def flatten_prediction_logs(logs: List[dict]) -> Dict[str, List[Any]]:
+    """Flatten a page of raw prediction logs into one list of values per column. Nested
+    bodies that have no fixed structure are stored as JSON strings
+    """
+    columns = {}
+    for name, column_type, get_value in PREDICTION_LOG_COLUMNS:
+        values = [get_value(log) for log in logs]
+        if column_type == 'json':
+            values = [json.dumps(value) if value is not None else None for value in values]
+        columns[name] = values
+    return columns
+
+
+def export_prediction_log_pages(pages: Iterator[List[dict]], path: str,
+                                export_format: str = 'parquet') -> int:
+    """Write pages of raw prediction logs to a file, one page at a time
+
+    Parameters
+    ----------
+      pages: Iterator[List[dict]]
+        pages of raw prediction logs
+      path: str
+        path of the file to write
+      export_format: str
+        one of 'parquet', 'arrow' or 'jsonl'. 'jsonl' is written gzip compressed
+
+    Returns the number of exported logs
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise Exception('Unsupported export format %s. Use one of %s.' % (export_format, EXPORT_FORMATS))
+
+    if export_format == 'jsonl':
+        return _export_jsonl(pages, path)
+    return _export_arrow(pages, path, export_format)
+
+
+def _export_jsonl(pages: Iterator[List[dict]], path: str) -> int:
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for page in pages:
+            columns = flatten_prediction_logs(page)
+            for i in range(len(page)):
+                f.write(json.dumps({name: values[i] for name, values in columns.items()}))
+                f.write('\n')
+            count += len(page)
+    return count
+
+
+def _export_arrow(pages: Iterator[List[dict]], path: str, export_format: str) -> int:
+    # only import pyarrow when it is needed
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception('Exporting to %s requires pyarrow. Install it with: pip install deeploy[arrow]' %
+                        export_format)
+
+    column_types = {
+        'string': pyarrow.string(),
+        'json': pyarrow.string(),
+        'int': pyarrow.int64(),
+        'string_list': pyarrow.list_(pyarrow.string()),
+    }
+    schema = pyarrow.schema([(name, column_types[column_type])
+                             for name, column_type, _ in PREDICTION_LOG_COLUMNS])
+
+    if export_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+
+    count = 0
+    try:
+        for page in pages:
+            writer.write_table(pyarrow.Table.from_pydict(flatten_prediction_logs(page), schema=schema))
+            count += len(page)
+    finally:
+        writer.close()
+    return count
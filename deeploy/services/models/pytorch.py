@@ -1,7 +1,6 @@
 from typing import Any
 from os.path import join, exists
 import os
-import subprocess
 
 from torch.nn import Module
 from torch import save
@@ -9,6 +8,7 @@ from torch import save
 from . import BaseModel
 from deeploy.enums import ModelType
 from deeploy.common import PYTORCH_CONFIG_FILE
+from deeploy.services.torchserve_archive import build_model_archive
 
 
 class PyTorchModel(BaseModel):
@@ -18,7 +18,8 @@ class PyTorchModel(BaseModel):
     __handler_file_path: str = None
 
     def __init__(self, model_object: Any, pytorch_model_file_path: str,
-                 pytorch_torchserve_handler_name: str = 'image_classifier', **kwargs) -> None:
+                 pytorch_torchserve_handler_name: str = 'image_classifier',
+                 pytorch_archive_compression_level: int = None, **kwargs) -> None:
 
         if not issubclass(type(model_object), Module):
             raise Exception('Not a valid PyTorch class')
@@ -33,43 +34,18 @@ class PyTorchModel(BaseModel):
 
         self.__pytorch_model = model_object
         self.__model_file_path = pytorch_model_file_path
-        self.__handler_name = pytorch_torchserve_handler_name
+        self.__handler_name = pytorch_torchserve_handler_name if pytorch_torchserve_handler_name \
+            else 'image_classifier'
+        self.__compression_level = pytorch_archive_compression_level
         return
 
     def save(self, local_folder_path: str) -> None:
-        serialized_model_path = join(os.getcwd(), 'model.pt')
-        mar_folder_path = join(local_folder_path, 'model-store')
-        save(self.__pytorch_model.state_dict(), serialized_model_path)
-
-        mar_command = "torch-model-archiver --model-name model --version 1.0 --serialized-file %s \
-            --export-path %s" % (serialized_model_path, mar_folder_path)
-
-        if self.__model_file_path.endswith('.py'):
-            mar_command += " --model-file %s" % self.__model_file_path
-
-        elif self.__model_file_path.endswith('.ipynb'):
-            convert_command = "ipython nbconvert --to script %s" % self.__model_file_path
-
-            ipy_process = subprocess.Popen(
-                convert_command.split(), stdout=subprocess.PIPE)
-            _, error = ipy_process.communicate()
-            if error:
-                raise Exception(error)
-
-            mar_command += " --model-file %s" % self.__model_file_path.replace(
-                '.ipynb', '.py')
-
-        mar_command += " --handler %s" % self.__handler_name
-
-        if not os.path.exists(mar_folder_path):
-            os.makedirs(mar_folder_path)
-
-        mar_process = subprocess.Popen(
-            mar_command.split(), stdout=subprocess.PIPE)
-        _, error = mar_process.communicate()
-        if error:
-            raise Exception(error)
-        mar_process.wait()
+        # the state dict is streamed straight into the archive
+        build_model_archive(
+            join(local_folder_path, 'model-store'), 'model',
+            lambda f: save(self.__pytorch_model.state_dict(), f),
+            self.__model_file_path, self.__handler_name,
+            compression_level=self.__compression_level)
 
         config_folder_path = join(local_folder_path, 'config')
         if not os.path.exists(config_folder_path):
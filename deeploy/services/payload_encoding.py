@@ -0,0 +1,221 @@
+from typing import Any, Iterator, List, Mapping, Tuple, Union
+import gzip
+import json
+
+from deeploy.models import EncodingOptions
+
+PAYLOAD_FORMATS = ['json', 'msgpack', 'kserve_binary']
+COMPRESSIONS = ['gzip', 'zstd']
+INFERENCE_HEADER_CONTENT_LENGTH = 'Inference-Header-Content-Length'
+
+# NumPy dtype names by KServe V2 tensor datatype
+KSERVE_DATATYPES = {
+    'BOOL': 'bool',
+    'UINT8': 'uint8',
+    'UINT16': 'uint16',
+    'UINT32': 'uint32',
+    'UINT64': 'uint64',
+    'INT8': 'int8',
+    'INT16': 'int16',
+    'INT32': 'int32',
+    'INT64': 'int64',
+    'FP16': 'float16',
+    'FP32': 'float32',
+    'FP64': 'float64',
+}
+NUMPY_DATATYPES = {dtype: datatype for datatype, dtype in KSERVE_DATATYPES.items()}
+
+
+def is_array(value: Any) -> bool:
+    """Check if a value is a NumPy array, without importing NumPy
+    """
+    return hasattr(value, '__array_interface__') and hasattr(value, 'dtype')
+
+
+def to_serializable(value: Any) -> Any:
+    """Convert NumPy arrays and scalars to values the JSON and msgpack encoders support
+    """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError('Object of type %s is not serializable' % type(value).__name__)
+
+
+class BufferedBody(object):
+    """
+    A request body made of several buffers that are sent one after the other, so that
+    NumPy arrays are sent from their own memory instead of being copied into one body
+    """
+
+    def __init__(self, buffers: List[Union[bytes, memoryview]]) -> None:
+        self.__buffers = buffers
+        self.__length = sum(len(buffer) for buffer in buffers)
+        return
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        return iter(self.__buffers)
+
+    def tobytes(self) -> bytes:
+        return b''.join(self.__buffers)
+
+
+class PayloadEncoder(object):
+    """
+    A class that encodes the request bodies of predict and explain calls and decodes
+    their responses
+    """
+
+    def __init__(self, options: EncodingOptions = None) -> None:
+        self.options = options if options else EncodingOptions()
+        if self.options.format not in PAYLOAD_FORMATS:
+            raise Exception('Unsupported payload format %s. Use one of %s.' %
+                            (self.options.format, PAYLOAD_FORMATS))
+        if self.options.compression and self.options.compression not in COMPRESSIONS:
+            raise Exception('Unsupported compression %s. Use one of %s.' %
+                            (self.options.compression, COMPRESSIONS))
+        return
+
+    def encode(self, request_body: Any, zero_copy: bool = True) -> Tuple[Union[bytes, BufferedBody], dict]:
+        """Encode a request body
+
+        Parameters
+        ----------
+          request_body: Any
+            the request body, which can contain NumPy arrays
+          zero_copy: bool
+            whether the body can be returned as separate buffers. HTTP clients that only
+            send bytes need a single buffer
+
+        Returns the body and the headers to send it with
+        """
+        if self.options.format == 'kserve_binary':
+            body, headers = self.__encode_kserve_binary(request_body)
+        elif self.options.format == 'msgpack':
+            # only import msgpack when it is needed
+            try:
+                import msgpack
+            except ImportError:
+                raise Exception('The msgpack payload format requires msgpack. Install it with: '
+                                'pip install msgpack')
+            body = msgpack.packb(request_body, default=to_serializable, use_bin_type=True)
+            headers = {'Content-Type': 'application/msgpack', 'Accept': 'application/msgpack'}
+        else:
+            body = json.dumps(request_body, default=to_serializable, separators=(',', ':')).encode()
+            headers = {'Content-Type': 'application/json'}
+
+        if self.options.compression and len(body) >= self.options.min_compression_size:
+            body = self.__compress(body.tobytes() if isinstance(body, BufferedBody) else body)
+            headers['Content-Encoding'] = self.options.compression
+        elif isinstance(body, BufferedBody) and not zero_copy:
+            body = body.tobytes()
+        return body, headers
+
+    def decode(self, content: bytes, headers: Mapping[str, str]) -> Any:
+        """Decode a response body. Compressed responses are already decompressed by the
+        HTTP client
+
+        Parameters
+        ----------
+          content: bytes
+            the response body
+          headers: Mapping[str, str]
+            the case-insensitive response headers
+        """
+        header_length = headers.get(INFERENCE_HEADER_CONTENT_LENGTH)
+        if header_length is not None:
+            return self.__decode_kserve_binary(content, int(header_length))
+        if 'msgpack' in headers.get('Content-Type', ''):
+            import msgpack
+            return msgpack.unpackb(content, raw=False)
+        return json.loads(content)
+
+    def __compress(self, body: bytes) -> bytes:
+        if self.options.compression == 'zstd':
+            # only import zstandard when it is needed
+            try:
+                import zstandard
+            except ImportError:
+                raise Exception('The zstd compression requires zstandard. Install it with: '
+                                'pip install zstandard')
+            level = self.options.compression_level
+            return zstandard.ZstdCompressor(**({'level': level} if level is not None else {})).compress(body)
+        level = self.options.compression_level
+        return gzip.compress(body, **({'compresslevel': level} if level is not None else {}))
+
+    def __encode_kserve_binary(self, request_body: dict) -> Tuple[BufferedBody, dict]:
+        if not isinstance(request_body, dict) or 'inputs' not in request_body:
+            raise Exception('The kserve_binary payload format requires a V2 inference request with inputs.')
+
+        buffers = []
+        inputs = []
+        for tensor in request_body['inputs']:
+            data = tensor.get('data')
+            if not is_array(data):
+                inputs.append(tensor)
+                continue
+            array = self.__to_little_endian(data)
+            datatype = NUMPY_DATATYPES.get(array.dtype.name)
+            if datatype is None:
+                raise Exception('Arrays of type %s can not be sent as binary tensors.' % array.dtype.name)
+            binary_tensor = {key: value for key, value in tensor.items() if key != 'data'}
+            binary_tensor['shape'] = list(array.shape)
+            binary_tensor['datatype'] = datatype
+            binary_tensor['parameters'] = {**tensor.get('parameters', {}), 'binary_data_size': array.nbytes}
+            inputs.append(binary_tensor)
+            # the array is sent from its own memory
+            buffers.append(memoryview(array).cast('B'))
+
+        header = {**request_body, 'inputs': inputs,
+                  'parameters': {**request_body.get('parameters', {}), 'binary_data_output': True}}
+        header_bytes = json.dumps(header, default=to_serializable, separators=(',', ':')).encode()
+        headers = {'Content-Type': 'application/octet-stream',
+                   INFERENCE_HEADER_CONTENT_LENGTH: str(len(header_bytes))}
+        return BufferedBody([header_bytes] + buffers), headers
+
+    def __decode_kserve_binary(self, content: bytes, header_length: int) -> dict:
+        # only import numpy when it is needed
+        import numpy
+
+        body = json.loads(content[:header_length])
+        offset = header_length
+        for output in body.get('outputs', []):
+            parameters = output.get('parameters', {})
+            size = parameters.pop('binary_data_size', None)
+            if size is None:
+                continue
+            datatype = output.get('datatype')
+            if datatype == 'BYTES':
+                output['data'] = self.__decode_bytes_tensor(content[offset:offset + size], output['shape'])
+            elif datatype in KSERVE_DATATYPES:
+                dtype = numpy.dtype(KSERVE_DATATYPES[datatype]).newbyteorder('<')
+                # the array is a read-only view on the response body
+                output['data'] = numpy.frombuffer(content, dtype=dtype, count=size // dtype.itemsize,
+                                                  offset=offset).reshape(output['shape'])
+            else:
+                raise Exception('Binary outputs of type %s can not be decoded.' % datatype)
+            offset += size
+        return body
+
+    def __decode_bytes_tensor(self, data: bytes, shape: List[int]) -> Any:
+        import numpy
+
+        # every element is prefixed with its length as a 4-byte little-endian integer
+        elements = []
+        offset = 0
+        while offset < len(data):
+            length = int.from_bytes(data[offset:offset + 4], 'little')
+            elements.append(data[offset + 4:offset + 4 + length])
+            offset += 4 + length
+        array = numpy.empty(len(elements), dtype=object)
+        array[:] = elements
+        return array.reshape(shape)
+
+    def __to_little_endian(self, array: Any) -> Any:
+        import numpy
+
+        array = numpy.ascontiguousarray(array)
+        if array.dtype.byteorder == '>':
+            array = array.astype(array.dtype.newbyteorder('<'))
+        return array
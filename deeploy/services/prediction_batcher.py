@@ -0,0 +1,221 @@
+from typing import Any, Callable, List
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+
+from deeploy.models import V1Prediction, V2Prediction
+
+
+class _PendingPrediction(object):
+
+    def __init__(self, instances: List[Any]) -> None:
+        self.instances = instances
+        self.future = Future()
+        self.created_at = time.monotonic()
+        return
+
+
+def split_prediction(prediction: V1Prediction or V2Prediction,
+                     sizes: List[int]) -> List[V1Prediction or V2Prediction]:
+    """Split the prediction of a combined request back into one prediction per caller
+
+    Parameters
+    ----------
+      prediction: V1Prediction or V2Prediction
+        the prediction of the combined request
+      sizes: List[int]
+        the number of instances each caller contributed, in request order
+    """
+    if len(prediction.predictions) != sum(sizes):
+        raise Exception('The number of predictions does not match the number of instances.')
+
+    prediction_log_ids = getattr(prediction, 'predictionLogIds', None)
+    if prediction_log_ids is not None and len(prediction_log_ids) != sum(sizes):
+        raise Exception('The number of prediction logs does not match the number of instances.')
+
+    predictions = []
+    offset = 0
+    for size in sizes:
+        update = {'predictions': prediction.predictions[offset:offset + size]}
+        if prediction_log_ids is not None:
+            update['predictionLogIds'] = prediction_log_ids[offset:offset + size]
+        predictions.append(prediction.copy(update=update))
+        offset += size
+    return predictions
+
+
+def predict_in_batches(predict: Callable[[dict], V1Prediction or V2Prediction],
+                       instance_lists: List[List[Any]],
+                       max_batch_size: int) -> List[V1Prediction or V2Prediction]:
+    """Combine lists of instances into as few requests as possible and split the results
+
+    Parameters
+    ----------
+      predict: Callable
+        function that sends one request body to the predict endpoint
+      instance_lists: List[List[Any]]
+        the instances of every caller
+      max_batch_size: int
+        maximum number of instances in one request. A single caller with more
+        instances is sent in its own request
+    """
+    predictions = []
+    batch, sizes = [], []
+    for instances in instance_lists:
+        if sizes and len(batch) + len(instances) > max_batch_size:
+            predictions += split_prediction(predict({'instances': batch}), sizes)
+            batch, sizes = [], []
+        batch += instances
+        sizes.append(len(instances))
+    if sizes:
+        predictions += split_prediction(predict({'instances': batch}), sizes)
+    return predictions
+
+
+class PredictionBatcher(object):
+    """
+    A class that collects the instances of many predict calls and sends them in
+    combined requests, flushing when max_batch_size instances are pending or the
+    oldest pending call has waited max_delay seconds
+    """
+
+    def __init__(self, predict: Callable[[dict], V1Prediction or V2Prediction],
+                 max_batch_size: int = 64, max_delay: float = 0.01,
+                 max_concurrency: int = 1) -> None:
+        """Initialise the batcher
+
+        Parameters
+        ----------
+          predict: Callable
+            function that sends one request body to the predict endpoint
+          max_batch_size: int
+            maximum number of instances in one request
+          max_delay: float
+            maximum number of seconds a call waits for other calls to join its batch
+          max_concurrency: int
+            maximum number of batched requests that are in flight at the same time
+        """
+        self.__predict = predict
+        self.__max_batch_size = max_batch_size
+        self.__max_delay = max_delay
+        self.__pending = []
+        self.__pending_size = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        # a batch is only taken when a worker is free, so that under load the instances wait in
+        # the pending list and form larger batches instead of queueing in the executor
+        self.__free_workers = threading.Semaphore(max_concurrency)
+        self.__worker = threading.Thread(target=self.__run, daemon=True)
+        self.__worker.start()
+        return
+
+    def submit(self, instances: List[Any]) -> Future:
+        """Queue instances for prediction and return a future with their prediction
+
+        Parameters
+        ----------
+          instances: List[Any]
+            the instances of this call, as they would appear in the 'instances'
+            field of a request body
+        """
+        pending = _PendingPrediction(list(instances))
+        with self.__condition:
+            if self.__closed:
+                raise Exception('The prediction batcher is closed.')
+            self.__pending.append(pending)
+            self.__pending_size += len(pending.instances)
+            self.__condition.notify()
+        return pending.future
+
+    def predict(self, request_body: dict) -> V1Prediction or V2Prediction:
+        """Make a predict call that is combined with concurrent calls
+
+        Parameters
+        ----------
+          request_body: dict
+            request body with an 'instances' field
+        """
+        return self.submit(request_body['instances']).result()
+
+    def flush(self) -> None:
+        """Send all pending instances immediately from the calling thread
+        """
+        while True:
+            with self.__condition:
+                batch = self.__take_batch()
+            if not batch:
+                return
+            self.__send(batch)
+
+    def close(self) -> None:
+        """Send all pending instances and stop the batcher
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        self.__worker.join()
+        self.__executor.shutdown(wait=True)
+        return
+
+    def __enter__(self) -> 'PredictionBatcher':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        return
+
+    def __run(self) -> None:
+        while True:
+            self.__free_workers.acquire()
+            with self.__condition:
+                while not self.__pending and not self.__closed:
+                    self.__condition.wait()
+                if not self.__pending:
+                    self.__free_workers.release()
+                    return
+
+                deadline = self.__pending[0].created_at + self.__max_delay
+                while self.__pending_size < self.__max_batch_size and not self.__closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+                batch = self.__take_batch()
+            self.__executor.submit(self.__send_on_worker, batch)
+
+    def __take_batch(self) -> List[_PendingPrediction]:
+        count, size = 0, 0
+        for pending in self.__pending:
+            if count and size + len(pending.instances) > self.__max_batch_size:
+                break
+            count += 1
+            size += len(pending.instances)
+
+        batch = self.__pending[:count]
+        del self.__pending[:count]
+        self.__pending_size -= sum(len(pending.instances) for pending in batch)
+        return batch
+
+    def __send_on_worker(self, batch: List[_PendingPrediction]) -> None:
+        try:
+            self.__send(batch)
+        finally:
+            self.__free_workers.release()
+        return
+
+    def __send(self, batch: List[_PendingPrediction]) -> None:
+        if not batch:
+            return
+        try:
+            instances = [instance for pending in batch for instance in pending.instances]
+            prediction = self.__predict({'instances': instances})
+            predictions = split_prediction(prediction, [len(pending.instances) for pending in batch])
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        for pending, pending_prediction in zip(batch, predictions):
+            pending.future.set_result(pending_prediction)
+        return
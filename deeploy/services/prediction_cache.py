@@ -0,0 +1,92 @@
+from typing import Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+
+def hash_request_body(request_body: Any) -> str:
+    """Return a SHA-256 hex digest of a request body that does not depend on the order
+    of its keys
+    """
+    canonical_body = json.dumps(request_body, sort_keys=True, separators=(',', ':'), default=_canonical_value)
+    return hashlib.sha256(canonical_body.encode()).hexdigest()
+
+
+def _canonical_value(value: Any) -> Any:
+    # the str() of a large NumPy array is abbreviated, so arrays are hashed by their contents
+    if hasattr(value, 'tobytes') and hasattr(value, 'dtype'):
+        return [str(value.dtype), list(getattr(value, 'shape', ())),
+                hashlib.sha256(value.tobytes()).hexdigest()]
+    return str(value)
+
+
+class PredictionCache(object):
+    """
+    A class that keeps prediction responses in memory, bounded in size and age
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300) -> None:
+        """Initialise the cache
+
+        Parameters
+        ----------
+          max_size: int
+            maximum number of cached responses, the least recently used response is evicted first
+          ttl: float
+            number of seconds a cached response is used
+        """
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__entries: 'OrderedDict[Tuple[str, Optional[str], str], Tuple[float, Any]]' = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def get(self, deployment_id: str, commit: Optional[str], request_body: Any) -> Optional[Any]:
+        """Return the cached response for a request body, if it is there and not expired
+        """
+        key = (deployment_id, commit, hash_request_body(request_body))
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.__ttl:
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, deployment_id: str, commit: Optional[str], request_body: Any, response: Any) -> None:
+        """Store the response for a request body
+        """
+        if self.__max_size <= 0:
+            return
+        key = (deployment_id, commit, hash_request_body(request_body))
+        with self.__lock:
+            self.__entries[key] = (time.monotonic(), response)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+        return
+
+    def invalidate(self, deployment_id: str = None) -> None:
+        """Remove the cached responses of one deployment, or of all deployments
+        """
+        with self.__lock:
+            if deployment_id is None:
+                self.__entries.clear()
+            else:
+                for key in [key for key in self.__entries if key[0] == deployment_id]:
+                    del self.__entries[key]
+        return
+
+    def stats(self) -> dict:
+        """Return the number of cached responses, hits and misses
+        """
+        with self.__lock:
+            return {'size': len(self.__entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import os
+import re
+import time
+
+from deeploy.services.index_file import IndexFile
+
+SCP_LIKE_URL = re.compile(r'^[\w.-]+@([^:/]+):(.*)$')
+
+
+def normalize_remote_url(remote_url: str) -> str:
+    """Return a git remote URL in a form that is equal for the ssh, https and scp-like
+    notations of the same repository, with or without the .git suffix
+    """
+    url = remote_url.strip()
+    match = SCP_LIKE_URL.match(url)
+    if match:
+        host, path = match.groups()
+    else:
+        parsed_url = urlparse(url)
+        if not (parsed_url.scheme and parsed_url.hostname):
+            # a local path or an unknown notation is only equal to itself
+            return url.rstrip('/')
+        host, path = parsed_url.hostname, parsed_url.path
+
+    path = path.strip('/')
+    if path.endswith('.git'):
+        path = path[:-len('.git')]
+    return '%s/%s' % (host.lower(), path)
+
+
+class RepositoryIndex(object):
+    """
+    A class that keeps a local index of the repositories in a workspace by their normalized
+    remote URL, for a limited time
+    """
+
+    def __init__(self, cache_dir: str, ttl: float) -> None:
+        """Initialise the index
+
+        Parameters
+        ----------
+          cache_dir: str
+            directory in which the index file is stored
+          ttl: float
+            number of seconds the repositories of a workspace are remembered
+        """
+        self.__index = IndexFile(os.path.join(cache_dir, 'repositories.json'), 'repository index')
+        self.__ttl = ttl
+        return
+
+    def get(self, workspace_key: str, remote_url: str) -> Optional[str]:
+        """Return the id of the repository with a remote URL, if the workspace was indexed
+        recently and contains it
+        """
+        workspace = self.__index.read().get(workspace_key)
+        if not workspace or time.time() - workspace['updatedAt'] >= self.__ttl:
+            return None
+        return workspace['repositories'].get(normalize_remote_url(remote_url))
+
+    def put(self, workspace_key: str, repository_ids: Dict[str, str]) -> None:
+        """Store the repository ids of a workspace by their normalized remote URL
+        """
+        self.__index.update(lambda index: index.update(
+            {workspace_key: {'updatedAt': time.time(), 'repositories': repository_ids}}))
+        return
@@ -0,0 +1,92 @@
+import base64
+
+import requests
+from pydantic import parse_obj_as
+
+from deeploy.models import V1Prediction, V2Prediction
+from deeploy.enums import PredictionVersion, AuthType
+
+
+class TransientRequestError(Exception):
+    """
+    An API call that failed with a status code that may succeed when the call is repeated
+    """
+
+
+def request_is_successful(status_code: int) -> bool:
+    return str(status_code)[0] == '2'
+
+
+def is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Return whether a failed call may succeed when it is repeated, as opposed to errors
+    like a missing permission or an invalid request
+    """
+    return isinstance(error, (TransientRequestError, requests.ConnectionError, requests.Timeout))
+
+
+def get_auth_header(supported_auth: AuthType, access_key: str = None, secret_key: str = None,
+                    token: str = None) -> dict:
+    if (access_key and secret_key) and \
+            (supported_auth == AuthType.BASIC or supported_auth == AuthType.ALL):
+        credentials = access_key + ":" + secret_key
+        b64Val = base64.b64encode(credentials.encode()).decode()
+        header = {'Authorization': 'Basic %s' % b64Val}
+    elif (token) and \
+            (supported_auth == AuthType.TOKEN or supported_auth == AuthType.ALL):
+        header = {'Authorization': 'Bearer ' + token}
+    elif (access_key and secret_key) and \
+            not (supported_auth == AuthType.BASIC or supported_auth == AuthType.ALL):
+        raise Exception('This function currently does not support Basic authentication.')
+    else:
+        raise Exception('This function currently does not support Token authentication.')
+
+    return header
+
+
+def check_prediction_version(prediction_body: dict) -> PredictionVersion:
+    if len(prediction_body) > 1:
+        return PredictionVersion.V2
+    else:
+        return PredictionVersion.V1
+
+
+def parse_prediction(prediction_body: dict) -> V1Prediction or V2Prediction:
+    if 'outputs' in prediction_body:
+        # a response of the V2 inference protocol can hold NumPy arrays, which are
+        # not validated element by element
+        return V2Prediction.construct(
+            predictions=[output.get('data') for output in prediction_body['outputs']],
+            requestLogId=prediction_body.get('requestLogId'),
+            predictionLogIds=prediction_body.get('predictionLogIds'))
+    if check_prediction_version(prediction_body) == PredictionVersion.V1:
+        prediction = parse_obj_as(V1Prediction, prediction_body)
+    else:
+        prediction = parse_obj_as(V2Prediction, prediction_body)
+    return prediction
+
+
+def check_evaluation_input(evaluation_input: dict) -> None:
+    if ((evaluation_input['result'] == 0) and ('value' in evaluation_input)):
+        raise Exception('An evaluation value can not be provided when confirming the inference.')
+
+
+def check_evaluation_status(status_code: int) -> None:
+    if not request_is_successful(status_code):
+        if status_code == 409:
+            raise Exception('Log has already been evaluated.')
+        elif status_code == 401:
+            raise Exception('No permission to perform this action.')
+        else:
+            raise Exception('Failed to request evaluation.')
+
+
+def check_actuals_status(status_code: int) -> None:
+    if not request_is_successful(status_code):
+        if status_code == 401:
+            raise Exception('No permission to perform this action.')
+        else:
+            raise Exception('Failed to submit actuals.')
@@ -0,0 +1,119 @@
+from typing import Dict, Optional
+from email.utils import parsedate_to_datetime
+import datetime
+import random
+import threading
+import time
+
+from deeploy.models import RetryOptions
+
+IDEMPOTENT_METHODS = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+
+
+class CircuitBreaker(object):
+    """
+    A class that stops calls to a failing target after a number of consecutive failures,
+    and lets a single trial call through once the reset timeout has passed
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        self.__threshold = threshold
+        self.__reset_timeout = reset_timeout
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_in_progress = False
+        self.__lock = threading.Lock()
+        return
+
+    @property
+    def is_open(self) -> bool:
+        with self.__lock:
+            return self.__opened_at is not None
+
+    def allow_call(self) -> bool:
+        with self.__lock:
+            if self.__opened_at is None:
+                return True
+            if self.__trial_in_progress or time.monotonic() - self.__opened_at < self.__reset_timeout:
+                return False
+            self.__trial_in_progress = True
+            return True
+
+    def record_success(self) -> None:
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial_in_progress = False
+        return
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.__failures += 1
+            if self.__trial_in_progress or self.__failures >= self.__threshold:
+                self.__opened_at = time.monotonic()
+            self.__trial_in_progress = False
+        return
+
+
+class RetryPolicy(object):
+    """
+    A class that decides whether and when a failed call is retried, independent of the
+    HTTP library that makes the call
+    """
+
+    def __init__(self, options: RetryOptions = None) -> None:
+        self.options = options if options else RetryOptions()
+        self.__circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.__lock = threading.Lock()
+        return
+
+    def get_timeout(self, endpoint: Optional[str], default: Optional[float]) -> Optional[float]:
+        return self.options.timeouts.get(endpoint, default) if endpoint else default
+
+    def is_idempotent(self, method: str, idempotent: Optional[bool]) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+    def should_retry_status(self, attempt: int, status_code: int, idempotent: bool) -> bool:
+        if attempt >= self.options.max_retries or status_code not in self.options.retry_status_codes:
+            return False
+        # a 429 response means the request was not processed, so it is safe to repeat
+        return status_code == 429 or idempotent
+
+    def should_retry_error(self, attempt: int, request_sent: bool, idempotent: bool) -> bool:
+        if attempt >= self.options.max_retries:
+            return False
+        return not request_sent or idempotent
+
+    def is_failure_status(self, status_code: int) -> bool:
+        return status_code == 429 or status_code >= 500
+
+    def get_backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and self.options.respect_retry_after:
+            delay = self.__parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.options.max_backoff)
+
+        backoff = min(self.options.backoff_factor * 2 ** attempt, self.options.max_backoff)
+        return random.uniform(0, backoff) if self.options.jitter else backoff
+
+    def get_circuit_breaker(self, key: Optional[str]) -> Optional[CircuitBreaker]:
+        if not key or not self.options.circuit_breaker_threshold:
+            return None
+        with self.__lock:
+            if key not in self.__circuit_breakers:
+                self.__circuit_breakers[key] = CircuitBreaker(
+                    self.options.circuit_breaker_threshold, self.options.circuit_breaker_reset_timeout)
+            return self.__circuit_breakers[key]
+
+    def __parse_retry_after(self, retry_after: str) -> Optional[float]:
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0)
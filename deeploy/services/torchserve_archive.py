@@ -0,0 +1,129 @@
+from typing import BinaryIO, Callable, Optional
+from os.path import basename, join, splitext
+import json
+import os
+import zipfile
+
+MANIFEST_PATH = 'MAR-INF/MANIFEST.json'
+# the archives have the layout and manifest of this torch-model-archiver version
+ARCHIVER_VERSION = '0.3.1'
+# every entry gets the same timestamp, so that an unchanged model gives an identical
+# archive and its folder fingerprint does not change between deploys
+ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def convert_notebook_to_script(notebook_path: str) -> str:
+    """Return the code cells of a Jupyter notebook as a Python script. IPython magics and
+    shell commands are commented out, because they can not run in TorchServe
+
+    Parameters
+    ----------
+      notebook_path: str
+        path of the .ipynb file
+    """
+    try:
+        with open(notebook_path, encoding='utf-8') as f:
+            notebook = json.load(f)
+    except (IOError, ValueError) as e:
+        raise Exception('Failed to read the notebook %s. Reason: %s' % (notebook_path, e))
+
+    cells = []
+    for cell in notebook.get('cells', []):
+        if cell.get('cell_type') != 'code':
+            continue
+        source = cell.get('source', '')
+        source = ''.join(source) if isinstance(source, list) else source
+        lines = ['# %s' % line if line.lstrip().startswith(('%', '!')) else line
+                 for line in source.splitlines()]
+        cells.append('\n'.join(lines))
+    return '#!/usr/bin/env python\n# coding: utf-8\n\n' + '\n\n\n'.join(cells) + '\n'
+
+
+def build_model_archive(export_path: str, model_name: str, write_serialized_file: Callable[[BinaryIO], None],
+                        model_file_path: str, handler: str, version: str = '1.0',
+                        serialized_file_name: str = 'model.pt',
+                        compression_level: Optional[int] = None) -> str:
+    """Write a TorchServe model archive (.mar) without calling torch-model-archiver. The
+    serialized model is streamed into the archive, so it is never written to disk on its own
+
+    Parameters
+    ----------
+      export_path: str
+        folder in which the archive is written
+      model_name: str
+        name of the model, the archive is called <model_name>.mar
+      write_serialized_file: Callable[[BinaryIO], None]
+        called with a writable binary stream to write the serialized model to
+      model_file_path: str
+        path of the .py file with the model class, or of a .ipynb notebook that is
+        converted to a script
+      handler: str
+        name of a default TorchServe handler, or the path of a .py file with a custom handler
+      version: str
+        version of the model
+      serialized_file_name: str
+        name of the serialized model in the archive
+      compression_level: int, optional
+        zlib compression level from 0 to 9. 0 stores the files without compression, which
+        is fastest for weights that hardly compress. Defaults to the zlib default
+
+    Returns the path of the archive
+    """
+    if compression_level is not None and not 0 <= compression_level <= 9:
+        raise Exception('The compression level must be between 0 and 9.')
+    if compression_level == 0:
+        compression, compression_level = zipfile.ZIP_STORED, None
+    else:
+        compression = zipfile.ZIP_DEFLATED
+
+    model_file_name = splitext(basename(model_file_path))[0] + '.py'
+    manifest_model = {
+        'modelName': model_name,
+        'serializedFile': serialized_file_name,
+        'handler': basename(handler),
+        'modelFile': model_file_name,
+        'modelVersion': version,
+    }
+    # the optional createdOn field is left out, because it would change the archive on
+    # every build
+    manifest = {
+        'runtime': 'python',
+        'model': manifest_model,
+        'archiverVersion': ARCHIVER_VERSION,
+    }
+
+    os.makedirs(export_path, exist_ok=True)
+    archive_path = join(export_path, '%s.mar' % model_name)
+    with zipfile.ZipFile(archive_path, 'w', compression=compression, compresslevel=compression_level,
+                         allowZip64=True) as archive:
+        # the size of the serialized model is not known up front, so it is always written
+        # with zip64 headers
+        with archive.open(get_entry_info(serialized_file_name, compression, compression_level), 'w',
+                          force_zip64=True) as f:
+            write_serialized_file(f)
+
+        if model_file_path.endswith('.ipynb'):
+            model_file = convert_notebook_to_script(model_file_path)
+        else:
+            model_file = read_file(model_file_path)
+        archive.writestr(get_entry_info(model_file_name, compression, compression_level), model_file)
+        if handler.endswith('.py'):
+            archive.writestr(get_entry_info(basename(handler), compression, compression_level),
+                             read_file(handler))
+        archive.writestr(get_entry_info(MANIFEST_PATH, compression, compression_level),
+                         json.dumps(manifest, indent=4))
+    return archive_path
+
+
+def get_entry_info(name: str, compression: int, compression_level: Optional[int]) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=ENTRY_DATE_TIME)
+    info.compress_type = compression
+    # ZipFile.open only applies the compression level of the archive to entries it names itself
+    info._compresslevel = compression_level
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
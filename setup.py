@@ -22,7 +22,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     author='Tim Kleinloog',
     author_email='opensource@deeploy.ml',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
     url="https://gitlab.com/deeploy-ml/deeploy-python-client",
     project_urls={
         "Documentation": "https://deeploy-ml.gitlab.io/deeploy-python-client/",
@@ -34,14 +34,15 @@ setuptools.setup(
         "requests==2.26.0",
         "joblib>=1.0.1",
         "dill>=0.3.3",
-        "ipython>=7.26.0",
-        "nbconvert>=6.0.7",
-        "torch-model-archiver==0.3.1",
     ],
+    extras_require={
+        "async": ["httpx>=0.18.0"],
+        "arrow": ["pyarrow>=14.0.0", "pandas>=1.1.0", "numpy>=1.17.0"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
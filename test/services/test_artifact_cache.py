@@ -0,0 +1,27 @@
+from deeploy.services.artifact_cache import ArtifactCache, hash_folder
+
+
+def test_hash_folder(tmp_path):
+    first = tmp_path / 'first'
+    second = tmp_path / 'second'
+    for folder in [first, second]:
+        (folder / '1' / 'variables').mkdir(parents=True)
+        (folder / '1' / 'saved_model.pb').write_bytes(b'graph')
+        (folder / '1' / 'variables' / 'variables.data').write_bytes(b'weights')
+
+    assert hash_folder(str(first)) == hash_folder(str(second))
+
+    (second / '1' / 'variables' / 'variables.data').write_bytes(b'new weights')
+    assert hash_folder(str(first)) != hash_folder(str(second))
+
+    (second / '1' / 'variables' / 'variables.data').rename(second / '1' / 'variables.data')
+    (second / '1' / 'variables.data').write_bytes(b'weights')
+    assert hash_folder(str(first)) != hash_folder(str(second))
+
+
+def test_artifact_cache(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    assert cache.get('abc') is None
+
+    cache.put('abc', 's3://bucket/model')
+    assert ArtifactCache(str(tmp_path / 'cache')).get('abc') == 's3://bucket/model'
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from deeploy.services import AsyncDeeployService
+from deeploy.models import V1Prediction, V2Prediction, RequestLogs, RetryOptions
+
+httpx = pytest.importorskip('httpx')
+
+WORKSPACE_ID = 'abc'
+DEPLOYMENT_ID = '20c2593d-e09d-4246-be84-46f81a40a7d4'
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    routes = {}
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status_code, body = routes[(request.method, request.url.path)]
+        return httpx.Response(status_code, json=body)
+
+    async_client = httpx.AsyncClient
+
+    def mocked_async_client(**kwargs):
+        return async_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(httpx, 'AsyncClient', mocked_async_client)
+    return routes, requests
+
+
+def test_predict(mock_api):
+    routes, requests = mock_api
+    path = '/workspaces/%s/deployments/%s/predict' % (WORKSPACE_ID, DEPLOYMENT_ID)
+    routes[('POST', path)] = (200, {'predictions': [0, 1]})
+
+    async def run():
+        async with AsyncDeeployService(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                                       token='abc', max_concurrency=2) as service:
+            return await asyncio.gather(*[
+                service.predict(WORKSPACE_ID, DEPLOYMENT_ID, {'instances': [[1], [2]]})
+                for _ in range(5)])
+
+    predictions = asyncio.run(run())
+    assert predictions == [V1Prediction(predictions=[0, 1])] * 5
+    assert json.loads(requests[0].content) == {'instances': [[1], [2]]}
+    assert requests[0].headers['Authorization'] == 'Bearer abc'
+
+    routes[('POST', path)] = (200, {'predictions': [0], 'requestLogId': 'def',
+                                    'predictionLogIds': ['ghi']})
+
+    async def run_v2():
+        async with AsyncDeeployService(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                                       token='abc') as service:
+            return await service.predict(WORKSPACE_ID, DEPLOYMENT_ID, {'instances': [[1]]})
+
+    assert asyncio.run(run_v2()) == V2Prediction(predictions=[0], requestLogId='def',
+                                                 predictionLogIds=['ghi'])
+
+    routes[('POST', path)] = (400, {})
+    with pytest.raises(Exception):
+        asyncio.run(run_v2())
+
+
+def test_getRequestLogs(mock_api):
+    routes, _ = mock_api
+    path = '/workspaces/%s/deployments/%s/requestLogs' % (WORKSPACE_ID, DEPLOYMENT_ID)
+    routes[('GET', path)] = (200, {'data': [], 'count': 0})
+
+    async def run():
+        async with AsyncDeeployService(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                                       token='abc') as service:
+            return await service.getRequestLogs(WORKSPACE_ID, DEPLOYMENT_ID)
+
+    assert asyncio.run(run()) == RequestLogs(data=[], count=0)
+
+
+def test_actuals(mock_api):
+    routes, _ = mock_api
+    path = '/workspaces/%s/deployments/%s/actuals' % (WORKSPACE_ID, DEPLOYMENT_ID)
+    routes[('PUT', path)] = (401, {})
+
+    async def run():
+        async with AsyncDeeployService(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                                       token='abc') as service:
+            await service.actuals(WORKSPACE_ID, DEPLOYMENT_ID, {'predictionIds': [], 'actualValues': []})
+
+    with pytest.raises(Exception, match='No permission'):
+        asyncio.run(run())
+
+
+def test_retries(mock_api):
+    routes, requests = mock_api
+    path = '/workspaces/%s/deployments/%s/requestLogs' % (WORKSPACE_ID, DEPLOYMENT_ID)
+    routes[('GET', path)] = (503, {})
+
+    async def run():
+        async with AsyncDeeployService(host='test.deeploy.ml', workspace_id=WORKSPACE_ID, token='abc',
+                                       retry_options=RetryOptions(max_retries=2, backoff_factor=0)) as service:
+            await service.getRequestLogs(WORKSPACE_ID, DEPLOYMENT_ID)
+
+    with pytest.raises(Exception):
+        asyncio.run(run())
+    assert len(requests) == 3
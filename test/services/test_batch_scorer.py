@@ -0,0 +1,136 @@
+import glob
+import json
+import os
+
+import pandas as pd
+import pyarrow.parquet
+import pytest
+
+from deeploy.models import EncodingOptions
+from deeploy.services.batch_scorer import iter_input_chunks, score_in_chunks
+
+
+def write_input(tmp_path, rows=25):
+    frame = pd.DataFrame({'id': ['row-%s' % i for i in range(rows)], 'x': range(rows),
+                          'y': [2 * i for i in range(rows)]})
+    input_path = str(tmp_path / 'input.parquet')
+    frame.to_parquet(input_path, row_group_size=7)
+    return input_path
+
+
+def predict(request_body):
+    instances = request_body['instances'].tolist()
+    return {'predictions': [x + y for x, y in instances], 'requestLogId': 'request-%s' % instances[0][0],
+            'predictionLogIds': ['prediction-%s' % x for x, _ in instances]}
+
+
+def predict_encoded(body, headers):
+    request_body = json.loads(body)
+    return predict({'instances': pd.DataFrame(request_body['instances']).to_numpy()})
+
+
+def read_output(output_path):
+    return pyarrow.parquet.read_table(sorted(glob.glob(os.path.join(output_path, 'part-*.parquet')))).to_pandas()
+
+
+def test_iter_input_chunks_skips_rows(tmp_path):
+    input_path = write_input(tmp_path)
+    chunks = list(iter_input_chunks(input_path, 4, skip_rows=9, columns=['x']))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 4]
+    assert chunks[0]['x'].tolist() == [9, 10, 11, 12]
+
+    csv_path = str(tmp_path / 'input.csv')
+    pd.read_parquet(input_path).to_csv(csv_path, index=False)
+    assert [chunk['x'].tolist() for chunk in iter_input_chunks(csv_path, 10, skip_rows=18)] == \
+        [list(range(18, 25))]
+
+
+def test_score_in_chunks(tmp_path):
+    input_path = write_input(tmp_path)
+    output_path = str(tmp_path / 'output')
+
+    rows = score_in_chunks(predict, predict_encoded, EncodingOptions(), input_path, output_path,
+                           columns=['x', 'y'], keep_columns=['id'], chunk_size=4, max_workers=3,
+                           rows_per_file=10)
+
+    output = read_output(output_path)
+    assert rows == 25
+    assert len(glob.glob(os.path.join(output_path, 'part-*.parquet'))) == 3
+    assert output['prediction'].tolist() == [3 * i for i in range(25)]
+    assert output['requestLogId'].tolist()[:5] == ['request-0'] * 4 + ['request-4']
+    assert output['predictionLogId'].tolist()[-1] == 'prediction-24'
+
+
+def test_score_in_chunks_resumes_after_failure(tmp_path):
+    input_path = write_input(tmp_path)
+    output_path = str(tmp_path / 'output')
+    requests = []
+
+    def failing_predict(request_body):
+        requests.append(request_body['instances'][0][0])
+        if request_body['instances'][0][0] == 16:
+            raise Exception('Failed to call predictive model.')
+        return predict(request_body)
+
+    with pytest.raises(Exception):
+        score_in_chunks(failing_predict, predict_encoded, EncodingOptions(), input_path, output_path,
+                        columns=['x', 'y'], chunk_size=4, max_workers=1, rows_per_file=8)
+    assert read_output(output_path)['prediction'].tolist() == [3 * i for i in range(16)]
+
+    requests.clear()
+
+    def recording_predict(request_body):
+        requests.append(request_body['instances'][0][0])
+        return predict(request_body)
+
+    rows = score_in_chunks(recording_predict, predict_encoded, EncodingOptions(), input_path, output_path,
+                           columns=['x', 'y'], chunk_size=4, rows_per_file=8)
+
+    assert rows == 25
+    assert read_output(output_path)['prediction'].tolist() == [3 * i for i in range(25)]
+    assert sorted(requests) == [16, 20, 24]
+
+
+def test_score_in_chunks_with_processes(tmp_path):
+    input_path = write_input(tmp_path)
+    output_path = str(tmp_path / 'output')
+
+    rows = score_in_chunks(predict, predict_encoded, EncodingOptions(), input_path, output_path,
+                           columns=['x', 'y'], chunk_size=5, use_processes=True, max_processes=2)
+
+    assert rows == 25
+    assert read_output(output_path)['prediction'].tolist() == [3 * i for i in range(25)]
+
+
+def test_score_in_chunks_promotes_column_types(tmp_path):
+    input_path = write_input(tmp_path)
+    output_path = str(tmp_path / 'output')
+
+    def changing_predict(request_body):
+        response = predict(request_body)
+        first = request_body['instances'][0][0]
+        if first < 4:
+            response['predictions'] = [None] * len(response['predictions'])
+        elif first >= 16:
+            response['predictions'] = [prediction + 0.5 for prediction in response['predictions']]
+        return response
+
+    rows = score_in_chunks(changing_predict, predict_encoded, EncodingOptions(), input_path, output_path,
+                           columns=['x', 'y'], chunk_size=4, max_workers=1, rows_per_file=10)
+
+    paths = sorted(glob.glob(os.path.join(output_path, 'part-*.parquet')))
+    types = [str(pyarrow.parquet.read_schema(path).field('prediction').type) for path in paths]
+    assert rows == 25
+    assert types == ['double', 'double', 'double']
+    assert [pyarrow.parquet.read_metadata(path).num_rows for path in paths] == [12, 12, 1]
+    output = read_output(output_path)
+    assert output['prediction'].isna().tolist() == [True] * 4 + [False] * 21
+    assert output['prediction'].tolist()[4:] == [3 * i for i in range(4, 16)] + [3 * i + 0.5 for i in range(16, 25)]
+
+
+def test_score_in_chunks_requires_pyarrow_14(tmp_path, monkeypatch):
+    monkeypatch.setattr('pyarrow.__version__', '13.0.0')
+    with pytest.raises(Exception, match='pyarrow 14 or later'):
+        score_in_chunks(predict, predict_encoded, EncodingOptions(), write_input(tmp_path), str(tmp_path / 'output'),
+                        columns=['x', 'y'])
@@ -0,0 +1,43 @@
+from deeploy.services.blob_upload import MultipartFileEncoder, UploadProgress
+
+
+def test_multipart_file_encoder(tmp_path):
+    file_path = tmp_path / 'model.joblib'
+    content = bytes(range(256)) * 40
+    file_path.write_bytes(content)
+
+    progress = []
+    encoder = MultipartFileEncoder(str(file_path), chunk_size=4096, progress_callback=progress.append)
+
+    body = b''
+    while True:
+        chunk = encoder.read(1000)
+        if not chunk:
+            break
+        body += chunk
+
+    boundary = encoder.content_type.split('boundary=')[1]
+    assert len(body) == len(encoder)
+    assert body.startswith(('--%s\r\n' % boundary).encode())
+    assert b'name="file"; filename="model.joblib"' in body
+    assert body.endswith(('\r\n--%s--\r\n' % boundary).encode())
+    assert body.split(b'\r\n\r\n', 1)[1][:len(content)] == content
+    assert progress[-1] == len(content)
+    assert all(current - previous >= 4096 for previous, current in zip([0] + progress[:-2], progress[:-1]))
+    assert encoder._MultipartFileEncoder__file.closed
+
+
+def test_upload_progress():
+    reported = []
+    progress = UploadProgress(300, lambda uploaded, total: reported.append((uploaded, total)))
+    first = progress.file_callback('a')
+    second = progress.file_callback('b')
+
+    first(100)
+    second(150)
+    second(50)  # retried upload starts again
+    second(200)
+
+    assert progress.uploaded_bytes == 300
+    assert reported[-1] == (300, 300)
+    assert reported[2] == (150, 300)
@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from deeploy.services.bulk_submitter import chunked, iter_pairs, submit_in_chunks
+
+
+def test_chunked():
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_iter_pairs():
+    pandas = pytest.importorskip('pandas')
+    data_frame = pandas.DataFrame({'id': ['a', 'b'], 'actual': [{'predictions': [True]}, {'predictions': [False]}]})
+    assert list(iter_pairs(data_frame)) == [('a', {'predictions': [True]}), ('b', {'predictions': [False]})]
+    assert list(iter_pairs([('a', 1)])) == [('a', 1)]
+
+
+def test_submit_in_chunks():
+    attempts = {}
+    lock = threading.Lock()
+
+    def submit(chunk):
+        with lock:
+            attempts[chunk[0]] = attempts.get(chunk[0], 0) + 1
+        if chunk[0] == 'id-6':
+            raise Exception('No permission to perform this action.')
+
+    ids = ['id-%d' % i for i in range(10)]
+    report = submit_in_chunks(chunked(ids, 2), submit, lambda item: item, max_workers=2)
+
+    assert [result.id for result in report.results] == ids
+    assert report.succeeded == 8
+    assert report.failed == 2
+    assert [result.id for result in report.results if not result.success] == ['id-6', 'id-7']
+    assert report.results[6].error == 'No permission to perform this action.'
+    # retries are left to the retry policy of the service
+    assert set(attempts.values()) == {1}
@@ -1,8 +1,10 @@
 import pytest
+import requests
 import requests_mock
 
 from deeploy.services import DeeployService
-from deeploy.models import Repository, Deployment, CreateDeployment, V1Prediction, V2Prediction, RequestLog, PredictionLog, RequestLogs
+from deeploy.models import Repository, Deployment, CreateDeployment, V1Prediction, V2Prediction, RequestLog, PredictionLog, RequestLogs, \
+    ConnectionOptions, LogFilters, RetryOptions, EncodingOptions
 from deeploy.enums import ModelType, ExplainerType
 
 WORKSPACE_ID = 'abc'
@@ -21,6 +23,42 @@ def test__init(deeploy_service):
                            access_key='abc', secret_key='def')
 
 
+def test__session():
+    connection_options = ConnectionOptions(pool_maxsize=4, connect_timeout=1, read_timeout=2)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        with DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc',
+                            secret_key='def', connection_options=connection_options) as service:
+            m.post('https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict',
+                   json={'predictions': [1]})
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+
+            assert m.request_history[-1].timeout == (1, 2)
+            session = service._DeeployService__session
+            assert session.get_adapter('https://api.test.deeploy.ml')._pool_maxsize == 4
+
+
+def test__lazy_validation():
+    with requests_mock.Mocker() as m:
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc',
+                                 secret_key='def', lazy_validation=True)
+        assert m.call_count == 0
+
+        m.post('https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict', status_code=401)
+        with pytest.raises(Exception, match='Access keys are not valid'):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+
+    with requests_mock.Mocker() as m:
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', token='abc',
+                                 lazy_validation=True)
+        m.post('https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict',
+               json={'predictions': [1]})
+        service.predict('ghi', 'jkl', {'instances': [[1]]})
+        service.predict('ghi', 'jkl', {'instances': [[1]]})
+        assert m.request_history[-1].headers['Authorization'] == 'Bearer abc'
+
+
 @pytest.fixture(scope="session")
 def deeploy_service():
     with requests_mock.Mocker() as m:
@@ -332,3 +370,97 @@ def test_evaluate(deeploy_service: DeeployService):
         with pytest.raises(Exception):
             deeploy_service.evaluate(
                 workspace_id='abc', deployment_id='20c2593d-e09d-4246-be84-46f81a40a7d4', request_log_id='abc', prediction_log_id='abc', evaluation_input={})
+
+
+def test_iter_request_logs(deeploy_service):
+    def request_log(i):
+        return {"id": str(i),
+                "deploymentId": "ccadb1a1-9036-418c-9936-3f7ac6c4ec8c",
+                "commit": "4c1a62d",
+                "requestContentType": "application/json",
+                "responseTimeMS": 26,
+                "statusCode": 200,
+                "createdAt": "2021-05-06T15:36:07.597Z"}
+
+    def page(request, context):
+        offset, limit = int(request.qs['offset'][0]), int(request.qs['limit'][0])
+        return {'data': [request_log(i) for i in range(offset, min(offset + limit, 5))], 'count': 5}
+
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces/%s/deployments/%s/requestLogs' % (WORKSPACE_ID, '20c2593d-e09d-4246-be84-46f81a40a7d4'),
+              json=page)
+        logs = list(deeploy_service.iter_request_logs(
+            workspace_id=WORKSPACE_ID, deployment_id='20c2593d-e09d-4246-be84-46f81a40a7d4', page_size=2,
+            filters=LogFilters(status_code=200, commit='4c1a62d')))
+
+        assert [log.id for log in logs] == ['0', '1', '2', '3', '4']
+        assert all(isinstance(log, RequestLog) for log in logs)
+        assert len(m.request_history) == 3
+        assert m.request_history[0].qs['statuscode'] == ['200']
+        assert m.request_history[0].qs['commit'] == ['4c1a62d']
+
+
+def test_retries():
+    retry_options = RetryOptions(backoff_factor=0, circuit_breaker_threshold=2, timeouts={'logs': 5})
+    url = 'https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl'
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc',
+                                 secret_key='def', retry_options=retry_options)
+
+        m.get(url + '/requestLogs', [{'status_code': 503, 'headers': {'Retry-After': '0'}},
+                                     {'json': {'data': [], 'count': 0}}])
+        assert service.getRequestLogs('ghi', 'jkl') == RequestLogs(data=[], count=0)
+        assert len(m.request_history) == 3
+        assert m.request_history[-1].timeout == (10, 5)
+
+        # predict calls are not idempotent, so they are only retried when the API asks to
+        m.post(url + '/predict', status_code=500)
+        with pytest.raises(Exception):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        assert len(m.request_history) == 4
+
+        with pytest.raises(Exception):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        with pytest.raises(Exception, match='circuit breaker'):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        assert len(m.request_history) == 5
+
+
+def test_circuit_breaker_trial_with_unexpected_error():
+    retry_options = RetryOptions(circuit_breaker_threshold=1, circuit_breaker_reset_timeout=0)
+    url = 'https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict'
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc',
+                                 secret_key='def', retry_options=retry_options)
+
+        m.post(url, [{'status_code': 500}, {'exc': requests.exceptions.ChunkedEncodingError},
+                     {'json': {'predictions': [1]}}])
+        with pytest.raises(Exception, match='Failed to call predictive model'):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        # the failed trial call opens the circuit again, instead of blocking every later call
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        assert service.predict('ghi', 'jkl', {'instances': [[1]]}).predictions == [1]
+
+def test_predict_kserve_binary():
+    import json
+    import numpy as np
+
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc', secret_key='def',
+                                 encoding_options=EncodingOptions(format='kserve_binary'))
+        header = json.dumps({'outputs': [{'name': 'output-0', 'shape': [2], 'datatype': 'FP64',
+                                          'parameters': {'binary_data_size': 16}}]}).encode()
+        m.post('https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict',
+               content=header + np.array([0.25, 0.75]).tobytes(),
+               headers={'Inference-Header-Content-Length': str(len(header))})
+        prediction = service.predict('ghi', 'jkl', {'inputs': [{'name': 'input-0', 'data': np.ones((2, 4))}]})
+
+        request = m.request_history[-1]
+        assert request.headers['Content-Type'] == 'application/octet-stream'
+        assert int(request.headers['Content-Length']) == int(request.headers['Inference-Header-Content-Length']) + 64
+        assert isinstance(prediction, V2Prediction)
+        assert prediction.predictions[0].tolist() == [0.25, 0.75]
@@ -0,0 +1,50 @@
+import os
+
+import git
+
+from deeploy.services import GitService
+
+
+def create_remote(tmp_path):
+    remote_path = str(tmp_path / 'remote.git')
+    git.Repo.init(remote_path, bare=True)
+    repository = git.Repo.clone_from(remote_path, str(tmp_path / 'work'))
+    with repository.config_writer() as config:
+        config.set_value('user', 'name', 'test')
+        config.set_value('user', 'email', 'test@example.com')
+    for commit_index in range(3):
+        for contract_path in ['segment_a', 'segment_b']:
+            os.makedirs(tmp_path / 'work' / contract_path, exist_ok=True)
+            (tmp_path / 'work' / contract_path / 'metadata.json').write_text(str(commit_index))
+        repository.index.add(['segment_a', 'segment_b'])
+        repository.index.commit('Commit %d' % commit_index)
+    repository.remote('origin').push('HEAD:refs/heads/master')
+    return repository, 'file://%s' % remote_path
+
+
+def test_clone_shallow_and_sparse(tmp_path):
+    work, remote_url = create_remote(tmp_path)
+    local_repository_path = str(tmp_path / 'cache' / 'repository')
+
+    git_service = GitService.clone(remote_url, local_repository_path, 'master', ['segment_a'])
+    assert git_service.get_head_commit_sha() == work.head.commit.hexsha
+    assert git_service.repository.git.rev_list('--count', 'HEAD') == '1'
+    assert os.path.exists(os.path.join(local_repository_path, 'segment_a', 'metadata.json'))
+    assert not os.path.exists(os.path.join(local_repository_path, 'segment_b'))
+
+    (tmp_path / 'work' / 'segment_a' / 'metadata.json').write_text('3')
+    work.index.add(['segment_a'])
+    work.index.commit('Commit 3')
+    work.remote('origin').push('HEAD:refs/heads/master')
+    with open(os.path.join(local_repository_path, 'segment_a', 'metadata.json'), 'w') as f:
+        f.write('changes of a failed deploy')
+
+    git_service = GitService.clone(remote_url, local_repository_path, 'master', ['segment_a'])
+    assert git_service.get_head_commit_sha() == work.head.commit.hexsha
+    with open(os.path.join(local_repository_path, 'segment_a', 'metadata.json')) as f:
+        assert f.read() == '3'
+    assert not os.path.exists(os.path.join(local_repository_path, 'segment_b'))
+    assert not git_service.repository.is_dirty(untracked_files=True)
+
+    git_service.pull()
+    assert git_service.get_head_commit_sha() == work.head.commit.hexsha
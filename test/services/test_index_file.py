@@ -0,0 +1,16 @@
+import os
+
+from deeploy.services.index_file import IndexFile
+
+
+def test_index_file(tmp_path):
+    index_file = IndexFile(str(tmp_path / 'cache' / 'index.json'), 'test index')
+    assert index_file.read() == {}
+
+    index_file.update(lambda index: index.update({'a': 1}))
+    index_file.update(lambda index: index.update({'b': 2}))
+    assert index_file.read() == {'a': 1, 'b': 2}
+    assert os.listdir(tmp_path / 'cache') == ['index.json']
+
+    (tmp_path / 'cache' / 'index.json').write_text('{"a": ')
+    assert index_file.read() == {}
@@ -0,0 +1,150 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+
+import requests
+import requests_mock
+
+from deeploy import PredictionClient, CacheOptions
+from deeploy.models import InstrumentationOptions, RetryOptions
+from deeploy.services import DeeployService, MetricsCollector
+from deeploy.services.instrumentation import Instrumentation, NULL_EVENT
+
+PREDICT_URL = 'https://api.test.deeploy.ml/workspaces/ghi/deployments/jkl/predict'
+
+
+class FakeSpan(object):
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, end_time=None):
+        self.ended = True
+
+
+class FakeTracer(object):
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None, start_time=None):
+        self.spans.append(FakeSpan(name, attributes))
+        return self.spans[-1]
+
+
+def test_predict_event():
+    events = []
+    collector = MetricsCollector()
+    tracer = FakeTracer()
+    options = InstrumentationOptions(hooks=[events.append, collector], tracer=tracer)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc', secret_key='def',
+                                 retry_options=RetryOptions(backoff_factor=0), instrumentation_options=options)
+        m.post(PREDICT_URL, [{'status_code': 429},
+                             {'json': {'predictions': [1]}, 'headers': {'Server-Timing': 'total;dur=12'}}])
+        service.predict('ghi', 'jkl', {'instances': [[1, 2]]})
+
+    event = events[-1]
+    assert (event.endpoint, event.deployment_id, event.status_code) == ('predict', 'jkl', 200)
+    assert (event.attempts, event.retries, event.error) == (2, 1, None)
+    assert event.request_bytes == len('{"instances":[[1,2]]}')
+    assert event.response_bytes > 0
+    assert {'encode', 'wait', 'download', 'backoff', 'decode', 'parse'} <= set(event.phases)
+    assert event.phases['server'] == 0.012
+    assert event.duration >= sum(event.phases[phase] for phase in ['encode', 'decode', 'parse'])
+
+    assert collector.get_counter('requests_total', endpoint='predict', status='200') == 1
+    assert collector.get_counter('retries_total', endpoint='predict') == 1
+    assert collector.get_histogram('phase_duration_seconds', endpoint='predict', phase='parse')['count'] == 1
+    metrics = collector.render()
+    assert '# TYPE deeploy_client_request_duration_seconds histogram' in metrics
+    assert 'deeploy_client_requests_total{endpoint="predict",method="POST",status="200"} 1' in metrics
+    assert 'deeploy_client_request_duration_seconds_bucket{endpoint="predict",le="+Inf"} 1' in metrics
+
+    span = tracer.spans[-1]
+    assert span.name == 'deeploy.predict' and span.ended
+    assert span.attributes['http.response.status_code'] == 200
+    assert span.attributes['deeploy.retries'] == 1
+    assert span.attributes['deeploy.deployment_id'] == 'jkl'
+
+
+def test_failing_call_and_hook():
+    events = []
+
+    def failing_hook(event):
+        raise ValueError('hook failed')
+
+    options = InstrumentationOptions(hooks=[failing_hook, events.append])
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        service = DeeployService(host='test.deeploy.ml', workspace_id='ghi', access_key='abc', secret_key='def',
+                                 retry_options=RetryOptions(max_retries=0), instrumentation_options=options)
+        m.post(PREDICT_URL, exc=requests.ConnectTimeout)
+        try:
+            service.predict('ghi', 'jkl', {'instances': [[1]]})
+        except requests.ConnectTimeout:
+            pass
+
+    assert (events[-1].status_code, events[-1].error, events[-1].attempts) == (None, 'ConnectTimeout', 1)
+
+
+def test_prediction_cache_hits():
+    collector = MetricsCollector()
+    with requests_mock.Mocker() as m:
+        client = PredictionClient(host='test.deeploy.ml', workspace_id='ghi', deployment_token='abc',
+                                  cache_options=CacheOptions(),
+                                  instrumentation_options=InstrumentationOptions(hooks=[collector]))
+        m.post(PREDICT_URL, json={'predictions': [1]})
+        for _ in range(3):
+            client.predict('jkl', {'instances': [[1]]})
+
+    assert collector.get_counter('cache_lookups_total', result='hit') == 2
+    assert collector.get_counter('cache_lookups_total', result='miss') == 1
+    assert collector.get_counter('requests_total', endpoint='predict') == 1
+    assert collector.get_histogram('request_duration_seconds', endpoint='predict')['count'] == 3
+
+
+def test_connection_phases():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    events = []
+    instrumentation = Instrumentation(InstrumentationOptions(hooks=[events.append]))
+    session = requests.Session()
+    instrumentation.instrument_session(session)
+    try:
+        for _ in range(2):
+            with instrumentation.call('workspace', 'GET') as event:
+                event.attempt_started()
+                event.attempt_finished(session.get('http://127.0.0.1:%s/' % server.server_address[1]))
+    finally:
+        session.close()
+        server.shutdown()
+
+    # the second call reuses the connection of the first
+    assert 'connect' in events[0].phases
+    assert 'connect' not in events[1].phases
+
+
+def test_disabled():
+    instrumentation = Instrumentation()
+    assert not instrumentation.enabled
+    with instrumentation.call('predict') as event:
+        assert event is NULL_EVENT
+        with event.phase('parse'):
+            pass
+        event.cache_hit = True
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+
+from deeploy.services.log_exporter import ExportCursor, flatten_prediction_logs, export_prediction_log_pages
+
+PREDICTION_LOG = {
+    "id": "bac4848a-e7bd-4af6-821d-2e384dc016cc",
+    "requestBody": {"instances": [[1, 2]]},
+    "requestBodyBlobLink": None,
+    "responseBody": {"predictions": [0]},
+    "requestLog": {"id": "abc", "commit": "4c1a62d", "statusCode": 200, "responseTimeMS": 26},
+    "evaluation": {"result": 1, "value": {"predictions": [1]}, "explanation": "wrong"},
+    "actual": {},
+    "createdAt": "2021-05-06T15:36:07.597Z",
+    "tags": {'primary': 'customer-1', 'secondary': ['a', 'b']},
+}
+
+
+def test_flatten_prediction_logs():
+    columns = flatten_prediction_logs([PREDICTION_LOG])
+    assert columns['requestBody'] == ['{"instances": [[1, 2]]}']
+    assert columns['requestLog.statusCode'] == [200]
+    assert columns['requestLog.tokenId'] == [None]
+    assert columns['evaluation.result'] == [1]
+    assert columns['actual'] == [None]
+    assert columns['tags.secondary'] == [['a', 'b']]
+
+
+def test_export_jsonl(tmp_path):
+    path = str(tmp_path / 'logs.jsonl.gz')
+    count = export_prediction_log_pages(iter([[PREDICTION_LOG], [PREDICTION_LOG]]), path, 'jsonl')
+    assert count == 2
+    with gzip.open(path, 'rt') as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 2
+    assert rows[0]['requestLog.commit'] == '4c1a62d'
+
+
+def test_export_parquet(tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'logs.parquet')
+    count = export_prediction_log_pages(iter([[PREDICTION_LOG], [PREDICTION_LOG] * 2]), path, 'parquet')
+    assert count == 3
+    table = parquet.read_table(path)
+    assert table.num_rows == 3
+    assert str(table.schema.field('requestLog.statusCode').type) == 'int64'
+    assert table.column('tags.primary').to_pylist() == ['customer-1'] * 3
+
+
+def test_export_unsupported_format(tmp_path):
+    with pytest.raises(Exception):
+        export_prediction_log_pages(iter([]), str(tmp_path / 'logs.csv'), 'csv')
+
+
+def test_export_cursor():
+    def log(log_id, created_at):
+        return {'id': log_id, 'createdAt': created_at}
+
+    # the pages are returned newest first
+    cursor = ExportCursor()
+    pages = [[log('c', '2021-05-06T15:00:02.000Z'), log('b', '2021-05-06T15:00:02.000Z')],
+             [log('a', '2021-05-06T15:00:01.000Z')]]
+    assert [[entry['id'] for entry in page] for page in cursor.filter_pages(iter(pages))] == [['c', 'b'], ['a']]
+    assert cursor.created_at == '2021-05-06T15:00:02.000Z'
+
+    # the logs created at the time of the cursor are requested again and skipped
+    next_cursor = ExportCursor(cursor.dumps())
+    pages = [[log('d', '2021-05-06T15:00:03.000Z'), log('e', '2021-05-06T15:00:02.000Z'),
+              log('c', '2021-05-06T15:00:02.000Z')], [log('b', '2021-05-06T15:00:02.000Z')]]
+    assert [[entry['id'] for entry in page] for page in next_cursor.filter_pages(iter(pages))] == [['d', 'e']]
+    assert json.loads(next_cursor.dumps()) == {'createdAt': '2021-05-06T15:00:03.000Z', 'ids': ['d']}
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+import msgpack
+import numpy as np
+import pytest
+import zstandard
+from requests.structures import CaseInsensitiveDict
+
+from deeploy.models import EncodingOptions
+from deeploy.services.payload_encoding import PayloadEncoder, BufferedBody
+
+
+def test_json_with_arrays():
+    body, headers = PayloadEncoder().encode({'instances': np.arange(4).reshape(2, 2)})
+    assert headers == {'Content-Type': 'application/json'}
+    assert json.loads(body) == {'instances': [[0, 1], [2, 3]]}
+
+
+def test_compression():
+    request_body = {'instances': [[1.5] * 1000]}
+    body, headers = PayloadEncoder(EncodingOptions(compression='gzip')).encode(request_body)
+    assert headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(body)) == request_body
+
+    body, headers = PayloadEncoder(EncodingOptions(compression='zstd', compression_level=3)).encode(request_body)
+    assert headers['Content-Encoding'] == 'zstd'
+    assert json.loads(zstandard.ZstdDecompressor().decompress(body)) == request_body
+
+    _, headers = PayloadEncoder(EncodingOptions(compression='gzip')).encode({'instances': [[1]]})
+    assert 'Content-Encoding' not in headers
+
+    with pytest.raises(Exception, match='Unsupported compression'):
+        PayloadEncoder(EncodingOptions(compression='brotli'))
+
+
+def test_msgpack():
+    encoder = PayloadEncoder(EncodingOptions(format='msgpack'))
+    body, headers = encoder.encode({'instances': np.array([[1.5, 2.5]])})
+    assert headers['Content-Type'] == 'application/msgpack'
+    assert msgpack.unpackb(body) == {'instances': [[1.5, 2.5]]}
+    assert encoder.decode(msgpack.packb({'predictions': [1]}),
+                          CaseInsensitiveDict({'content-type': 'application/msgpack'})) == {'predictions': [1]}
+
+
+def test_kserve_binary():
+    encoder = PayloadEncoder(EncodingOptions(format='kserve_binary'))
+    array = np.arange(6, dtype=np.float32).reshape(2, 3)
+    body, headers = encoder.encode({'inputs': [{'name': 'input-0', 'data': array},
+                                               {'name': 'input-1', 'shape': [1], 'datatype': 'BYTES',
+                                                'data': ['text']}]})
+
+    assert isinstance(body, BufferedBody)
+    buffers = list(body)
+    # the array is sent from its own memory
+    assert np.shares_memory(np.frombuffer(buffers[1], dtype=np.float32), array)
+    header_length = int(headers['Inference-Header-Content-Length'])
+    header = json.loads(body.tobytes()[:header_length])
+    assert header['inputs'][0] == {'name': 'input-0', 'shape': [2, 3], 'datatype': 'FP32',
+                                   'parameters': {'binary_data_size': 24}}
+    assert header['inputs'][1]['data'] == ['text']
+    assert header['parameters'] == {'binary_data_output': True}
+    assert len(body) == header_length + 24
+
+    response_header = json.dumps({'outputs': [{'name': 'output-0', 'shape': [2], 'datatype': 'INT64',
+                                               'parameters': {'binary_data_size': 16}}]}).encode()
+    response = encoder.decode(response_header + np.array([7, 8], dtype='<i8').tobytes(),
+                              CaseInsensitiveDict({'inference-header-content-length': str(len(response_header))}))
+    assert isinstance(response['outputs'][0]['data'], np.ndarray)
+    assert response['outputs'][0]['data'].tolist() == [7, 8]
+
+    with pytest.raises(Exception, match='V2 inference request'):
+        encoder.encode({'instances': [[1]]})
+
+
+def test_kserve_binary_bytes_output():
+    encoder = PayloadEncoder(EncodingOptions(format='kserve_binary'))
+    data = b''.join(len(element).to_bytes(4, 'little') + element for element in [b'cat', b'', b'mouse'])
+    response_header = json.dumps({'outputs': [
+        {'name': 'labels', 'shape': [3, 1], 'datatype': 'BYTES', 'parameters': {'binary_data_size': len(data)}},
+        {'name': 'scores', 'shape': [1], 'datatype': 'FP32', 'parameters': {'binary_data_size': 4}}]}).encode()
+    response = encoder.decode(response_header + data + np.array([0.5], dtype='<f4').tobytes(),
+                              CaseInsensitiveDict({'inference-header-content-length': str(len(response_header))}))
+    assert response['outputs'][0]['data'].tolist() == [[b'cat'], [b''], [b'mouse']]
+    assert response['outputs'][1]['data'].tolist() == [0.5]
+
+    response_header = json.dumps({'outputs': [{'name': 'output-0', 'shape': [1], 'datatype': 'FP8',
+                                               'parameters': {'binary_data_size': 1}}]}).encode()
+    with pytest.raises(Exception, match='FP8 can not be decoded'):
+        encoder.decode(response_header + b'\0',
+                       CaseInsensitiveDict({'inference-header-content-length': str(len(response_header))}))
@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from deeploy.services import PredictionBatcher
+from deeploy.services.prediction_batcher import split_prediction, predict_in_batches
+from deeploy.models import V1Prediction, V2Prediction
+
+
+def echo_predict(requests):
+    def predict(request_body):
+        requests.append(request_body)
+        instances = request_body['instances']
+        return V2Prediction(predictions=[instance[0] * 10 for instance in instances],
+                            requestLogId='request-%d' % len(requests),
+                            predictionLogIds=['log-%d' % instance[0] for instance in instances])
+    return predict
+
+
+def test_split_prediction():
+    prediction = V2Prediction(predictions=[1, 2, 3], requestLogId='abc',
+                              predictionLogIds=['a', 'b', 'c'])
+    first, second = split_prediction(prediction, [1, 2])
+    assert first == V2Prediction(predictions=[1], requestLogId='abc', predictionLogIds=['a'])
+    assert second == V2Prediction(predictions=[2, 3], requestLogId='abc', predictionLogIds=['b', 'c'])
+
+    assert split_prediction(V1Prediction(predictions=[1, 2]), [1, 1]) == \
+        [V1Prediction(predictions=[1]), V1Prediction(predictions=[2])]
+
+    with pytest.raises(Exception):
+        split_prediction(V1Prediction(predictions=[1, 2]), [1])
+
+
+def test_predict_in_batches():
+    requests = []
+    predictions = predict_in_batches(echo_predict(requests), [[[1]], [[2], [3]], [[4]]], max_batch_size=2)
+    assert [prediction.predictions for prediction in predictions] == [[10], [20, 30], [40]]
+    assert [prediction.predictionLogIds for prediction in predictions] == \
+        [['log-1'], ['log-2', 'log-3'], ['log-4']]
+    assert len(requests) == 3
+
+
+def test_batcher():
+    requests = []
+    with PredictionBatcher(echo_predict(requests), max_batch_size=8, max_delay=0.05) as batcher:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            predictions = list(executor.map(
+                lambda i: batcher.predict({'instances': [[i]]}), range(16)))
+
+    assert [prediction.predictions for prediction in predictions] == [[i * 10] for i in range(16)]
+    assert [prediction.predictionLogIds for prediction in predictions] == [['log-%d' % i] for i in range(16)]
+    assert len(requests) < 16
+    assert all(len(request['instances']) <= 8 for request in requests)
+
+
+def test_batcher_failure():
+    def failing_predict(request_body):
+        raise Exception('Failed to call predictive model.')
+
+    with PredictionBatcher(failing_predict, max_delay=0) as batcher:
+        future = batcher.submit([[1]])
+        with pytest.raises(Exception, match='Failed to call predictive model.'):
+            future.result()
+
+
+def test_batcher_waits_for_a_free_worker():
+    requests = []
+    started = threading.Event()
+    release = threading.Event()
+    predict = echo_predict(requests)
+
+    def blocking_predict(request_body):
+        started.set()
+        release.wait()
+        return predict(request_body)
+
+    with PredictionBatcher(blocking_predict, max_batch_size=100, max_delay=0, max_concurrency=1) as batcher:
+        futures = [batcher.submit([[0]])]
+        started.wait()
+        # the deadline of these calls passes while the only worker is busy
+        for i in range(1, 6):
+            futures.append(batcher.submit([[i]]))
+            time.sleep(0.01)
+        release.set()
+        assert [future.result().predictions for future in futures] == [[i * 10] for i in range(6)]
+
+    assert [len(request['instances']) for request in requests] == [1, 5]
@@ -0,0 +1,35 @@
+import time
+
+from deeploy.services.prediction_cache import PredictionCache, hash_request_body
+
+
+def test_hash_request_body():
+    assert hash_request_body({'a': 1, 'b': [1, 2]}) == hash_request_body({'b': [1, 2], 'a': 1})
+    assert hash_request_body({'a': 1}) != hash_request_body({'a': 2})
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_size=2, ttl=60)
+    cache.put('abc', 'c1', {'instances': [1]}, 1)
+    cache.put('abc', 'c1', {'instances': [2]}, 2)
+    assert cache.get('abc', 'c1', {'instances': [1]}) == 1
+
+    cache.put('abc', 'c1', {'instances': [3]}, 3)
+    assert cache.get('abc', 'c1', {'instances': [2]}) is None
+    assert cache.get('abc', 'c1', {'instances': [1]}) == 1
+    assert cache.get('abc', 'c2', {'instances': [1]}) is None
+    assert cache.stats() == {'size': 2, 'hits': 2, 'misses': 2}
+
+
+def test_ttl_and_invalidate():
+    cache = PredictionCache(max_size=10, ttl=0.05)
+    cache.put('abc', 'c1', {'instances': [1]}, 1)
+    time.sleep(0.06)
+    assert cache.get('abc', 'c1', {'instances': [1]}) is None
+
+    cache = PredictionCache(max_size=10, ttl=60)
+    cache.put('abc', 'c1', {'instances': [1]}, 1)
+    cache.put('def', 'c1', {'instances': [1]}, 1)
+    cache.invalidate('abc')
+    assert cache.get('abc', 'c1', {'instances': [1]}) is None
+    assert cache.get('def', 'c1', {'instances': [1]}) == 1
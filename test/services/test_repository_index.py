@@ -0,0 +1,24 @@
+from deeploy.services.repository_index import RepositoryIndex, normalize_remote_url
+
+
+def test_normalize_remote_url():
+    urls = ['git@github.com:deeploy-ml/example.git',
+            'https://github.com/deeploy-ml/example.git',
+            'https://user@GitHub.com/deeploy-ml/example',
+            'ssh://git@github.com/deeploy-ml/example.git/']
+    assert set(normalize_remote_url(url) for url in urls) == {'github.com/deeploy-ml/example'}
+    assert normalize_remote_url('git@gitlab.com:deeploy-ml/example.git') != \
+        normalize_remote_url('git@github.com:deeploy-ml/example.git')
+    assert normalize_remote_url('/tmp/remote.git/') == '/tmp/remote.git'
+
+
+def test_repository_index(tmp_path):
+    index = RepositoryIndex(str(tmp_path), ttl=60)
+    assert index.get('host/abc', 'git@github.com:deeploy-ml/example.git') is None
+
+    index.put('host/abc', {normalize_remote_url('https://github.com/deeploy-ml/example'): 'def'})
+    assert RepositoryIndex(str(tmp_path), ttl=60).get(
+        'host/abc', 'git@github.com:deeploy-ml/example.git') == 'def'
+    assert index.get('host/ghi', 'git@github.com:deeploy-ml/example.git') is None
+    assert RepositoryIndex(str(tmp_path), ttl=0).get(
+        'host/abc', 'git@github.com:deeploy-ml/example.git') is None
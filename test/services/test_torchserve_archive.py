@@ -0,0 +1,81 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from deeploy.services.torchserve_archive import build_model_archive, convert_notebook_to_script
+
+
+def test_build_model_archive(tmp_path):
+    model_file = tmp_path / 'net.py'
+    model_file.write_text('class Net:\n    pass\n')
+
+    archive_path = build_model_archive(str(tmp_path / 'model-store'), 'model',
+                                       lambda f: f.write(b'weights' * 1000), str(model_file),
+                                       'image_classifier')
+
+    assert archive_path == str(tmp_path / 'model-store' / 'model.mar')
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == ['MAR-INF/MANIFEST.json', 'model.pt', 'net.py']
+        assert archive.read('model.pt') == b'weights' * 1000
+        assert archive.getinfo('model.pt').compress_type == zipfile.ZIP_DEFLATED
+        manifest = json.loads(archive.read('MAR-INF/MANIFEST.json'))
+    assert manifest['runtime'] == 'python'
+    assert manifest['model'] == {'modelName': 'model', 'serializedFile': 'model.pt',
+                                 'handler': 'image_classifier', 'modelFile': 'net.py', 'modelVersion': '1.0'}
+
+
+def test_build_model_archive_store_only_with_custom_handler(tmp_path):
+    model_file = tmp_path / 'net.py'
+    model_file.write_text('class Net:\n    pass\n')
+    handler_file = tmp_path / 'handler.py'
+    handler_file.write_text('def handle(data, context):\n    return data\n')
+
+    archive_path = build_model_archive(str(tmp_path), 'model', lambda f: f.write(b'weights'),
+                                       str(model_file), str(handler_file), compression_level=0)
+
+    with zipfile.ZipFile(archive_path) as archive:
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+        assert archive.read('handler.py') == handler_file.read_bytes()
+        assert json.loads(archive.read('MAR-INF/MANIFEST.json'))['model']['handler'] == 'handler.py'
+
+    with pytest.raises(Exception, match='compression level'):
+        build_model_archive(str(tmp_path), 'model', lambda f: None, str(model_file), 'image_classifier',
+                            compression_level=10)
+
+
+def test_convert_notebook_to_script(tmp_path):
+    notebook = {'cells': [
+        {'cell_type': 'markdown', 'source': ['# The model']},
+        {'cell_type': 'code', 'source': ['%matplotlib inline\n', 'import torch']},
+        {'cell_type': 'code', 'source': 'class Net(torch.nn.Module):\n    pass'},
+    ]}
+    notebook_path = tmp_path / 'net.ipynb'
+    notebook_path.write_text(json.dumps(notebook))
+
+    script = convert_notebook_to_script(str(notebook_path))
+    assert '# %matplotlib inline\nimport torch' in script
+    assert 'class Net(torch.nn.Module):\n    pass' in script
+    assert 'The model' not in script
+    compile(script, 'net.py', 'exec')
+
+    archive_path = build_model_archive(str(tmp_path), 'model', lambda f: None, str(notebook_path),
+                                       'image_classifier')
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.read('net.py').decode() == script
+
+
+def test_build_model_archive_is_deterministic(tmp_path):
+    model_file = tmp_path / 'net.py'
+    model_file.write_text('class Net:\n    pass\n')
+
+    archives = []
+    for i in range(2):
+        archive_path = build_model_archive(str(tmp_path / str(i)), 'model', lambda f: f.write(b'weights'),
+                                           str(model_file), 'image_classifier')
+        with open(archive_path, 'rb') as f:
+            archives.append(f.read())
+        # the model file is modified later, without changing its content
+        os.utime(model_file, (1700000000, 1700000000))
+    assert archives[0] == archives[1]
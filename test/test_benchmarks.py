@@ -0,0 +1,25 @@
+import json
+
+from benchmarks.__main__ import compare, main
+
+
+def test_benchmarks(tmp_path):
+    output_path = str(tmp_path / 'results.json')
+    assert main(['--quick', '--only', 'predict,deploy', '--output', output_path]) == 0
+
+    with open(output_path) as f:
+        report = json.load(f)
+    assert [result['name'] for result in report['results']][-1] == 'deploy'
+    assert all(result['metrics']['p50_ms'] > 0 for result in report['results'])
+
+
+def test_compare():
+    baseline = [{'name': 'predict', 'params': {'rows': 1}, 'metrics': {'p50_ms': 10, 'requests_per_s': 100}},
+                {'name': 'deploy', 'params': {}, 'metrics': {'p50_ms': 100}}]
+    results = [{'name': 'predict', 'params': {'rows': 1}, 'metrics': {'p50_ms': 11, 'requests_per_s': 70}},
+               {'name': 'deploy', 'params': {}, 'metrics': {'p50_ms': 50}},
+               {'name': 'upload', 'params': {}, 'metrics': {'p50_ms': 50}}]
+
+    regressions = compare(results, baseline, 0.2)
+
+    assert [(key, metric) for key, metric, _ in regressions] == [('predict {"rows": 1}', 'requests_per_s')]
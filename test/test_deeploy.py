@@ -1,4 +1,377 @@
+import gzip
+import json
+import os
+
+import git
 import pytest
+import requests_mock
+
+from deeploy import Client, UploadOptions, CacheOptions, UpdateOptions, DeployOptions
+from deeploy.enums import ModelType
+
+WORKSPACE_ID = 'abc'
+REPOSITORY_ID = 'def'
+
+
+@pytest.fixture
+def client(tmp_path):
+    upload_options = UploadOptions(max_workers=3, retry_backoff=0,
+                                   artifact_cache_dir=str(tmp_path / 'cache'), repository_cache_ttl=3600)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        client = Client(host='test.deeploy.ml', workspace_id=WORKSPACE_ID, access_key='abc',
+                        secret_key='def', upload_options=upload_options)
+    client._Client__config.repository_id = REPOSITORY_ID
+    return client
+
 
 def test__deploy():
-    pass
\ No newline at end of file
+    pass
+
+
+def test__upload_folder_to_blob(client, tmp_path):
+    model_folder = tmp_path / 'model'
+    (model_folder / 'variables').mkdir(parents=True)
+    for file_name in ['saved_model.pb', 'variables/variables.index', 'variables/variables.data']:
+        (model_folder / file_name).write_bytes(b'weights')
+
+    attempts = {}
+
+    def upload_response(request, context):
+        folder_path = request.qs['folderpath'][0]
+        attempts[folder_path] = attempts.get(folder_path, 0) + 1
+        if folder_path.endswith('variables') and attempts[folder_path] == 1:
+            context.status_code = 500
+            return {}
+        return {'data': {'referencePath': 's3://bucket/%s/%s/file' % (request.qs['commitsha'][0], folder_path)}}
+
+    with requests_mock.Mocker() as m:
+        m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+               json=upload_response)
+        blob_folder_path = client._Client__upload_folder_to_blob(str(tmp_path), str(model_folder))
+
+    assert blob_folder_path.startswith('s3://bucket/')
+    assert blob_folder_path.endswith('/model')
+    assert len(m.request_history) == 4
+    assert os.path.exists(model_folder)
+
+    with requests_mock.Mocker() as m:
+        assert client._Client__upload_folder_to_blob(str(tmp_path), str(model_folder)) == blob_folder_path
+        assert len(m.request_history) == 0
+
+
+def test_predict_cache(tmp_path):
+    deployment_url = 'https://api.test.deeploy.ml/workspaces/%s/deployments/ghi' % WORKSPACE_ID
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        client = Client(host='test.deeploy.ml', workspace_id=WORKSPACE_ID, access_key='abc',
+                        secret_key='def', cache_options=CacheOptions(max_size=10, ttl=60))
+
+        m.get(deployment_url, json=DEPLOYMENT)
+        m.post(deployment_url + '/predict', json={'predictions': [1]})
+        for request_body in [{'instances': [[1]]}, {'instances': [[1]]}, {'instances': [[2]]}]:
+            assert client.predict('ghi', request_body).predictions == [1]
+
+        assert m.call_count == 4
+        assert client.get_prediction_cache_stats() == {'size': 2, 'hits': 1, 'misses': 2}
+
+
+def test_predict_array(client):
+    import json
+    import numpy as np
+    import pandas as pd
+
+    def predict_response(request, context):
+        instances = json.loads(request.body)['instances']
+        return {'predictions': [sum(instance) for instance in instances]}
+
+    with requests_mock.Mocker() as m:
+        m.post('https://api.test.deeploy.ml/workspaces/%s/deployments/ghi/predict' % WORKSPACE_ID,
+               json=predict_response)
+        predictions = client.predict_array('ghi', np.arange(10).reshape(5, 2), batch_size=2, max_workers=2)
+        assert m.call_count == 3
+        assert isinstance(predictions, np.ndarray)
+        assert predictions.tolist() == [1, 5, 9, 13, 17]
+
+        frame = pd.DataFrame({'a': [1.0, 2.0], 'b': [3.0, 4.0], 'c': [5.0, 6.0]})
+        assert client.predict_frame('ghi', frame, columns=['c', 'a']).tolist() == [6.0, 8.0]
+
+
+class FakeModelWrapper(object):
+    def __init__(self, model_object, **kwargs):
+        self.model_object = model_object
+
+    def save(self, local_folder_path):
+        if self.model_object == b'broken':
+            raise Exception('Failed to save the model.')
+        with open(os.path.join(local_folder_path, 'model.joblib'), 'wb') as f:
+            f.write(self.model_object)
+
+    def get_model_type(self):
+        return ModelType.SKLEARN
+
+
+DEPLOYMENT = {'id': 'ghi', 'name': 'deployment', 'workspaceId': WORKSPACE_ID, 'status': 1,
+              'ownerId': 'jkl', 'createdAt': '', 'updatedAt': '',
+              'activeVersion': {'commit': '4c1a62d', 'repositoryId': REPOSITORY_ID}}
+
+
+def create_repository(tmp_path):
+    remote_path = str(tmp_path / 'remote.git')
+    git.Repo.init(remote_path, bare=True)
+    repository = git.Repo.clone_from(remote_path, str(tmp_path / 'repository'))
+    with repository.config_writer() as config:
+        config.set_value('user', 'name', 'test')
+        config.set_value('user', 'email', 'test@example.com')
+    (tmp_path / 'repository' / 'metadata.json').write_text('{}')
+    repository.index.add(['metadata.json'])
+    repository.index.commit('Initial commit')
+    repository.remote('origin').push('HEAD:refs/heads/%s' % repository.active_branch.name)
+    repository.active_branch.set_tracking_branch(repository.remote('origin').refs[0])
+
+    repositories = [{'id': REPOSITORY_ID, 'name': 'repository', 'status': 1, 'isArchived': False,
+                     'workspaceId': WORKSPACE_ID, 'isPublic': False, 'remotePath': remote_path,
+                     'createdAt': '', 'updatedAt': ''}]
+    return repository, repositories
+
+
+def test_incremental_update(client, tmp_path, monkeypatch):
+    monkeypatch.setattr('deeploy.services.model_wrapper.ModelWrapper', FakeModelWrapper)
+    repository, repositories = create_repository(tmp_path)
+    deployment_url = 'https://api.test.deeploy.ml/workspaces/%s/deployments/ghi' % WORKSPACE_ID
+
+    repository_lookups = []
+
+    def update(model):
+        with requests_mock.Mocker() as m:
+            m.get(deployment_url, json=DEPLOYMENT)
+            m.patch(deployment_url, json=DEPLOYMENT)
+            m.patch(deployment_url + '/metadata', json={'data': DEPLOYMENT})
+            m.get('https://api.test.deeploy.ml/workspaces/%s/repositories' % WORKSPACE_ID, json=repositories)
+            m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+                   json=lambda request, context: {'data': {'referencePath': 's3://bucket/%s/model/model.joblib' % model.decode()}})
+            client.update(UpdateOptions(deployment_id='ghi'), str(tmp_path / 'repository'), model=model,
+                          overwrite_contract=True)
+            repository_lookups.extend(r for r in m.request_history if r.path.endswith('/repositories'))
+            return len([r for r in m.request_history if r.method == 'POST'])
+
+    assert update(b'weights-1') == 1
+    first_commit = repository.head.commit.hexsha
+    assert os.path.exists(tmp_path / 'repository' / 'fingerprint.json')
+    first_fingerprints = (tmp_path / 'repository' / 'fingerprint.json').read_text()
+
+    assert update(b'weights-1') == 0
+    assert repository.head.commit.hexsha == first_commit
+    assert not repository.is_dirty(untracked_files=True)
+
+    assert update(b'weights-2') == 1
+    assert repository.head.commit.hexsha != first_commit
+    assert 'weights-2' in (tmp_path / 'repository' / 'model' / 'reference.json').read_text()
+    assert len(repository_lookups) == 1
+
+    # a fingerprint left in the working tree does not match the committed model reference
+    (tmp_path / 'repository' / 'fingerprint.json').write_text(first_fingerprints)
+    update(b'weights-1')
+    assert 'weights-1' in (tmp_path / 'repository' / 'model' / 'reference.json').read_text()
+
+
+def test_serialize_into_temp_dir(tmp_path, monkeypatch):
+    saved_folders = []
+
+    class RecordingModelWrapper(FakeModelWrapper):
+        def save(self, local_folder_path):
+            saved_folders.append(local_folder_path)
+            super().save(local_folder_path)
+
+    monkeypatch.setattr('deeploy.services.model_wrapper.ModelWrapper', RecordingModelWrapper)
+    repository, repositories = create_repository(tmp_path)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        client = Client(host='test.deeploy.ml', workspace_id=WORKSPACE_ID, access_key='abc', secret_key='def',
+                        upload_options=UploadOptions(temp_dir=str(tmp_path / 'tmp')))
+        m.get('https://api.test.deeploy.ml/workspaces/%s/repositories' % WORKSPACE_ID, json=repositories)
+        m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+               json=lambda request, context: {'data': {'referencePath': 's3://bucket/%s/model.joblib' %
+                                                                        request.qs['folderpath'][0]}})
+        m.post('https://api.test.deeploy.ml/workspaces/%s/deployments' % WORKSPACE_ID, json=DEPLOYMENT)
+        client.deploy(DeployOptions(name='segment'), str(tmp_path / 'repository'), model=b'weights',
+                      overwrite_metadata=True)
+
+    assert saved_folders[0].startswith(str(tmp_path / 'tmp'))
+    assert os.listdir(tmp_path / 'tmp') == []
+    assert os.listdir(tmp_path / 'repository' / 'model') == ['reference.json']
+    assert 's3://bucket/model' in (tmp_path / 'repository' / 'model' / 'reference.json').read_text()
+
+
+def test_deploy_many(client, tmp_path, monkeypatch):
+    monkeypatch.setattr('deeploy.services.model_wrapper.ModelWrapper', FakeModelWrapper)
+    repository, repositories = create_repository(tmp_path)
+    first_commit = repository.head.commit.hexsha
+    for contract_path in ['segment_a', 'segment_b', 'segment_c']:
+        (tmp_path / 'repository' / contract_path).mkdir()
+
+    entries = [(b'weights-a', DeployOptions(name='segment a'), 'segment_a'),
+               (b'broken', DeployOptions(name='segment b'), 'segment_b'),
+               (b'weights-c', DeployOptions(name='segment c'), 'segment_c')]
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces/%s/repositories' % WORKSPACE_ID, json=repositories)
+        m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+               json=lambda request, context: {'data': {'referencePath': 's3://bucket/%s/file' % request.qs['folderpath'][0]}})
+        m.post('https://api.test.deeploy.ml/workspaces/%s/deployments' % WORKSPACE_ID, json=DEPLOYMENT)
+        report = client.deploy_many(entries, str(tmp_path / 'repository'))
+
+    assert (report.succeeded, report.failed) == (2, 1)
+    assert [result.contract_path for result in report.results] == ['segment_a', 'segment_b', 'segment_c']
+    assert report.results[1].error == 'Failed to save the model.'
+    assert report.commit == repository.head.commit.hexsha
+    assert repository.head.commit.parents[0].hexsha == first_commit
+    committed_files = [item.path for item in repository.head.commit.tree.traverse()]
+    assert 'segment_a/model/reference.json' in committed_files
+    assert 'segment_c/model/reference.json' in committed_files
+    assert not [path for path in committed_files if path.startswith('segment_b')]
+    assert repository.remote('origin').refs[0].commit.hexsha == report.commit
+
+
+def test_deploy_to_branch(client, tmp_path, monkeypatch):
+    monkeypatch.setattr('deeploy.services.model_wrapper.ModelWrapper', FakeModelWrapper)
+    repository, repositories = create_repository(tmp_path)
+    head_commit = repository.head.commit.hexsha
+    (tmp_path / 'repository' / 'work_in_progress.py').write_text('x = 1')
+    remote = git.Repo(str(tmp_path / 'remote.git'))
+
+    def deploy(model):
+        with requests_mock.Mocker() as m:
+            m.get('https://api.test.deeploy.ml/workspaces/%s/repositories' % WORKSPACE_ID, json=repositories)
+            m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+                   json=lambda request, context: {'data': {'referencePath': 's3://bucket/%s/%s/model.joblib' % (
+                       model.decode(), request.qs['folderpath'][0])}})
+            m.post('https://api.test.deeploy.ml/workspaces/%s/deployments' % WORKSPACE_ID, json=DEPLOYMENT)
+            client.deploy(DeployOptions(name='segment'), str(tmp_path / 'repository'), model=model,
+                          overwrite_contract=True, contract_path='segment', target_branch='deeploy')
+            assert m.request_history[-1].json()['branchName'] == 'deeploy'
+            return m.request_history[-1].json()['commit'], len([r for r in m.request_history
+                                                                if r.path.endswith('/upload')])
+
+    commit_sha, uploads = deploy(b'weights-1')
+    assert uploads == 1
+    assert remote.commit('deeploy').hexsha == commit_sha
+    assert remote.commit('deeploy').parents[0].hexsha == head_commit
+    tree = remote.commit('deeploy').tree
+    assert 'weights-1/segment/model' in (tree / 'segment/model/reference.json').data_stream.read().decode()
+    assert (tree / 'metadata.json').data_stream.read() == b'{}'
+    assert sorted(item.path for item in tree.traverse() if item.type == 'blob') == [
+        'metadata.json', 'segment/fingerprint.json', 'segment/metadata.json', 'segment/model/reference.json']
+
+    assert repository.head.commit.hexsha == head_commit
+    assert repository.untracked_files == ['work_in_progress.py']
+    assert not repository.is_dirty()
+    assert not os.path.exists(tmp_path / 'repository' / 'segment')
+
+    assert deploy(b'weights-1') == (commit_sha, 0)
+
+    second_commit_sha, uploads = deploy(b'weights-2')
+    assert uploads == 1
+    assert remote.commit('deeploy').parents[0].hexsha == commit_sha
+
+
+def test_deploy_to_branch_checks_the_moved_branch(client, tmp_path, monkeypatch):
+    from deeploy.services import GitService
+
+    repository, repositories = create_repository(tmp_path)
+    remote = git.Repo(str(tmp_path / 'remote.git'))
+
+    class ConcurrentModelWrapper(FakeModelWrapper):
+        def save(self, local_folder_path):
+            super().save(local_folder_path)
+            # another deploy pushes the same contract while the model is saved
+            GitService(str(tmp_path / 'repository')).commit_files_to_branch(
+                'deeploy', lambda parent: {'segment/model/reference.json': b'{}'}, 'Concurrent deploy')
+
+    monkeypatch.setattr('deeploy.services.model_wrapper.ModelWrapper', ConcurrentModelWrapper)
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces/%s/repositories' % WORKSPACE_ID, json=repositories)
+        m.post('https://api.test.deeploy.ml/workspaces/%s/repositories/%s/upload' % (WORKSPACE_ID, REPOSITORY_ID),
+               json={'data': {'referencePath': 's3://bucket/segment/model/model.joblib'}})
+        with pytest.raises(Exception, match='segment/model is not empty'):
+            client.deploy(DeployOptions(name='segment'), str(tmp_path / 'repository'), model=b'weights',
+                          contract_path='segment', target_branch='deeploy')
+
+    assert remote.commit('deeploy').message == 'Concurrent deploy'
+
+
+def test_commit_files_to_branch_retries_on_moved_branch(tmp_path):
+    from deeploy.services import GitService
+
+    repository, _ = create_repository(tmp_path)
+    git_service = GitService(str(tmp_path / 'repository'))
+    head_commit = repository.head.commit.hexsha
+    first_commit = git_service.commit_files_to_branch('deeploy', lambda parent: {'a/reference.json': b'a'},
+                                                      'Add a')
+
+    # a stale parent is rejected by the remote, the files are built again on the new tip
+    parents = []
+
+    def get_files(parent_sha):
+        parents.append(parent_sha)
+        return {'b/reference.json': b'b'}
+
+    second_commit = git_service.commit_files_to_branch('deeploy', get_files, 'Add b', parent_sha=head_commit)
+    assert parents == [head_commit, first_commit]
+    remote = git.Repo(str(tmp_path / 'remote.git'))
+    assert remote.commit('deeploy').hexsha == second_commit
+    assert remote.commit('deeploy').parents[0].hexsha == first_commit
+    assert sorted(item.path for item in remote.commit('deeploy').tree.traverse() if item.type == 'blob') == [
+        'a/reference.json', 'b/reference.json', 'metadata.json']
+
+    assert git_service.commit_files_to_branch('deeploy', lambda parent: {'a': None}, 'Remove a') != second_commit
+    assert sorted(item.path for item in remote.commit('deeploy').tree.traverse() if item.type == 'blob') == [
+        'b/reference.json', 'metadata.json']
+    assert repository.head.commit.hexsha == head_commit
+
+
+def test_commit_files_to_branch_raises_remote_errors(tmp_path):
+    from deeploy.services import GitService
+
+    repository, _ = create_repository(tmp_path)
+    git_service = GitService(str(tmp_path / 'repository'))
+    assert git_service.fetch_branch('deeploy') is None
+
+    repository.remote('origin').set_url(str(tmp_path / 'missing.git'))
+    with pytest.raises(git.GitCommandError):
+        git_service.fetch_branch('deeploy')
+    with pytest.raises(git.GitCommandError):
+        git_service.commit_files_to_branch('deeploy', lambda parent: {'a/reference.json': b'a'}, 'Add a',
+                                           parent_sha=repository.head.commit.hexsha)
+
+
+def test_bulk_evaluate_only_retries_unprocessed_requests():
+    from deeploy import RetryOptions
+
+    evaluation_url = 'https://api.test.deeploy.ml/workspaces/%s/deployments/ghi/requestLogs/%s/' \
+        'predictionLogs/%s/evaluations'
+    with requests_mock.Mocker() as m:
+        m.get('https://api.test.deeploy.ml/workspaces')
+        client = Client(host='test.deeploy.ml', workspace_id=WORKSPACE_ID, deployment_token='abc',
+                        retry_options=RetryOptions(backoff_factor=0))
+        # the 503 response may come after the evaluation was stored, so it is not retried
+        m.post(evaluation_url % (WORKSPACE_ID, 'r1', 'p1'), [{'status_code': 503}, {'status_code': 201}])
+        m.post(evaluation_url % (WORKSPACE_ID, 'r2', 'p2'), [{'status_code': 429}, {'status_code': 201}])
+        report = client.bulk_evaluate('ghi', [('r1', 'p1', {'result': 0}), ('r2', 'p2', {'result': 0})])
+
+        assert [(result.id, result.success) for result in report.results] == [('p1', False), ('p2', True)]
+        assert m.call_count == 3
+
+
+def test_export_prediction_logs_cursor(client, tmp_path):
+    logs_url = 'https://api.test.deeploy.ml/workspaces/%s/deployments/ghi/predictionLogs' % WORKSPACE_ID
+    logs = [{'id': 'b', 'createdAt': '2021-05-06T15:00:02.000Z'}, {'id': 'a', 'createdAt': '2021-05-06T15:00:01.000Z'}]
+    with requests_mock.Mocker() as m:
+        m.get(logs_url, json={'data': logs, 'count': 2})
+        cursor = client.export_prediction_logs('ghi', str(tmp_path / 'logs-01.jsonl.gz'), format='jsonl')
+
+        m.get(logs_url, json={'data': [{'id': 'c', 'createdAt': '2021-05-06T15:00:03.000Z'}] + logs[:1], 'count': 2})
+        client.export_prediction_logs('ghi', str(tmp_path / 'logs-02.jsonl.gz'), format='jsonl', cursor=cursor)
+        assert m.request_history[-1].qs['start'] == ['2021-05-06t15:00:02.000z']
+
+    with gzip.open(str(tmp_path / 'logs-02.jsonl.gz'), 'rt') as f:
+        assert [json.loads(line)['id'] for line in f] == ['c']
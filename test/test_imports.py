@@ -0,0 +1,44 @@
+import ast
+import subprocess
+import sys
+
+HEAVY_MODULES = ['git', 'requests', 'pydantic', 'httpx', 'numpy', 'pandas', 'pyarrow']
+
+
+def import_times(statement: str) -> dict:
+    """Run a statement in a new interpreter and return the cumulative import time in
+    microseconds of every module it imports
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_deeploy():
+    times = import_times('import deeploy')
+    assert not [module for module in HEAVY_MODULES if module in times], times
+    # importing the package without its dependencies takes a few milliseconds, the
+    # budget only catches heavy imports that slip back in
+    assert times['deeploy'] < 250000
+
+
+def imported_modules(statement: str) -> list:
+    """Run a statement in a new interpreter and return the modules it has loaded
+    """
+    result = subprocess.run([sys.executable, '-c', statement + '; import sys; print(sorted(sys.modules))'],
+                            capture_output=True, text=True, check=True)
+    return ast.literal_eval(result.stdout.splitlines()[-1])
+
+
+def test_import_prediction_client():
+    modules = imported_modules('from deeploy import Client, AsyncClient, PredictionClient, CacheOptions')
+    assert 'git' not in modules
+    assert 'deeploy.services.git_service' not in modules
+    assert 'deeploy.services.model_wrapper' not in modules
+    assert 'deeploy.services.explainer_wrapper' not in modules
@@ -0,0 +1,30 @@
+import pytest
+import requests_mock
+
+from deeploy import PredictionClient, CacheOptions
+
+WORKSPACE_ID = 'abc'
+DEPLOYMENT_ID = '20c2593d-e09d-4246-be84-46f81a40a7d4'
+PREDICT_URL = 'https://api.test.deeploy.ml/workspaces/%s/deployments/%s/predict' % (WORKSPACE_ID, DEPLOYMENT_ID)
+
+
+def test_predict():
+    with requests_mock.Mocker() as m:
+        client = PredictionClient(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                                  deployment_token='abc', cache_options=CacheOptions())
+        assert m.call_count == 0
+
+        m.post(PREDICT_URL, json={'predictions': [1]})
+        assert client.predict(DEPLOYMENT_ID, {'instances': [[1]]}).predictions == [1]
+        assert client.predict(DEPLOYMENT_ID, {'instances': [[1]]}).predictions == [1]
+        assert m.call_count == 1
+        assert m.request_history[0].headers['Authorization'] == 'Bearer abc'
+
+
+def test_invalid_token():
+    with requests_mock.Mocker() as m:
+        with PredictionClient(host='test.deeploy.ml', workspace_id=WORKSPACE_ID,
+                              deployment_token='abc') as client:
+            m.post(PREDICT_URL, status_code=401)
+            with pytest.raises(Exception, match='Deployment token is not valid'):
+                client.predict(DEPLOYMENT_ID, {'instances': [[1]]})